@@ -0,0 +1,185 @@
+# benchmarks/db_write_benchmark.py
+# Membandingkan jalur tulis save_products: insert biasa vs upsert idempoten, untuk
+# setiap backend penyimpanan (MongoDB, SQLite, Parquet). Mensimulasikan query yang
+# dijalankan ulang beberapa kali di hari yang sama, lalu melaporkan throughput tulis,
+# ukuran collection, dan waktu baca terfilter (scan kolom + predikat harga).
+#
+# Contoh (database/direktori benchmark terpisah, dihapus setelah selesai):
+#   python -m benchmarks.db_write_benchmark --products 5000 --runs 3
+#   python -m benchmarks.db_write_benchmark --backend sqlite parquet   # tanpa server
+#   python -m benchmarks.db_write_benchmark --mongomock
+
+import argparse
+import datetime
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from dotenv import load_dotenv
+from storage import BACKENDS, create_storage
+from utils.logger_setup import get_logger
+
+load_dotenv()
+
+
+def synthetic_products(count, run, change_ratio=0.1, seed=42):
+    """
+    Produk sintetis dengan URL stabil. Pada run ke-2 dst., sebagian kecil produk
+    (`change_ratio`) berubah harga agar upsert mencatat update maupun unchanged.
+    """
+    rng = random.Random(seed)
+    today = datetime.date.today().isoformat()
+    products = []
+    for i in range(count):
+        price = 10000 + rng.randint(0, 90) * 500
+        changed = rng.random() < change_ratio
+        if run > 0 and changed:
+            price += 500 * run
+        products.append({
+            "timestamp_scrape": f"{today}T10:{run:02d}:00",
+            "ecommerce": "Tokopedia",
+            "product_name": f"Gula Aren {i}",
+            "price_raw": f"Rp{price:,}".replace(",", "."),
+            "price_clean": price,
+            "shop_name": f"Toko {i % 200}",
+            "location": "Bandung",
+            "sold_count_raw": f"{i % 50}+ terjual",
+            "sold_count_clean": i % 50,
+            "product_url": f"https://www.tokopedia.com/toko-{i % 200}/gula-aren-{i}-{1700000000000 + i}",
+            "search_query": "benchmark",
+        })
+    return products
+
+
+def directory_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def sqlite_table_size(path, table):
+    """(ukuran data byte, ukuran index byte) satu tabel dari virtual table dbstat."""
+    conn = sqlite3.connect(path)
+    try:
+        indexes = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,))]
+        def size(name):
+            return conn.execute("SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = ?",
+                                (name,)).fetchone()[0]
+        return size(table), sum(size(name) for name in indexes)
+    except sqlite3.Error:
+        return directory_size(path), None
+    finally:
+        conn.close()
+
+
+def collection_size(db, collection_name):
+    """(jumlah dokumen, ukuran data byte, ukuran index byte); ukuran None jika tidak didukung."""
+    count = db.count_documents(collection_name)
+    if db.name == "sqlite":
+        return (count, *sqlite_table_size(db.path, collection_name))
+    if db.name == "parquet":
+        return count, directory_size(os.path.join(db.root, collection_name)), None
+    try:
+        stats = db.db.command("collStats", collection_name)
+        return count, stats.get("size"), stats.get("totalIndexSize")
+    except Exception:
+        return count, None, None
+
+
+def time_filtered_read(db, collection_name):
+    """Waktu membaca dua kolom dengan filter query + harga (predicate pushdown di backend)."""
+    started = time.perf_counter()
+    rows = 0
+    for chunk in db.iter_collection_chunks(collection_name, {"search_query": "benchmark",
+                                                             "price_clean": {"$gte": 40000}},
+                                           fields=["product_name", "price_clean"], output="columns"):
+        rows += len(chunk["price_clean"])
+    return rows, time.perf_counter() - started
+
+
+def run_mode(db, collection_name, upsert, products_per_run, runs, batch_size):
+    db.drop_collection(collection_name)
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+    elapsed = 0.0
+    for run in range(runs):
+        products = synthetic_products(products_per_run, run)
+        for start in range(0, len(products), batch_size):
+            batch = products[start:start + batch_size]
+            started = time.perf_counter()
+            db.save_products(batch, collection_name, upsert=upsert)
+            elapsed += time.perf_counter() - started
+            for key in totals:
+                totals[key] += db.last_write_stats.get(key, 0)
+    count, size, index_size = collection_size(db, collection_name)
+    read_rows, read_seconds = time_filtered_read(db, collection_name)
+    written = products_per_run * runs
+    return {
+        "backend": db.name,
+        "mode": "upsert" if upsert else "insert",
+        "products_written": written,
+        "seconds": elapsed,
+        "products_per_second": written / elapsed if elapsed else 0.0,
+        "documents": count,
+        "data_bytes": size,
+        "index_bytes": index_size,
+        "read_rows": read_rows,
+        "read_seconds": read_seconds,
+        **totals,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark insert vs upsert per backend penyimpanan.")
+    parser.add_argument("--products", type=int, default=5000, help="Produk per run")
+    parser.add_argument("--runs", type=int, default=3, help="Berapa kali query yang sama diulang")
+    parser.add_argument("--batch-size", type=int, default=200, help="Ukuran batch seperti ProductWriter")
+    parser.add_argument("--db-name", default="benchmark_db")
+    parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=["mongo"],
+                        help="Backend yang dibandingkan")
+    parser.add_argument("--mongomock", action="store_true", help="Pakai mongomock untuk backend mongo (tanpa server)")
+    args = parser.parse_args()
+    logger = get_logger("db_benchmark")
+
+    # Backend lokal ditulis ke direktori sementara yang dihapus setelah selesai
+    local_dir = tempfile.mkdtemp(prefix="storage_bench_")
+    try:
+        for backend in args.backend:
+            if backend == "mongo" and args.mongomock:
+                import mongomock
+                from database import Database
+                db = Database(db_uri=None, db_name=args.db_name, client=mongomock.MongoClient())
+            elif backend == "mongo":
+                db = create_storage("mongo", db_uri=os.getenv("MONGO_URI", "mongodb://localhost:27017"),
+                                    db_name=args.db_name)
+            else:
+                path = os.path.join(local_dir, args.db_name + (".sqlite" if backend == "sqlite" else ""))
+                db = create_storage(backend, db_name=args.db_name, path=path)
+
+            try:
+                for upsert in (False, True):
+                    result = run_mode(db, f"bench_{'upsert' if upsert else 'insert'}", upsert,
+                                      args.products, args.runs, args.batch_size)
+                    size = "-" if result["data_bytes"] is None else f"{result['data_bytes'] / 1024:.0f} KB"
+                    index_size = "-" if result["index_bytes"] is None else f"{result['index_bytes'] / 1024:.0f} KB"
+                    logger.info(
+                        f"[{result['backend']}/{result['mode']}] {result['products_written']} produk dalam "
+                        f"{result['seconds']:.2f} detik ({result['products_per_second']:.0f}/detik); "
+                        f"{result['documents']} dokumen, data {size}, index {index_size}; "
+                        f"inserted={result['inserted']} updated={result['updated']} "
+                        f"unchanged={result['unchanged']}; baca terfilter {result['read_rows']} baris "
+                        f"dalam {result['read_seconds'] * 1000:.1f} ms"
+                    )
+            finally:
+                for name in ("bench_insert", "bench_upsert"):
+                    db.drop_collection(name)
+                db.close_connection()
+    finally:
+        shutil.rmtree(local_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
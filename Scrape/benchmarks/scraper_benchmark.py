@@ -0,0 +1,261 @@
+# benchmarks/scraper_benchmark.py
+# Benchmark TokopediaScraper tanpa jaringan: halaman hasil pencarian yang sudah
+# direkam dilayani oleh ReplayServer lokal, lalu scraper (headless) dijalankan
+# terhadapnya dengan semua jeda dapat diatur.
+#
+# Halaman yang dipakai harus berisi kartu produk (misal disimpan dari hasil
+# pencarian yang berhasil). Halaman debug di debug_pic/ adalah tangkapan halaman
+# timeout/kosong sehingga tidak cocok untuk benchmark.
+#
+# Contoh:
+#   python -m benchmarks.scraper_benchmark --pages 'rekaman/halaman_*.html'
+#   python -m benchmarks.scraper_benchmark --recordings recordings --mode html --repeat 3
+
+import argparse
+import glob
+import json
+import os
+import re
+import resource
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+
+import lxml.html
+
+from scrapers.html_extractor import HtmlExtractor
+from scrapers.specs import TOKOPEDIA
+from scrapers.tokopedia_scraper import TokopediaScraper
+from utils.metrics import MetricsRecorder
+from utils.rate_limiter import PolitenessScheduler
+from utils.replay_server import ReplayServer, load_recordings
+from utils.logger_setup import get_logger
+
+QUERY = "benchmark"
+
+
+class PeakRssSampler:
+    """
+    Mengambil sampel RSS proses ini beserta seluruh turunannya (chromedriver, Chrome)
+    secara berkala dan menyimpan nilai puncaknya.
+
+    Membutuhkan psutil; tanpa psutil hanya puncak RSS proses Python yang dilaporkan.
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+
+    @property
+    def includes_children(self):
+        return self._process is not None
+
+    def _sample(self):
+        processes = [self._process] + self._process.children(recursive=True)
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except Exception:
+                continue
+        self.peak_bytes = max(self.peak_bytes, total)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        if self._process:
+            self._sample()
+            self._thread = threading.Thread(target=self._run, name="PeakRssSampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        else:
+            # ru_maxrss dalam KB di Linux
+            self.peak_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return self.peak_bytes
+
+
+def _page_number(path):
+    match = re.search(r'(\d+)\D*$', os.path.basename(path))
+    return int(match.group(1)) if match else 0
+
+
+def load_html_pages(patterns):
+    """Memuat file HTML (urut nomor halaman di nama file) menjadi list body bytes."""
+    files = sorted({path for pattern in patterns for path in glob.glob(pattern)}, key=_page_number)
+    pages = []
+    for path in files:
+        with open(path, "rb") as f:
+            pages.append(f.read())
+    return pages
+
+
+def count_cards(pages):
+    """Jumlah kartu produk per halaman, dihitung offline dengan selector Tokopedia."""
+    extractor = HtmlExtractor.from_spec(TOKOPEDIA)
+    return [len(extractor.find_cards(lxml.html.fromstring(page))) if page.strip() else 0 for page in pages]
+
+
+def build_server(pages=None, recordings=None):
+    """
+    Menyiapkan ReplayServer.
+
+    Halaman HTML dilayani berdasarkan parameter `page` pada URL pencarian (halaman 1
+    = file pertama, dst.), sehingga nama query apa pun bisa dipakai. Rekaman dari
+    `record_dir` dilayani dengan path aslinya.
+    """
+    routes = load_recordings(recordings) if recordings else {}
+    html_pages = pages or []
+
+    def fallback(path):
+        parts = urlsplit(path)
+        if parts.path != "/search" or not html_pages:
+            return None
+        page = int(parse_qs(parts.query).get("page", ["1"])[0])
+        return html_pages[(page - 1) % len(html_pages)], "text/html; charset=utf-8"
+
+    return ReplayServer(routes, fallback=fallback)
+
+
+def recorded_queries(recordings):
+    """Daftar (query, page) dari path rekaman /search."""
+    with open(os.path.join(recordings, "index.json"), "r", encoding="utf-8") as f:
+        paths = json.load(f)
+    tasks = []
+    for path in paths:
+        parts = urlsplit(path)
+        params = parse_qs(parts.query)
+        if parts.path == "/search" and "q" in params:
+            tasks.append((params["q"][0], int(params.get("page", ["1"])[0])))
+    return sorted(tasks)
+
+
+def run_benchmark(tasks, server_url, mode="batch", rate=None, scroll_max_seconds=10,
+                  scroll_quiet_seconds=0.5, repeat=1):
+    """
+    Menjalankan scraper terhadap server replay.
+
+    Returns:
+        dict: Hasil benchmark (halaman/menit, kartu/detik, round-trip per kartu,
+        puncak RSS dan ringkasan per tahap).
+    """
+    metrics_dir = tempfile.mkdtemp(prefix="scraper_benchmark_")
+    metrics = MetricsRecorder(os.path.join(metrics_dir, "metrics.jsonl"))
+    sampler = PeakRssSampler().start()
+
+    scraper = TokopediaScraper(
+        headless=True, base_url=server_url, extraction_mode=mode,
+        scroll_max_seconds=scroll_max_seconds, scroll_quiet_seconds=scroll_quiet_seconds,
+        rate_limiter=PolitenessScheduler(rate=rate), metrics=metrics,
+        debug_dir=os.path.join(metrics_dir, "debug")
+    )
+    started = time.perf_counter()
+    products = 0
+    try:
+        for _ in range(repeat):
+            for query, page in tasks:
+                products += len(scraper.scrape_page(query, page))
+    finally:
+        elapsed = time.perf_counter() - started
+        scraper.close()
+        peak_rss = sampler.stop()
+
+    return {
+        "mode": mode,
+        "pages": metrics.pages,
+        "cards": metrics.cards,
+        "products": products,
+        "elapsed_seconds": elapsed,
+        "pages_per_minute": metrics.pages / elapsed * 60 if elapsed else 0.0,
+        "cards_per_second": metrics.cards / elapsed if elapsed else 0.0,
+        "webdriver_commands": metrics.webdriver_commands,
+        "round_trips_per_card": metrics.webdriver_commands / metrics.cards if metrics.cards else None,
+        "peak_rss_mb": peak_rss / (1024 * 1024),
+        "peak_rss_includes_browser": sampler.includes_children,
+        "stages": metrics.summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper offline terhadap halaman yang direkam.")
+    parser.add_argument("--pages", nargs="*", default=[],
+                        help="File HTML atau pola glob halaman hasil pencarian yang berisi kartu produk")
+    parser.add_argument("--recordings", help="Direktori rekaman dari TokopediaHttpScraper(record_dir=...)")
+    parser.add_argument("--mode", choices=TokopediaScraper.EXTRACTION_MODES, default="batch")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Request per detik untuk rate limiter (default: tanpa jeda)")
+    parser.add_argument("--scroll-max-seconds", type=float, default=10)
+    parser.add_argument("--scroll-quiet-seconds", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+    logger = get_logger("benchmark")
+
+    if args.recordings:
+        pages = None
+        tasks = recorded_queries(args.recordings)
+    elif args.pages:
+        pages = load_html_pages(args.pages)
+        cards = count_cards(pages)
+        if pages and not any(cards):
+            logger.error(
+                f"Tidak ada kartu produk di {len(pages)} halaman yang diberikan; hasil benchmark akan 0 kartu/detik. "
+                "Gunakan halaman hasil pencarian yang berisi produk (bukan tangkapan debug_pic/)."
+            )
+            return 1
+        if not all(cards):
+            logger.warning(f"{cards.count(0)} dari {len(pages)} halaman tidak berisi kartu produk.")
+        tasks = [(QUERY, page) for page in range(1, len(pages) + 1)]
+    else:
+        parser.error("Berikan --pages atau --recordings.")
+    if not tasks:
+        logger.error("Tidak ada halaman untuk di-benchmark.")
+        return 1
+
+    with build_server(pages, args.recordings) as server:
+        logger.info(f"Melayani {len(tasks)} halaman dari {server.url}")
+        result = run_benchmark(
+            tasks, server.url, mode=args.mode, rate=args.rate,
+            scroll_max_seconds=args.scroll_max_seconds,
+            scroll_quiet_seconds=args.scroll_quiet_seconds, repeat=args.repeat
+        )
+
+    round_trips = result["round_trips_per_card"]
+    logger.info(
+        f"[{result['mode']}] {result['pages']} halaman, {result['cards']} kartu dalam "
+        f"{result['elapsed_seconds']:.1f} detik: {result['pages_per_minute']:.1f} halaman/menit, "
+        f"{result['cards_per_second']:.1f} kartu/detik, "
+        f"{'-' if round_trips is None else f'{round_trips:.2f}'} round-trip WebDriver/kartu, "
+        f"puncak RSS {result['peak_rss_mb']:.0f} MB"
+        f"{'' if result['peak_rss_includes_browser'] else ' (tanpa Chrome; pasang psutil)'}"
+    )
+    for name, row in sorted(result["stages"].items(), key=lambda item: -item[1]["total"]):
+        logger.info(f"  {name:<16} rata-rata {row['mean']:.3f} detik, p95 {row['p95']:.3f} detik")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    if not result["cards"]:
+        logger.error("Scraper tidak mengekstrak kartu apa pun; periksa halaman input dan selector.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
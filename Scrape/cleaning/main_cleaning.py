@@ -9,14 +9,33 @@ from utils.classifiers import (
     classify_product_vco
 )
 
+# Membaca hasil ekspor: .jsonl (ekspor inkremental, satu dokumen per baris) atau .json (array)
+def load_records(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        if not filepath.endswith('.jsonl'):
+            return json.load(f)
+        records = []
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Baris terakhir bisa terpotong jika ekspor terhenti
+                continue
+        return records
+
+# Memilih file input: .jsonl dari export_incremental.py jika ada, selain itu .json lama
+def resolve_input(data_dir, stem):
+    jsonl_path = os.path.join(data_dir, stem + ".jsonl")
+    return jsonl_path if os.path.exists(jsonl_path) else os.path.join(data_dir, stem + ".json")
+
 # Fungsi utama untuk membersihkan dan klasifikasi
 def process_file(filepath, keywords, classify_func=None):
     print(f"🔍 Membuka file: {os.path.abspath(filepath)}")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
 
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(load_records(filepath))
 
     # Cleaning step
     df = remove_irrelevant_products(df, keywords)
@@ -44,25 +63,25 @@ if __name__ == "__main__":
 
     datasets = [
         {
-            "filename": "Result_db.products_tokopedia_briket_kelapa.json",
+            "filename": "Result_db.products_tokopedia_briket_kelapa",
             "keywords": ["briket", "arang", "kelapa"],
             "classifier": classify_product_briket,
             "output": "cleaned_briket_kelapa.json"
         },
         {
-            "filename": "Result_db.products_tokopedia_gula_aren.json",
+            "filename": "Result_db.products_tokopedia_gula_aren",
             "keywords": ["aren", "gula", "semut", "cair"],
             "classifier": classify_product_gula_aren,
             "output": "cleaned_gula_aren.json"
         },
         {
-            "filename": "Result_db.products_tokopedia_coconut_sugar.json",
+            "filename": "Result_db.products_tokopedia_coconut_sugar",
             "keywords": ["coconut", "sugar", "kelapa"],
             "classifier": classify_product_gula_aren,
             "output": "cleaned_coconut_sugar.json"
         },
         {
-            "filename": "Result_db.products_tokopedia_virgin_coconut_oil.json",
+            "filename": "Result_db.products_tokopedia_virgin_coconut_oil",
             "keywords": ["vco", "minyak", "coconut", "kelapa"],
             "classifier": classify_product_vco,
             "output": "cleaned_virgin_coconut_oil.json"
@@ -70,7 +89,7 @@ if __name__ == "__main__":
     ]
 
     for d in datasets:
-        input_path = os.path.join(base_path, "data", d["filename"])
+        input_path = resolve_input(os.path.join(base_path, "data"), d["filename"])
         output_path = os.path.join(base_path, "output", d["output"])
 
         df_cleaned = process_file(input_path, d["keywords"], d["classifier"])
@@ -0,0 +1,68 @@
+# coordinator.py
+# Koordinator crawl terdistribusi: mengantrekan SEARCH_QUERIES x halaman ke
+# collection antrean MongoDB dan menampilkan progres para worker.
+#
+#   python coordinator.py --queries "gula aren" "gula pasir" --max-pages 50 --watch
+
+import argparse
+import os
+import time
+from dotenv import load_dotenv
+from database import Database
+from job_queue import JobQueue, PENDING, RUNNING, DONE, FAILED, SKIPPED
+from utils.logger_setup import get_logger
+
+load_dotenv()
+
+SEARCH_QUERIES = ["gula aren"]
+MAX_PAGES_PER_QUERY = 50
+
+
+def log_progress(logger, job_queue):
+    progress = job_queue.progress()
+    for query, counts in sorted(progress.items()):
+        total = sum(counts.get(status, 0) for status in (PENDING, RUNNING, DONE, FAILED, SKIPPED))
+        finished = counts.get(DONE, 0) + counts.get(SKIPPED, 0) + counts.get(FAILED, 0)
+        logger.info(
+            f"'{query}': {finished}/{total} selesai ({counts.get(DONE, 0)} done, {counts.get(SKIPPED, 0)} skipped, "
+            f"{counts.get(FAILED, 0)} failed, {counts.get(RUNNING, 0)} running), {counts['products']} produk"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mengantrekan item crawl dan memantau progres.")
+    parser.add_argument("--queries", nargs="+", default=SEARCH_QUERIES)
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES_PER_QUERY)
+    parser.add_argument("--retry-failed", action="store_true", help="Kembalikan item failed ke pending")
+    parser.add_argument("--watch", action="store_true", help="Tampilkan progres sampai antrean selesai")
+    parser.add_argument("--interval", type=float, default=30, help="Jeda antar laporan progres (detik)")
+    args = parser.parse_args()
+    logger = get_logger("coordinator")
+
+    MONGO_DB_URI = os.getenv("MONGO_URI")
+    if not MONGO_DB_URI:
+        logger.error("Variabel lingkungan MONGO_URI tidak ditemukan. Buat file .env.")
+        return
+
+    try:
+        db = Database(db_uri=MONGO_DB_URI, db_name="harga_komoditas_db")
+    except Exception:
+        return
+    job_queue = JobQueue(db)
+
+    try:
+        job_queue.enqueue(args.queries, args.max_pages)
+        if args.retry_failed:
+            logger.info(f"{job_queue.retry_failed(args.queries)} item failed dikembalikan ke pending")
+        log_progress(logger, job_queue)
+        while args.watch and not job_queue.is_finished():
+            time.sleep(args.interval)
+            log_progress(logger, job_queue)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
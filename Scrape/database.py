@@ -1,28 +1,123 @@
 # database.py
 # Modul ini bertanggung jawab untuk semua interaksi dengan database MongoDB.
 
+import datetime
+import os
+import threading
+import time
 import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import AutoReconnect, BulkWriteError, ConnectionFailure, ExecutionTimeout, PyMongoError
 from urllib.parse import quote_plus
 from utils.logger_setup import get_logger # Menggunakan logger yang sudah dikonfigurasi
+from storage.base import ProductStorage
 
-class Database:
+# Field yang hanya diisi saat dokumen pertama kali dibuat pada mode upsert
+# (agar dokumen yang datanya sama tidak dihitung "diperbarui")
+_INSERT_ONLY_FIELDS = ("timestamp_scrape",)
+
+# Collection riwayat harga: satu snapshot per produk per run scraping
+SNAPSHOT_COLLECTION = "price_snapshots"
+
+# Format pengelompokan waktu untuk get_category_history
+_BUCKET_FORMATS = {"hour": "%Y-%m-%dT%H:00", "day": "%Y-%m-%d", "month": "%Y-%m"}
+
+# Opsi connection pool untuk MongoClient bersama (bisa diubah lewat environment)
+CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", 50)),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", 0)),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_MS", 60000)),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000)),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 10000)),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 60000)),
+    "retryWrites": True,
+}
+
+# Error yang layak dicoba ulang (koneksi putus, failover replica set, timeout)
+_TRANSIENT_ERRORS = (AutoReconnect, ConnectionFailure, ExecutionTimeout)
+
+# Kode error duplicate key: dokumen sudah tertulis pada percobaan sebelumnya
+_DUPLICATE_KEY = 11000
+
+_clients_lock = threading.Lock()
+# db_uri -> [MongoClient, jumlah Database yang memakai]
+_clients = {}
+
+
+def get_client(db_uri):
+    """
+    MongoClient bersama untuk satu proses per URI (thread-safe, satu connection pool).
+    Koneksi diverifikasi dengan ping sekali saat client pertama kali dibuat.
+    """
+    with _clients_lock:
+        entry = _clients.get(db_uri)
+        if entry is None:
+            client = pymongo.MongoClient(db_uri, **CLIENT_OPTIONS)
+            try:
+                client.admin.command('ping')
+            except Exception:
+                client.close()
+                raise
+            entry = _clients[db_uri] = [client, 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def release_client(db_uri):
+    """Melepas satu pemakai client bersama; client ditutup saat pemakai terakhir selesai."""
+    with _clients_lock:
+        entry = _clients.get(db_uri)
+        if entry is None:
+            return False
+        entry[1] -= 1
+        if entry[1] > 0:
+            return False
+        del _clients[db_uri]
+    entry[0].close()
+    return True
+
+
+def _is_transient(error):
+    if isinstance(error, _TRANSIENT_ERRORS):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+
+
+class Database(ProductStorage):
     """
     Kelas untuk mengelola koneksi dan operasi database MongoDB.
     """
-    def __init__(self, db_uri, db_name="ecommerce_data"):
+    name = "mongo"
+
+    def __init__(self, db_uri, db_name="ecommerce_data", client=None, spool=None,
+                 write_retries=4, retry_backoff=1.0):
         """
         Inisialisasi koneksi ke database.
         
         Args:
             db_uri (str): Connection string untuk MongoDB Atlas.
             db_name (str): Nama database yang akan digunakan.
+            client (optional): Client yang sudah jadi (misal `mongomock.MongoClient()`
+                untuk pengujian); jika diisi, `db_uri` diabaikan. Tanpa client, dipakai
+                client bersama per proses dari `get_client`.
+            spool (WriteSpool, optional): Tempat batch yang tetap gagal setelah retry.
+            write_retries (int): Jumlah percobaan ulang untuk error sementara.
+            retry_backoff (float): Jeda awal (detik) antar percobaan, berlipat dua tiap kali.
         """
-        self.logger = get_logger("database")
+        super().__init__("database")
         self.client = None
+        self.db_uri = db_uri
+        self._shared_client = client is None
+        self.spool = spool
+        self.write_retries = write_retries
+        self.retry_backoff = retry_backoff
+        self._indexed_collections = set()
+        self._snapshot_ready = False
         try:
-            self.client = pymongo.MongoClient(db_uri)
-            # Verifikasi koneksi
-            self.client.admin.command('ping')
+            if client is not None:
+                self.client = client
+            else:
+                self.client = get_client(db_uri)
             self.db = self.client[db_name]
             self.logger.info(f"Berhasil terhubung ke MongoDB. Database: '{db_name}'.")
         except pymongo.errors.ConnectionFailure as e:
@@ -32,43 +127,415 @@ class Database:
             self.logger.error(f"Terjadi error saat inisialisasi database: {e}")
             raise
         
-    def save_products(self, products, collection_name):
+    def save_products(self, products, collection_name, upsert=False, batch_size=1000):
         """
         Menyimpan daftar produk ke dalam collection yang ditentukan.
         
         Args:
             products (list): Daftar dictionary produk yang akan disimpan.
             collection_name (str): Nama collection (tabel) tempat menyimpan data.
+            upsert (bool): Jika True, produk disimpan idempoten lewat `bulk_write` tidak
+                berurutan dengan kunci (product_id, scrape_date): menjalankan ulang query di
+                hari yang sama memperbarui dokumen yang ada alih-alih menduplikasinya.
+            batch_size (int): Jumlah operasi per `bulk_write` pada mode upsert.
+
+        Returns:
+            int: Jumlah produk yang tersimpan (0 jika gagal). Rincian inserted/updated/
+            unchanged ada di `last_write_stats`.
         """
         if not products:
             self.logger.warning("Tidak ada produk untuk disimpan.")
-            return
+            return 0
+
+        return self._save_products(products, collection_name, upsert, batch_size, use_spool=True)
 
+    def _save_products(self, products, collection_name, upsert, batch_size, use_spool):
         try:
-            collection = self.db[collection_name]
-            result = collection.insert_many(products)
-            self.logger.info(f"Berhasil menyimpan {len(result.inserted_ids)} produk ke collection '{collection_name}'.")
+            return self._with_retry(
+                lambda: self._write_products(products, collection_name, upsert, batch_size),
+                f"menyimpan produk ke '{collection_name}'"
+            )
         except Exception as e:
             self.logger.error(f"Gagal menyimpan produk ke collection '{collection_name}': {e}")
+            if not (use_spool and self.spool):
+                return 0
+            try:
+                self.spool.append(collection_name, products, upsert)
+            except Exception as spool_error:
+                self.logger.error(f"Gagal menulis batch ke spool: {spool_error}")
+                return 0
+            self.last_write_stats = {"inserted": 0, "updated": 0, "unchanged": 0, "spooled": len(products)}
+            self.logger.warning(
+                f"{len(products)} produk untuk '{collection_name}' disimpan ke spool {self.spool.path}; "
+                f"akan ditulis ulang pada run berikutnya."
+            )
+            return len(products)
+
+    def _with_retry(self, operation, description):
+        """Menjalankan `operation`, mencoba ulang dengan backoff eksponensial untuk error sementara."""
+        delay = self.retry_backoff
+        for attempt in range(self.write_retries + 1):
+            try:
+                return operation()
+            except Exception as e:
+                if attempt == self.write_retries or not _is_transient(e):
+                    raise
+                self.logger.warning(f"Error sementara saat {description} (percobaan {attempt + 1}): {e}; "
+                                    f"coba lagi dalam {delay:.1f} detik")
+                time.sleep(delay)
+                delay *= 2
+
+    def _write_products(self, products, collection_name, upsert, batch_size):
+        collection = self.db[collection_name]
+        self.ensure_indexes(collection_name)
+        if upsert:
+            return self._upsert_products(collection, products, batch_size)
+        inserted = self._insert_many(collection, products)
+        self.last_write_stats = {"inserted": inserted, "updated": 0, "unchanged": 0}
+        self.logger.info(f"Berhasil menyimpan {inserted} produk ke collection '{collection_name}'.")
+        return inserted
+
+    @staticmethod
+    def _insert_many(collection, documents):
+        # insert_many mengisi `_id` pada dict dokumen, sehingga percobaan ulang setelah
+        # koneksi putus hanya menghasilkan duplicate key untuk dokumen yang sudah masuk
+        try:
+            return len(collection.insert_many(documents, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != _DUPLICATE_KEY for error in errors):
+                raise
+            return e.details.get("nInserted", 0) + len(errors)
+
+    def replay_spool(self):
+        """
+        Menulis ulang batch yang tersimpan di spool dari run sebelumnya. Batch yang
+        masih gagal tetap di spool.
+
+        Returns:
+            int: Jumlah batch yang berhasil ditulis.
+        """
+        if not self.spool:
+            return 0
+
+        def write(entry):
+            if entry.get("kind") == "snapshots":
+                snapshots = entry["products"]
+                return self._write_snapshots(snapshots, entry["collection"]) == len(snapshots)
+            products = entry["products"]
+            saved = self._save_products(products, entry["collection"], entry.get("upsert", False),
+                                        1000, use_spool=False)
+            return saved == len(products)
+
+        written, remaining = self.spool.replay(write)
+        if written or remaining:
+            self.logger.info(f"Spool diputar ulang: {written} batch tertulis, {remaining} batch tersisa.")
+        return written
+
+    def _upsert_products(self, collection, products, batch_size):
+        # Produk yang sama dalam satu panggilan digabung (terakhir menang) agar upsert
+        # paralel pada kunci yang sama tidak saling bertabrakan di unique index
+        keyed = {}
+        for product in products:
+            keyed[self.product_key(product)] = product
+
+        stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+        operations = []
+        for (product_id, scrape_date), product in keyed.items():
+            fields = {key: value for key, value in product.items() if key != "_id"}
+            on_insert = {key: fields.pop(key) for key in _INSERT_ONLY_FIELDS if key in fields}
+            on_insert.update(product_id=product_id, scrape_date=scrape_date)
+            operations.append(UpdateOne(
+                {"product_id": product_id, "scrape_date": scrape_date},
+                {"$set": fields, "$setOnInsert": on_insert},
+                upsert=True
+            ))
+
+        for start in range(0, len(operations), batch_size):
+            result = collection.bulk_write(operations[start:start + batch_size], ordered=False)
+            stats["inserted"] += result.upserted_count
+            stats["updated"] += result.modified_count
+            stats["unchanged"] += result.matched_count - result.modified_count
+
+        self.last_write_stats = stats
+        self.logger.info(
+            f"Upsert ke '{collection.name}': {stats['inserted']} baru, {stats['updated']} diperbarui, "
+            f"{stats['unchanged']} tidak berubah ({len(products) - len(keyed)} duplikat dalam batch)."
+        )
+        return len(products)
+
+    def ensure_indexes(self, collection_name):
+        """
+        Membuat index pendukung sekali per collection: unique (product_id, scrape_date)
+        untuk upsert (hanya dokumen yang punya product_id, sehingga data lama hasil
+        insert_many tetap valid) serta index sekunder untuk query umum.
+        """
+        if collection_name in self._indexed_collections:
+            return
+        collection = self.db[collection_name]
+        collection.create_index(
+            [("product_id", pymongo.ASCENDING), ("scrape_date", pymongo.ASCENDING)],
+            unique=True, name="product_id_scrape_date",
+            partialFilterExpression={"product_id": {"$exists": True}}
+        )
+        collection.create_index([("search_query", pymongo.ASCENDING)], name="search_query")
+        collection.create_index([("timestamp_scrape", pymongo.ASCENDING)], name="timestamp_scrape")
+        collection.create_index([("shop_name", pymongo.ASCENDING)], name="shop_name")
+        self._indexed_collections.add(collection_name)
+
+    def count_documents(self, collection_name, query=None):
+        """Jumlah dokumen yang cocok dengan filter."""
+        return self.db[collection_name].count_documents(query or {})
+
+    def drop_collection(self, collection_name):
+        """Menghapus collection beserta index-nya."""
+        self.db[collection_name].drop()
+        self._indexed_collections.discard(collection_name)
+
+    def iter_known_products(self, collection_name):
+        """
+        Mengiterasi field minimal (URL, harga, terjual) dari produk yang sudah tersimpan,
+        urut dari yang terlama agar data terbaru menimpa data lama di indeks.
+        """
+        projection = {"_id": 0, "product_url": 1, "price_raw": 1, "sold_count_raw": 1}
+        try:
+            yield from self.db[collection_name].find({}, projection).sort("_id", pymongo.ASCENDING)
+        except Exception as e:
+            self.logger.error(f"Gagal membaca produk yang sudah dikenal dari '{collection_name}': {e}")
+
+    def ensure_snapshot_collection(self):
+        """
+        Menyiapkan collection `price_snapshots` sebagai time-series collection
+        (timeField "ts", metaField "meta") jika server mendukung (MongoDB 5.0+), atau
+        collection biasa jika tidak, beserta index (product_id, ts) dan (search_query, ts).
+        """
+        if self._snapshot_ready:
+            return
+        if SNAPSHOT_COLLECTION not in self.db.list_collection_names():
+            try:
+                self.db.create_collection(
+                    SNAPSHOT_COLLECTION,
+                    timeseries={"timeField": "ts", "metaField": "meta", "granularity": "hours"}
+                )
+            except Exception as e:
+                self.logger.warning(f"Time-series collection tidak didukung, memakai collection biasa: {e}")
+                if SNAPSHOT_COLLECTION not in self.db.list_collection_names():
+                    self.db.create_collection(SNAPSHOT_COLLECTION)
+        collection = self.db[SNAPSHOT_COLLECTION]
+        collection.create_index([("meta.product_id", pymongo.ASCENDING), ("ts", pymongo.ASCENDING)],
+                                name="product_id_ts")
+        collection.create_index([("meta.search_query", pymongo.ASCENDING), ("ts", pymongo.ASCENDING)],
+                                name="search_query_ts")
+        self._snapshot_ready = True
+
+    def save_snapshots(self, products, search_query, run_id=None):
+        """
+        Menyimpan satu snapshot harga/terjual per produk ke `price_snapshots`.
+
+        Args:
+            products (list): Produk hasil scraping (dengan timestamp_scrape).
+            search_query (str): Query/kategori produk.
+            run_id (str, optional): Penanda run scraping.
+
+        Returns:
+            int: Jumlah snapshot yang tersimpan atau masuk spool (0 jika gagal).
+        """
+        if not products:
+            return 0
+        snapshots = []
+        for product in products:
+            product_id, _ = self.product_key(product)
+            try:
+                ts = datetime.datetime.fromisoformat(product.get("timestamp_scrape"))
+            except (TypeError, ValueError):
+                ts = datetime.datetime.now()
+            snapshots.append({
+                "ts": ts,
+                "meta": {
+                    "product_id": product_id,
+                    "search_query": search_query,
+                    "ecommerce": product.get("ecommerce"),
+                    "shop_name": product.get("shop_name"),
+                },
+                "price": product.get("price_clean"),
+                "sold_count": product.get("sold_count_clean"),
+                "run_id": run_id,
+            })
+        try:
+            return self._with_retry(lambda: self._write_snapshots(snapshots),
+                                    f"menyimpan snapshot harga untuk '{search_query}'")
+        except Exception as e:
+            self.logger.error(f"Gagal menyimpan snapshot harga untuk '{search_query}': {e}")
+            if not self.spool:
+                return 0
+            # Sama seperti batch produk: snapshot disimpan ke spool dan ditulis ulang di run berikutnya
+            try:
+                self.spool.append(SNAPSHOT_COLLECTION, snapshots, kind="snapshots")
+            except Exception as spool_error:
+                self.logger.error(f"Gagal menulis snapshot ke spool: {spool_error}")
+                return 0
+            self.logger.warning(f"{len(snapshots)} snapshot untuk '{search_query}' disimpan ke spool {self.spool.path}.")
+            return len(snapshots)
+
+    def _write_snapshots(self, snapshots, collection_name=SNAPSHOT_COLLECTION):
+        self.ensure_snapshot_collection()
+        return self._insert_many(self.db[collection_name], snapshots)
+
+    @staticmethod
+    def _time_filter(start=None, end=None):
+        time_filter = {}
+        if start is not None:
+            time_filter["$gte"] = start
+        if end is not None:
+            time_filter["$lt"] = end
+        return time_filter
+
+    def get_price_history(self, product_id=None, product_url=None, start=None, end=None):
+        """
+        Riwayat harga dan terjual satu produk, urut waktu. Memakai index (product_id, ts).
+
+        Args:
+            product_id (str, optional): ID kanonik produk (lihat `product_key`).
+            product_url (str, optional): Alternatif product_id; ID diambil dari URL.
+            start, end (datetime, optional): Rentang waktu [start, end).
+
+        Returns:
+            list: [{"ts", "price", "sold_count", "run_id"}, ...]
+        """
+        if product_id is None:
+            product_id, _ = self.product_key({"product_url": product_url})
+        query = {"meta.product_id": product_id}
+        time_filter = self._time_filter(start, end)
+        if time_filter:
+            query["ts"] = time_filter
+        projection = {"_id": 0, "ts": 1, "price": 1, "sold_count": 1, "run_id": 1}
+        try:
+            return list(self.db[SNAPSHOT_COLLECTION].find(query, projection).sort("ts", pymongo.ASCENDING))
+        except Exception as e:
+            self.logger.error(f"Gagal membaca riwayat harga produk '{product_id}': {e}")
+            return []
+
+    def get_category_history(self, search_query, start=None, end=None, bucket="day"):
+        """
+        Riwayat harga satu kategori (query) per periode: rata-rata, minimum, maksimum
+        harga, total terjual yang tercatat, dan jumlah produk. Memakai index (search_query, ts).
+
+        Args:
+            search_query (str): Query/kategori.
+            start, end (datetime, optional): Rentang waktu [start, end).
+            bucket (str): "hour", "day" atau "month".
+
+        Returns:
+            list: [{"period", "avg_price", "min_price", "max_price", "sold_count", "products"}, ...]
+        """
+        match = {"meta.search_query": search_query, "price": {"$ne": None}}
+        time_filter = self._time_filter(start, end)
+        if time_filter:
+            match["ts"] = time_filter
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {"$dateToString": {"format": _BUCKET_FORMATS[bucket], "date": "$ts"}},
+                "avg_price": {"$avg": "$price"},
+                "min_price": {"$min": "$price"},
+                "max_price": {"$max": "$price"},
+                "sold_count": {"$sum": "$sold_count"},
+                "products": {"$addToSet": "$meta.product_id"},
+            }},
+            {"$sort": {"_id": 1}},
+        ]
+        try:
+            rows = self.db[SNAPSHOT_COLLECTION].aggregate(pipeline)
+            return [
+                {"period": row["_id"], "avg_price": row["avg_price"], "min_price": row["min_price"],
+                 "max_price": row["max_price"], "sold_count": row["sold_count"],
+                 "products": len(row["products"])}
+                for row in rows
+            ]
+        except Exception as e:
+            self.logger.error(f"Gagal membaca riwayat harga kategori '{search_query}': {e}")
+            return []
 
     def close_connection(self):
         """
         Menutup koneksi database.
         """
-        if self.client:
+        if not self.client:
+            return
+        if self._shared_client:
+            # Client bersama ditutup saat Database terakhir yang memakainya selesai
+            if release_client(self.db_uri):
+                self.logger.info("Koneksi ke MongoDB ditutup.")
+        else:
             self.client.close()
             self.logger.info("Koneksi ke MongoDB ditutup.")
-    def get_collection_data(self, collection_name, as_df=False):
+        self.client = None
+    def get_collection_data(self, collection_name, as_df=False, query=None, fields=None):
         """
         Mengambil data dari collection. Jika as_df=True, return DataFrame.
+        Seluruh hasil dimuat ke memori; untuk collection besar pakai `iter_collection_chunks`.
         """
         try:
-            collection = self.db[collection_name]
-            data = list(collection.find())
             if as_df:
                 import pandas as pd
-                return pd.DataFrame(data)
-            return data
+                chunks = list(self.iter_collection_chunks(collection_name, query, fields,
+                                                          output="dataframe", include_id=fields is None))
+                return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            collection = self.db[collection_name]
+            projection = {field: 1 for field in fields} if fields else None
+            return list(collection.find(query or {}, projection))
         except Exception as e:
             self.logger.error(f"Gagal membaca data dari '{collection_name}': {e}")
             return []
+
+    def iter_collection_chunks(self, collection_name, query=None, fields=None, chunk_size=5000,
+                               output="dataframe", include_id=False):
+        """
+        Membaca collection secara bertahap dengan projection dan filter di sisi server.
+        Setiap chunk disusun langsung sebagai kolom (satu list per field), sehingga
+        memori yang dipakai hanya sebesar satu chunk.
+
+        Args:
+            collection_name (str): Nama collection.
+            query (dict, optional): Filter MongoDB.
+            fields (list, optional): Field yang diambil; None berarti semua field.
+            chunk_size (int): Jumlah dokumen per chunk (juga batch_size cursor).
+            output (str): "dataframe" (pandas), "arrow" (pyarrow.Table) atau "columns"
+                (dict field -> list).
+            include_id (bool): Sertakan `_id`.
+
+        Yields:
+            Satu chunk sesuai `output`.
+        """
+        if output not in ("dataframe", "arrow", "columns"):
+            raise ValueError(f"Output tidak dikenal: {output}")
+        if output == "dataframe":
+            import pandas as pd
+            build = pd.DataFrame
+        elif output == "arrow":
+            import pyarrow as pa
+            build = pa.table
+        else:
+            build = dict
+
+        projection = {field: 1 for field in fields} if fields else {}
+        if not include_id:
+            projection["_id"] = 0
+        cursor = self.db[collection_name].find(query or {}, projection or None, batch_size=chunk_size)
+
+        columns = {field: [] for field in fields or ()}
+        rows = 0
+        for doc in cursor:
+            for field in doc:
+                if field not in columns:
+                    # Field baru di tengah chunk: isi None untuk baris sebelumnya
+                    columns[field] = [None] * rows
+            for field, values in columns.items():
+                values.append(doc.get(field))
+            rows += 1
+            if rows >= chunk_size:
+                yield build(columns)
+                columns = {field: [] for field in fields or ()}
+                rows = 0
+        if rows:
+            yield build(columns)
@@ -0,0 +1,212 @@
+# export_incremental.py
+# Ekspor inkremental collection produk ke input tahap cleaning (JSON Lines).
+# Setiap collection punya high-water mark (`_id` atau `timestamp_scrape`) sehingga
+# hanya dokumen baru sejak ekspor terakhir yang ditambahkan ke file .jsonl.
+#
+# Nilai mark dibuat di sisi klien oleh banyak proses penulis, jadi tidak dijamin
+# monoton: dokumen dengan mark sama dengan (atau sedikit di bawah) high-water mark
+# bisa tersimpan setelah ekspor. Karena itu setiap ekspor membaca ulang jendela
+# `lookback` di bawah high-water mark dengan `$gte` dan membuang dokumen yang sudah
+# pernah diekspor berdasarkan identitasnya (`_id`, atau isi baris jika tidak ada).
+#
+#   python export_incremental.py                       # semua collection default
+#   python export_incremental.py --collections products_tokopedia_gula_aren
+#   python export_incremental.py --full                # ekspor ulang dari awal
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+from dotenv import load_dotenv
+from storage import BACKENDS, PRODUCT_FIELDS, create_storage
+from utils.logger_setup import get_logger
+
+load_dotenv()
+
+# Collection yang dipakai cleaning/main_cleaning.py
+COLLECTIONS = [
+    "products_tokopedia_briket_kelapa",
+    "products_tokopedia_gula_aren",
+    "products_tokopedia_coconut_sugar",
+    "products_tokopedia_virgin_coconut_oil",
+]
+OUTPUT_DIR = os.path.join("cleaning", "data")
+# Jendela baca ulang di bawah high-water mark (lihat keterangan di atas)
+LOOKBACK_SECONDS = 600
+
+
+class ExportState:
+    """
+    High-water mark per collection, disimpan sebagai JSON kecil yang ditulis ulang
+    secara atomik setelah file ekspor selesai ditambahkan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._state = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._state = json.load(f)
+
+    def get(self, collection_name, mark_field):
+        """
+        High-water mark terakhir dan identitas dokumen yang sudah diekspor di jendela
+        lookback-nya. Returns (None, set()) jika belum pernah diekspor dengan field ini.
+        """
+        entry = self._state.get(collection_name, {})
+        if entry.get("mark_field") != mark_field:
+            return None, set()
+        return entry.get("high_water_mark"), set(entry.get("recent_ids", []))
+
+    def update(self, collection_name, mark_field, high_water_mark, recent_ids, exported):
+        entry = self._state.setdefault(collection_name, {"exported": 0})
+        if entry.get("mark_field") != mark_field:
+            entry["exported"] = 0
+        entry.update(mark_field=mark_field, high_water_mark=high_water_mark,
+                     recent_ids=sorted(recent_ids), exported=entry["exported"] + exported,
+                     updated_at=datetime.datetime.now().isoformat())
+        self._write()
+
+    def reset(self, collection_name):
+        self._state.pop(collection_name, None)
+        self._write()
+
+    def _write(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def _encode_mark(value, mark_field):
+    # ObjectId disimpan sebagai hex agar state tetap JSON biasa
+    return str(value) if mark_field == "_id" else value
+
+
+def _decode_mark(value, mark_field):
+    if value is None or mark_field != "_id":
+        return value
+    from bson import ObjectId
+    return ObjectId(value)
+
+
+def _lookback_mark(mark, mark_field, lookback):
+    """Batas bawah jendela baca ulang: `lookback` detik sebelum high-water mark."""
+    delta = datetime.timedelta(seconds=lookback)
+    if mark_field == "_id":
+        from bson import ObjectId
+        return ObjectId.from_datetime(mark.generation_time - delta)
+    return (datetime.datetime.fromisoformat(mark) - delta).isoformat()
+
+
+def _identity(doc_id, line):
+    # `_id` (MongoDB) atau rowid (SQLite); Parquet tidak punya ID sehingga isi baris dipakai
+    if doc_id is not None:
+        return str(doc_id)
+    return hashlib.sha1(line.encode("utf-8")).hexdigest()
+
+
+def export_collection(storage, state, collection_name, output_path, mark_field, chunk_size=5000,
+                      lookback=LOOKBACK_SECONDS):
+    """
+    Menambahkan dokumen baru ke `output_path`: dokumen dengan `mark_field` >= high-water
+    mark dikurangi `lookback` detik, kecuali yang identitasnya sudah pernah diekspor.
+
+    Returns:
+        int: Jumlah dokumen baru yang ditulis.
+    """
+    stored_mark, exported_ids = state.get(collection_name, mark_field)
+    mark = _decode_mark(stored_mark, mark_field)
+    query = {mark_field: {"$gte": _lookback_mark(mark, mark_field, lookback)}} if mark is not None else None
+    fields = list(PRODUCT_FIELDS)
+    high_water_mark = mark
+    # (mark, identitas) setiap dokumen di jendela, untuk menyusun recent_ids berikutnya
+    window = []
+    written = 0
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as f:
+        for chunk in storage.iter_collection_chunks(collection_name, query, fields, chunk_size,
+                                                    output="columns", include_id=True):
+            ids = chunk.pop("_id", None)
+            marks = ids if mark_field == "_id" else chunk[mark_field]
+            names = list(chunk)
+            lines = []
+            for index, values in enumerate(zip(*chunk.values())):
+                line = json.dumps(dict(zip(names, values)), ensure_ascii=False, default=str) + "\n"
+                identity = _identity(ids[index] if ids else None, line)
+                window.append((marks[index], identity))
+                if identity in exported_ids:
+                    continue
+                exported_ids.add(identity)
+                lines.append(line)
+            f.writelines(lines)
+            written += len(lines)
+            chunk_max = max((value for value in marks if value is not None), default=None)
+            if chunk_max is not None and (high_water_mark is None or chunk_max > high_water_mark):
+                high_water_mark = chunk_max
+        f.flush()
+        os.fsync(f.fileno())
+
+    # State diperbarui setelah file aman di disk; crash sebelum ini hanya menyebabkan
+    # dokumen diekspor ulang (dibuang oleh drop_duplicates saat cleaning)
+    if written:
+        lower = _lookback_mark(high_water_mark, mark_field, lookback)
+        recent_ids = {identity for value, identity in window if value is not None and value >= lower}
+        state.update(collection_name, mark_field, _encode_mark(high_water_mark, mark_field), recent_ids, written)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor inkremental collection produk ke JSON Lines.")
+    parser.add_argument("--collections", nargs="+", default=COLLECTIONS)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--backend", choices=BACKENDS, default=os.getenv("STORAGE_BACKEND", "mongo"))
+    parser.add_argument("--mark-field", choices=["_id", "timestamp_scrape"],
+                        help="Default: _id untuk mongo, timestamp_scrape untuk backend lokal")
+    parser.add_argument("--full", action="store_true", help="Hapus file dan state lalu ekspor dari awal")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--lookback-seconds", type=int, default=LOOKBACK_SECONDS,
+                        help="Jendela baca ulang di bawah high-water mark untuk dokumen yang terlambat tersimpan")
+    args = parser.parse_args()
+    logger = get_logger("export")
+
+    mark_field = args.mark_field or ("_id" if args.backend == "mongo" else "timestamp_scrape")
+    if mark_field == "_id" and args.backend != "mongo":
+        logger.error("High-water mark _id hanya tersedia untuk backend mongo.")
+        return
+    MONGO_DB_URI = os.getenv("MONGO_URI")
+    if args.backend == "mongo" and not MONGO_DB_URI:
+        logger.error("Variabel lingkungan MONGO_URI tidak ditemukan. Buat file .env.")
+        return
+
+    try:
+        storage = create_storage(args.backend, db_uri=MONGO_DB_URI, db_name="harga_komoditas_db")
+    except Exception as e:
+        logger.error(f"Gagal menyiapkan penyimpanan '{args.backend}': {e}")
+        return
+    state = ExportState(os.path.join(args.output_dir, "export_state.json"))
+
+    try:
+        for collection_name in args.collections:
+            # Nama file mengikuti hasil mongoexport sebelumnya: Result_db.<collection>.jsonl
+            output_path = os.path.join(args.output_dir, f"Result_db.{collection_name}.jsonl")
+            if args.full:
+                state.reset(collection_name)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+            written = export_collection(storage, state, collection_name, output_path, mark_field,
+                                        args.chunk_size, args.lookback_seconds)
+            logger.info(f"'{collection_name}': {written} dokumen baru ditambahkan ke {output_path}")
+    finally:
+        storage.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# job_queue.py
+# Antrean kerja crawl terdistribusi di atas MongoDB: setiap item (query, page)
+# diklaim secara atomik dengan lease, sehingga worker di beberapa mesin bisa
+# berbagi pekerjaan dan item dari worker yang mati otomatis diambil ulang.
+
+import datetime
+import threading
+import pymongo
+from pymongo import ReturnDocument
+from utils.logger_setup import get_logger
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def _now():
+    # MongoDB menyimpan waktu UTC tanpa zona waktu
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class JobQueue:
+    """
+    Antrean item (query, page) di collection MongoDB.
+
+    Status item: pending -> running (diklaim, punya `lease_until`) -> done / failed /
+    skipped. Item running yang lease-nya habis dianggap pending lagi oleh `claim`.
+
+    Item yang diklaim proses ini dicatat sampai selesai/gagal; `start_heartbeat`
+    memperpanjang lease semuanya secara berkala, termasuk item yang halamannya
+    masih menunggu disimpan oleh ProductWriter (lihat `scraped` dan `page_saved`).
+    """
+
+    def __init__(self, db, collection_name="crawl_jobs", lease_seconds=600, max_attempts=3):
+        """
+        Args:
+            db (Database): Instance Database (pymongo atau mongomock).
+            collection_name (str): Collection tempat item antrean disimpan.
+            lease_seconds (int): Lama item dipegang worker sebelum boleh diklaim ulang.
+            max_attempts (int): Batas percobaan sebelum item ditandai failed.
+        """
+        self.logger = get_logger("JobQueue")
+        self.collection = db.db[collection_name]
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.collection.create_index([("query", pymongo.ASCENDING), ("page", pymongo.ASCENDING)], unique=True)
+        self.collection.create_index([("status", pymongo.ASCENDING), ("lease_until", pymongo.ASCENDING)])
+        # (query, page) -> [job, worker_id, page_status] untuk item yang dipegang proses ini
+        self._held = {}
+        self._held_lock = threading.Lock()
+        self._heartbeat = None
+        self._heartbeat_stop = threading.Event()
+
+    def enqueue(self, queries, max_pages):
+        """
+        Menambahkan item untuk setiap query x halaman 1..max_pages. Item yang sudah
+        ada (dari run sebelumnya) tidak diubah.
+
+        Returns:
+            int: Jumlah item baru.
+        """
+        now = _now()
+        added = 0
+        requested = 0
+        # update_one per item (bukan bulk_write) agar tetap kompatibel dengan mongomock;
+        # jumlah item hanya query x halaman, jadi biayanya kecil
+        for query in queries:
+            for page in range(1, max_pages + 1):
+                result = self.collection.update_one(
+                    {"query": query, "page": page},
+                    {"$setOnInsert": {"query": query, "page": page, "status": PENDING,
+                                      "attempts": 0, "created_at": now}},
+                    upsert=True
+                )
+                requested += 1
+                if result.upserted_id is not None:
+                    added += 1
+        self.logger.info(f"{added} item baru diantrekan ({requested} diminta)")
+        return added
+
+    def claim(self, worker_id):
+        """
+        Mengklaim satu item secara atomik (find_one_and_update).
+
+        Returns:
+            dict | None: Dokumen item yang diklaim, atau None jika tidak ada yang tersedia.
+        """
+        now = _now()
+        job = self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": PENDING},
+                    {"status": RUNNING, "lease_until": {"$lt": now}},
+                ],
+                "attempts": {"$lt": self.max_attempts},
+            },
+            {
+                "$set": {"status": RUNNING, "worker": worker_id, "claimed_at": now,
+                         "lease_until": now + datetime.timedelta(seconds=self.lease_seconds)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("page", pymongo.ASCENDING), ("query", pymongo.ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        if job is not None:
+            with self._held_lock:
+                self._held[(job["query"], job["page"])] = [job, worker_id, None]
+        return job
+
+    def _release(self, job):
+        with self._held_lock:
+            return self._held.pop((job["query"], job["page"]), None)
+
+    def _owned(self, job, worker_id):
+        return {"_id": job["_id"], "status": RUNNING, "worker": worker_id}
+
+    def extend_lease(self, job, worker_id):
+        """Memperpanjang lease item yang masih dipegang worker. False jika lease sudah hilang."""
+        result = self.collection.update_one(
+            self._owned(job, worker_id),
+            {"$set": {"lease_until": _now() + datetime.timedelta(seconds=self.lease_seconds)}}
+        )
+        # matched, bukan modified: perpanjangan dalam milidetik yang sama tidak mengubah nilai
+        return result.matched_count == 1
+
+    def complete(self, job, worker_id, products, page_status=None):
+        """
+        Menandai item selesai. Jika halaman adalah akhir hasil pencarian, item
+        halaman setelahnya untuk query yang sama ditandai skipped.
+
+        Returns:
+            bool: False jika lease sudah diambil alih worker lain; item lain tidak
+                diubah karena hasil worker ini tidak lagi berlaku.
+        """
+        self._release(job)
+        result = self.collection.update_one(
+            self._owned(job, worker_id),
+            {"$set": {"status": DONE, "products": products, "page_status": page_status,
+                      "finished_at": _now()},
+             "$unset": {"lease_until": ""}}
+        )
+        if result.matched_count == 0:
+            self.logger.warning(f"Lease '{job['query']}' halaman {job['page']} milik {worker_id} sudah "
+                                f"diambil alih worker lain; hasilnya diabaikan")
+            return False
+        if page_status == "end":
+            skipped = self.collection.update_many(
+                {"query": job["query"], "page": {"$gt": job["page"]}, "status": PENDING},
+                {"$set": {"status": SKIPPED, "finished_at": _now()}}
+            )
+            if skipped.modified_count:
+                self.logger.info(f"'{job['query']}': {skipped.modified_count} halaman setelah halaman "
+                                 f"{job['page']} dilewati (hasil pencarian habis)")
+        return True
+
+    def fail(self, job, worker_id, error):
+        """Mengembalikan item ke pending, atau failed jika percobaan sudah habis."""
+        self._release(job)
+        status = FAILED if job.get("attempts", 0) >= self.max_attempts else PENDING
+        self.collection.update_one(
+            self._owned(job, worker_id),
+            {"$set": {"status": status, "last_error": str(error)[:500], "finished_at": _now()},
+             "$unset": {"lease_until": ""}}
+        )
+        return status
+
+    def scraped(self, job, worker_id, page_status=None):
+        """
+        Mencatat bahwa halaman item sudah di-scrape dan sedang menuju stage penulis.
+        Item baru ditandai selesai oleh `page_saved` setelah produknya tersimpan.
+        """
+        with self._held_lock:
+            self._held[(job["query"], job["page"])] = [job, worker_id, page_status]
+
+    def page_saved(self, query, page, count):
+        """
+        Callback `on_page_saved` ProductWriter: menandai item selesai setelah semua
+        produk halamannya tersimpan (sama seperti CheckpointStore.mark_page_done).
+        """
+        with self._held_lock:
+            held = self._held.get((query, page))
+        if held is None:
+            return
+        job, worker_id, page_status = held
+        self.complete(job, worker_id, count, page_status)
+
+    def page_failed(self, query, page, error):
+        """Callback `on_page_failed` ProductWriter: item dikembalikan ke antrean."""
+        with self._held_lock:
+            held = self._held.get((query, page))
+        if held is not None:
+            job, worker_id, _ = held
+            self.fail(job, worker_id, error)
+
+    def start_heartbeat(self, interval=None):
+        """
+        Menjalankan thread yang memperpanjang lease semua item yang dipegang proses ini
+        setiap `interval` detik (default sepertiga `lease_seconds`).
+        """
+        if self._heartbeat:
+            return
+        interval = interval or self.lease_seconds / 3
+        self._heartbeat_stop.clear()
+        self._heartbeat = threading.Thread(target=self._run_heartbeat, args=(interval,),
+                                           name="JobQueueHeartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def stop_heartbeat(self):
+        if self._heartbeat:
+            self._heartbeat_stop.set()
+            self._heartbeat.join()
+            self._heartbeat = None
+
+    def renew_leases(self):
+        """
+        Memperpanjang lease semua item yang dipegang proses ini. Item yang lease-nya
+        sudah diambil alih worker lain berhenti dilacak.
+
+        Returns:
+            int: Jumlah lease yang diperpanjang.
+        """
+        with self._held_lock:
+            held = list(self._held.items())
+        renewed = 0
+        for key, (job, worker_id, _) in held:
+            try:
+                if self.extend_lease(job, worker_id):
+                    renewed += 1
+                    continue
+            except Exception as e:
+                self.logger.warning(f"Gagal memperpanjang lease '{key[0]}' halaman {key[1]}: {e}")
+                continue
+            self.logger.warning(f"Lease '{key[0]}' halaman {key[1]} hilang; item akan dikerjakan worker lain")
+            with self._held_lock:
+                if self._held.get(key, [None])[0] is job:
+                    del self._held[key]
+        return renewed
+
+    def _run_heartbeat(self, interval):
+        while not self._heartbeat_stop.wait(interval):
+            self.renew_leases()
+
+    def retry_failed(self, queries=None):
+        """Mengembalikan item failed ke pending dengan hitungan percobaan direset."""
+        query_filter = {"status": FAILED}
+        if queries:
+            query_filter["query"] = {"$in": list(queries)}
+        result = self.collection.update_many(query_filter, {"$set": {"status": PENDING, "attempts": 0}})
+        return result.modified_count
+
+    def fail_exhausted(self):
+        """
+        Menandai failed item running yang lease-nya habis dan percobaannya sudah habis
+        (worker mati pada percobaan terakhir), agar tidak tertahan sebagai running.
+        """
+        result = self.collection.update_many(
+            {"status": RUNNING, "lease_until": {"$lt": _now()}, "attempts": {"$gte": self.max_attempts}},
+            {"$set": {"status": FAILED, "last_error": "lease expired", "finished_at": _now()},
+             "$unset": {"lease_until": ""}}
+        )
+        return result.modified_count
+
+    def progress(self):
+        """
+        Ringkasan status per query.
+
+        Returns:
+            dict: Mapping query -> {status: jumlah, ..., "products": total produk}.
+        """
+        self.fail_exhausted()
+        summary = {}
+        pipeline = [{"$group": {"_id": {"query": "$query", "status": "$status"},
+                                "count": {"$sum": 1}, "products": {"$sum": "$products"}}}]
+        for row in self.collection.aggregate(pipeline):
+            entry = summary.setdefault(row["_id"]["query"], {"products": 0})
+            entry[row["_id"]["status"]] = row["count"]
+            entry["products"] += row.get("products") or 0
+        return summary
+
+    def is_finished(self):
+        """
+        True jika tidak ada lagi item pending atau running. Item proses ini yang sudah
+        di-scrape dan tinggal menunggu disimpan tidak dihitung.
+        """
+        self.fail_exhausted()
+        with self._held_lock:
+            saving = [job["_id"] for job, _, page_status in self._held.values() if page_status is not None]
+        query_filter = {"status": {"$in": [PENDING, RUNNING]}}
+        if saving:
+            query_filter["_id"] = {"$nin": saving}
+        return self.collection.count_documents(query_filter) == 0
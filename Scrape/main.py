@@ -1,18 +1,31 @@
 # main.py
 
 import os
+import datetime
 from dotenv import load_dotenv
-from database import Database
+from storage import create_storage
 from scrapers.tokopedia_scraper import TokopediaScraper
+from scrapers.scraper_pool import ScraperPool, default_worker_count
+from scrapers.http_scraper import TokopediaHttpScraper
 from utils.logger_setup import get_logger
+from utils.checkpoint import CheckpointStore
+from utils.pipeline import ProductWriter
+from utils.known_products import KnownProductIndex
+from utils.selector_stats import SelectorStats
+from utils.rate_limiter import PolitenessScheduler
+from utils.metrics import MetricsRecorder
+from utils.debug_store import DebugArtifactStore
+from utils.write_spool import WriteSpool
 
 load_dotenv()
 
 def main():
     logger = get_logger("main")
 
+    # Penyimpanan: "mongo" (default), atau "sqlite"/"parquet" untuk run lokal tanpa server database
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
     MONGO_DB_URI = os.getenv("MONGO_URI")
-    if not MONGO_DB_URI:
+    if STORAGE_BACKEND == "mongo" and not MONGO_DB_URI:
         logger.error("Variabel lingkungan MONGO_URI tidak ditemukan. Buat file .env.")
         return
 
@@ -20,41 +33,153 @@ def main():
     MAX_PRODUCTS_PER_QUERY = 500  
     MAX_PAGES_PER_QUERY = 50       
     RUN_IN_HEADLESS = False         
+    EXTRACTION_MODE = "batch"  # "html" | "batch" | "card"
+    NUM_WORKERS = min(default_worker_count(), len(SEARCH_QUERIES))
+    SPLIT_BY_PAGE = False  # True: pasangan (query, page) dibagi ke semua worker
+    SCRAPER_BACKEND = os.getenv("SCRAPER_BACKEND", "browser")  # "browser" | "http"
+    WRITE_BATCH_SIZE = 200
+    WRITE_FLUSH_SECONDS = 30  # Buffer query disimpan paling lambat setelah sekian detik
+    MAX_QUEUED_PAGES = 4  # Batas antrean halaman ke stage penulis (backpressure)
+    # Profil Chrome persisten per worker agar startup dan cache tetap hangat antar run
+    CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", "chrome_profiles")
+    # Resource yang diblokir: "image", "media", "font", "third_party" (kosongkan untuk perbandingan)
+    BLOCK_RESOURCES = ("image", "media", "font", "third_party")
+    # Penjadwal kesopanan bersama: request per detik per domain (semua worker digabung)
+    RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "0.5"))
+    RATE_LIMIT_BURST = 2
+    # Simpan idempoten (opt-in): produk yang sama di hari yang sama diperbarui, bukan
+    # diduplikasi. Dokumen lama hasil mode insert tidak punya product_id sehingga tidak
+    # pernah dicocokkan oleh upsert; aktifkan hanya untuk collection baru/terpisah.
+    UPSERT = os.getenv("STORAGE_UPSERT", "0") == "1"
+    INCREMENTAL = True  # Lewati produk yang sudah tersimpan dan harga/terjualnya tidak berubah
 
     try:
-        db = Database(db_uri=MONGO_DB_URI, db_name="harga_komoditas_db")
-    except Exception:
+        # Batch MongoDB yang tetap gagal setelah retry disimpan ke spool lokal dan ditulis ulang
+        # di run berikutnya; backend lokal tidak memakai spool
+        spool = WriteSpool(os.path.join("spool", "pending_writes.jsonl")) if STORAGE_BACKEND == "mongo" else None
+        db = create_storage(STORAGE_BACKEND, db_uri=MONGO_DB_URI, db_name="harga_komoditas_db", spool=spool)
+    except Exception as e:
+        logger.error(f"Gagal menyiapkan penyimpanan '{STORAGE_BACKEND}': {e}")
         return
+    db.replay_spool()
 
-    for query in SEARCH_QUERIES:
-        logger.info(f"===== Memulai Scraping untuk Query: '{query}' =====")
-        
-        scraper = TokopediaScraper(headless=RUN_IN_HEADLESS)
-        
-        try:
-            products = scraper.scrape(
-                search_query=query,
+    # Produk dialirkan per halaman ke stage penulis (thread terpisah) yang menyimpan
+    # secara batch sambil halaman berikutnya dimuat. Halaman dicatat di checkpoint
+    # setelah produknya tersimpan, sehingga run yang terhenti dilanjutkan dari
+    # halaman berikutnya yang belum selesai.
+    checkpoint = CheckpointStore(os.path.join("checkpoints", "scrape_checkpoint.json"))
+
+    def collection_for(query):
+        # Nama collection yang spesifik per query
+        return f"products_tokopedia_{query.replace(' ', '_')}"
+
+    # Waktu per tahap (navigasi, load, scroll, ekstraksi, tulis DB) per halaman, JSON-lines
+    metrics = MetricsRecorder(os.path.join("stats", "scrape_metrics.jsonl"))
+
+    # Setiap produk yang ditemukan juga dicatat sebagai snapshot riwayat harga untuk run ini,
+    # termasuk produk tidak berubah yang dilewati crawl inkremental
+    run_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    known_products = None
+
+    def unchanged_products(query):
+        return known_products.pop_unchanged(query) if known_products else []
+
+    def save_batch(query, products):
+        for p in products:
+            p["search_query"] = query
+        with metrics.timed("db_write", search_query=query, products=len(products)):
+            saved = db.save_products(products, collection_for(query), upsert=UPSERT)
+            if saved:
+                db.save_snapshots(products + unchanged_products(query), query, run_id)
+            return saved
+
+    if INCREMENTAL:
+        known_products = KnownProductIndex(track_unchanged=True)
+        for query in SEARCH_QUERIES:
+            loaded = known_products.load(query, db.iter_known_products(collection_for(query)))
+            logger.info(f"Indeks produk dikenal untuk '{query}': {loaded} produk")
+
+    writer = ProductWriter(save_batch, on_page_saved=checkpoint.mark_page_done,
+                           batch_size=WRITE_BATCH_SIZE, max_queue_pages=MAX_QUEUED_PAGES,
+                           flush_interval=WRITE_FLUSH_SECONDS)
+
+    # Statistik hit/miss selector disimpan antar run dan mengurutkan ulang fallback
+    selector_stats = SelectorStats(os.path.join("stats", "selector_stats.json"))
+
+    # Artefak debug dikompresi, dibatasi 200 MB, dan kegagalan berulang hanya disampel
+    debug_store = DebugArtifactStore("debug_artifacts", max_bytes=200 * 1024 * 1024)
+
+    # Satu token bucket per domain untuk semua worker; melambat otomatis saat ada sinyal throttling
+    rate_limiter = PolitenessScheduler(rate=RATE_LIMIT_PER_SECOND, burst=RATE_LIMIT_BURST)
+
+    if SCRAPER_BACKEND == "http":
+        # Tanpa browser: semua halaman diambil bersamaan lewat satu connection pool
+        pool = TokopediaHttpScraper(known_products=known_products, selector_stats=selector_stats,
+                                    rate_limiter=rate_limiter, metrics=metrics, debug_store=debug_store)
+    else:
+        pool = ScraperPool(TokopediaScraper, num_workers=NUM_WORKERS,
+                           headless=RUN_IN_HEADLESS, extraction_mode=EXTRACTION_MODE,
+                           known_products=known_products, selector_stats=selector_stats,
+                           profile_dir=CHROME_PROFILE_DIR, block_resources=BLOCK_RESOURCES,
+                           rate_limiter=rate_limiter, metrics=metrics, debug_store=debug_store)
+
+    try:
+        logger.info(f"===== Memulai Scraping untuk {len(SEARCH_QUERIES)} Query (backend: {SCRAPER_BACKEND}) =====")
+        writer.start()
+        if SCRAPER_BACKEND == "http":
+            pool.scrape_many(
+                SEARCH_QUERIES,
+                max_products=MAX_PRODUCTS_PER_QUERY,
+                max_pages=MAX_PAGES_PER_QUERY,
+                on_page_complete=writer.put,
+                checkpoint=checkpoint,
+                collect=False
+            )
+        else:
+            pool.run(
+                SEARCH_QUERIES,
                 max_products=MAX_PRODUCTS_PER_QUERY,
-                max_pages=MAX_PAGES_PER_QUERY
+                max_pages=MAX_PAGES_PER_QUERY,
+                split_pages=SPLIT_BY_PAGE,
+                on_page_complete=writer.put,
+                checkpoint=checkpoint,
+                collect=False
             )
-            
-           
-            for p in products:
-                p["search_query"] = query
-            
-            if products:
-                # Simpan dengan nama collection yang spesifik per query
-                collection_name = f"products_tokopedia_{query.replace(' ', '_')}"
-                db.save_products(products, collection_name)
-                logger.info(f"Berhasil menyimpan {len(products)} produk untuk query '{query}'")
-            else:
-                logger.warning(f"Tidak ada produk yang berhasil diambil untuk query '{query}'")
-                
-        except Exception as e:
-            logger.error(f"Error saat scraping query '{query}': {e}")
-        finally:
-            # Pastikan scraper ditutup untuk setiap query
-            scraper.close()
+            pool.report()
+
+    except Exception as e:
+        logger.error(f"Error saat scraping: {e}")
+    finally:
+        # Pastikan semua browser/session ditutup dan sisa buffer tersimpan
+        pool.close()
+        writer.close()
+        debug_store.close()
+
+    # Snapshot produk tidak berubah yang belum ikut tersimpan bersama batch (misal query
+    # yang semua produknya sudah dikenal)
+    for query in SEARCH_QUERIES:
+        db.save_snapshots(unchanged_products(query), query, run_id)
+
+    for query in SEARCH_QUERIES:
+        saved = writer.saved_counts.get(query, 0)
+        if saved:
+            logger.info(f"Berhasil menyimpan {saved} produk untuk query '{query}'")
+        else:
+            logger.warning(f"Tidak ada produk yang berhasil diambil untuk query '{query}'")
+        if query in pool.completed_queries and query not in writer.failed_queries:
+            checkpoint.clear(query)
+
+    selector_stats.save()
+    selector_stats.report(logger)
+    rate_limiter.report(logger)
+    metrics.report(logger)
+    debug_store.report(logger)
+
+    if known_products:
+        logger.info(
+            f"Crawl inkremental: {known_products.skipped}/{known_products.checked} produk dilewati "
+            f"(rasio skip {known_products.skip_ratio:.1%})"
+        )
 
     db.close_connection()
     logger.info("===== Semua Proses Scraping Selesai =====")
@@ -2,37 +2,104 @@
 
 import time
 import random
-import os
 import re
-import datetime
 from abc import ABC, abstractmethod
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from utils.logger_setup import get_logger
+from utils.driver_cache import resolve_chromedriver, acquire_profile_dir, release_profile_dir
+from utils.rate_limiter import PolitenessScheduler
+from utils.metrics import CommandCounter, PageMetrics, instrument_driver
+from utils.debug_store import DebugArtifactStore
 
 class BaseScraper(ABC):
     """
     Kelas dasar abstrak.
     """
-    def __init__(self, headless=True, debug_dir="debug_pic"):
+    # Mode ekstraksi: "html" (parse page_source offline), "batch" (satu script per
+    # halaman) atau "card" (query WebElement per kartu)
+    EXTRACTION_MODES = ("html", "batch", "card")
+
+    # URL dasar situs; bisa di-override lewat argumen base_url (misal ke server replay lokal)
+    BASE_URL = None
+
+    # Ukuran minimum (px) elemen CAPTCHA yang dianggap tantangan sungguhan. Badge dan
+    # iframe anchor reCAPTCHA tak terlihat (±256x60) di halaman normal lebih kecil dari ini.
+    CAPTCHA_MIN_SIZE = 100
+
+    # Pola URL yang diblokir lewat CDP Network.setBlockedURLs, per kategori resource
+    BLOCKED_URL_PATTERNS = {
+        "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.avif*"],
+        "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*"],
+        "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+        "third_party": [
+            "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+            "*googlesyndication.com*", "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*",
+            "*branch.io*", "*appsflyer.com*", "*criteo.*", "*tiktok.com*", "*newrelic.com*", "*nr-data.net*"
+        ]
+    }
+
+    def __init__(self, headless=True, debug_dir="debug_artifacts", extraction_mode="batch",
+                 adaptive_scroll=True, scroll_max_seconds=30, scroll_quiet_seconds=1.5,
+                 base_url=None, max_empty_pages=2, known_products=None, selector_stats=None,
+                 profile_dir=None, block_resources=None, resource_allowlist=None, rate_limiter=None,
+                 metrics=None, debug_store=None):
         self.logger = get_logger(self.__class__.__name__)
+        self.base_url = (base_url or self.BASE_URL or "").rstrip("/")
+        if extraction_mode not in self.EXTRACTION_MODES:
+            raise ValueError(f"extraction_mode harus salah satu dari {self.EXTRACTION_MODES}")
+        self.extraction_mode = extraction_mode
+        self.adaptive_scroll = adaptive_scroll
+        self.scroll_max_seconds = scroll_max_seconds
+        self.scroll_quiet_seconds = scroll_quiet_seconds
+        # Riwayat waktu tunggu scroll per halaman: {"page", "seconds", "polls", "cards", "timed_out"}
+        self.scroll_wait_log = []
+        # Berhenti setelah sekian halaman kosong berturut-turut
+        self.max_empty_pages = max_empty_pages
+        # Status halaman terakhir dari scrape_page: "ok", "empty", "end" (hasil pencarian habis),
+        # "timeout" (elemen awal tidak muncul) atau "captcha" (halaman verifikasi bot)
+        self.last_page_status = None
+        # Ringkasan run terakhir dari scrape(), termasuk halaman dan detik yang dihemat
+        self.run_summary = {}
+        # KnownProductIndex bersama (opsional) untuk melewati produk yang tidak berubah
+        self.known_products = known_products
+        # SelectorStats bersama (opsional) untuk telemetri dan pengurutan ulang selector
+        self.selector_stats = selector_stats
+        # Direktori dasar profil Chrome persisten (opsional); tiap worker memakai slot sendiri
+        self.profile_dir = profile_dir
+        self.profile_path = None
+        self.startup_seconds = None
+        # Kategori resource yang diblokir (subset dari BLOCKED_URL_PATTERNS); None = tidak ada
+        self.block_resources = tuple(block_resources or ())
+        # Substring URL yang tidak boleh diblokir walau cocok dengan pola di atas
+        self.resource_allowlist = list(resource_allowlist or [])
+        # Byte yang ditransfer dan waktu muat per halaman (dari Performance API)
+        self.page_transfer_log = []
+        # Penjadwal kesopanan per domain; berikan instance bersama agar semua worker terkoordinasi
+        self.rate_limiter = rate_limiter or PolitenessScheduler()
+        # MetricsRecorder bersama (opsional): waktu per tahap tiap halaman ditulis sebagai JSON-lines
+        self.metrics = metrics
+        self.page_metrics = None
+        self.command_counter = CommandCounter()
         self.driver = self._setup_driver(headless)
-        self.wait = WebDriverWait(self.driver, 20)
+        self.wait = WebDriverWait(self.driver, 20) if self.driver else None
         self.debug_dir = debug_dir
+        # Artefak debug (HTML gzip + screenshot) ditulis di thread latar belakang dengan batas ukuran;
+        # berikan instance bersama agar sampling dan batas disk berlaku untuk semua worker
+        self._owns_debug_store = debug_store is None
+        self.debug_store = debug_store or DebugArtifactStore(debug_dir)
         # Import By untuk digunakan di subclass
         self.By = By
-        if not os.path.exists(self.debug_dir):
-            os.makedirs(self.debug_dir)
 
     def _setup_driver(self, headless=True):
         """Mengkonfigurasi WebDriver"""
         self.logger.info("Menyiapkan Chrome WebDriver...")
+        started = time.perf_counter()
         chrome_options = Options()
         if headless:
             chrome_options.add_argument("--headless=new")  # Updated headless argument
@@ -53,119 +120,475 @@ class BaseScraper(ABC):
         chrome_options.add_experimental_option("useAutomationExtension", False)
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
 
+        # Profil startup cepat: lewati first-run, sinkronisasi, dan update komponen
+        chrome_options.add_argument("--no-first-run")
+        chrome_options.add_argument("--no-default-browser-check")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-component-update")
+        chrome_options.add_argument("--disable-sync")
+        # Navigasi selesai saat DOM siap; kelengkapan konten ditunggu oleh _wait_for_initial_load
+        chrome_options.page_load_strategy = "eager"
+
+        if "image" in self.block_resources:
+            # Gambar tidak didekode sama sekali, menghemat memori renderer
+            chrome_options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+
+        if self.profile_dir:
+            # Profil persisten: cache HTTP dan cookie tetap hangat antar run
+            self.profile_path = acquire_profile_dir(self.profile_dir)
+            chrome_options.add_argument(f"--user-data-dir={self.profile_path}")
+
+        # Path chromedriver di-resolve sekali lalu di-cache, tidak diunduh ulang per scraper
+        driver_path = resolve_chromedriver()
         try:
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+            if driver_path:
+                driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            else:
+                driver = webdriver.Chrome(options=chrome_options)
         except Exception as e:
             self.logger.warning(f"Falling back to default Chrome driver: {e}")
             driver = webdriver.Chrome(options=chrome_options)
         
         
         driver.set_page_load_timeout(30)
+        self._configure_network(driver)
+        # Setiap perintah WebDriver adalah satu round-trip; dihitung per halaman di metrik
+        self.command_counter = instrument_driver(driver)
+        self.startup_seconds = time.perf_counter() - started
+        self.logger.info(f"Chrome WebDriver siap dalam {self.startup_seconds:.2f} detik")
         return driver
 
-    def scrape(self, search_query, max_products, max_pages):
-        """Fungsi utama scraping dengan logika yang diperbaiki."""
-        self.logger.info(f"Initializing scraper for '{search_query}'...")
+    def _blocked_url_patterns(self):
+        """Pola URL yang diblokir sesuai `block_resources`, dikurangi allowlist."""
+        patterns = []
+        for category in self.block_resources:
+            patterns.extend(self.BLOCKED_URL_PATTERNS.get(category, []))
+        return [
+            pattern for pattern in patterns
+            if not any(allowed in pattern for allowed in self.resource_allowlist)
+        ]
+
+    def _configure_network(self, driver):
+        """
+        Memblokir resource yang tidak dibutuhkan grid produk lewat CDP dan memperbesar
+        buffer Resource Timing agar byte per halaman bisa diukur.
+        """
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                "source": "performance.setResourceTimingBufferSize(10000);"
+            })
+            patterns = self._blocked_url_patterns()
+            if patterns:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+                self.logger.info(f"Memblokir {len(patterns)} pola resource: {', '.join(self.block_resources)}")
+        except Exception as e:
+            self.logger.warning(f"Tidak bisa mengkonfigurasi pemblokiran resource: {e}")
+
+    def _measure_page_transfer(self, page):
+        """
+        Mencatat byte yang ditransfer dan waktu muat halaman dari Performance API.
+        transferSize bernilai 0 untuk resource lintas-domain tanpa Timing-Allow-Origin,
+        sehingga angkanya batas bawah yang konsisten untuk dibandingkan antar konfigurasi.
+        """
+        try:
+            stats = self.driver.execute_script("""
+                const nav = performance.getEntriesByType('navigation')[0] || {};
+                const resources = performance.getEntriesByType('resource');
+                let bytes = nav.transferSize || 0;
+                for (const r of resources) bytes += r.transferSize || 0;
+                return {
+                    bytes: bytes,
+                    requests: resources.length + 1,
+                    dom_content_loaded_ms: nav.domContentLoadedEventEnd || null,
+                    load_ms: nav.loadEventEnd || null
+                };
+            """)
+        except Exception:
+            return None
+        stats["page"] = page
+        self.page_transfer_log.append(stats)
+        self.logger.info(f"Page {page} transfer: {stats['bytes'] / 1024:.0f} KB in {stats['requests']} requests, "
+                         f"DOMContentLoaded {stats['dom_content_loaded_ms'] or 0:.0f} ms")
+        return stats
+
+    def scrape(self, search_query, max_products, max_pages, start_page=1, on_page_complete=None, collect=True):
+        """
+        Fungsi utama scraping dengan logika yang diperbaiki.
+
+        Args:
+            search_query (str): Kata kunci pencarian.
+            max_products (int): Batas jumlah produk.
+            max_pages (int): Halaman terakhir yang boleh diakses.
+            start_page (int): Halaman awal, dipakai untuk melanjutkan dari checkpoint.
+            on_page_complete (callable, optional): Dipanggil sebagai
+                `on_page_complete(search_query, page, products)` setiap halaman selesai
+                (status "ok"/"end"), misalnya untuk menyimpan produk dan checkpoint segera.
+                Halaman captcha/timeout/kosong tidak diserahkan dan dicatat di
+                `run_summary["failed_pages"]` agar diulang pada run berikutnya.
+            collect (bool): Jika False, produk tidak dikumpulkan di memori (hanya
+                diteruskan ke `on_page_complete`) dan hasilnya list kosong.
+        """
         all_products = []
+        failed_pages = []
+        try:
+            for page, products in self.iter_pages(search_query, max_products, max_pages, start_page):
+                if self.last_page_status not in ("ok", "end"):
+                    # Jangan sampai tercatat selesai di checkpoint
+                    failed_pages.append(page)
+                    self.logger.warning(f"Page {page} of '{search_query}' not completed "
+                                        f"({self.last_page_status}); it will be retried")
+                    continue
+                if on_page_complete:
+                    on_page_complete(search_query, page, products)
+                if collect:
+                    all_products.extend(products)
+        except Exception as e:
+            self.logger.critical(f"Error while handling scraped page: {str(e)}")
+            self.run_summary["stop_reason"] = "error"
+        if failed_pages:
+            self.run_summary["failed_pages"] = failed_pages
+        return all_products
+
+    def iter_pages(self, search_query, max_products, max_pages, start_page=1):
+        """
+        Generator yang menghasilkan `(page, products)` setiap satu halaman selesai.
+
+        Halaman berikutnya baru dimuat setelah konsumen meminta item berikutnya,
+        sehingga hanya produk satu halaman yang ditahan di memori.
+        """
+        self.logger.info(f"Initializing scraper for '{search_query}'...")
+        self.run_summary = {"search_query": search_query, "stop_reason": None}
+        total_products = 0
+        page_seconds = []
+        empty_page_seconds = []
+        consecutive_empty = 0
+        stop_reason = None
+        page = start_page
         
         try:
-            page = 1
-            while page <= max_pages and len(all_products) < max_products:
-                url = self._get_url(search_query, page)
-                
-                print(f"\n===== ACCESSING PAGE {page} =====")
-                self.logger.info(f"Opening search page: {url}")
-                self.driver.get(url)
+            while page <= max_pages and total_products < max_products:
+                page_started = time.perf_counter()
+                products = self.scrape_page(search_query, page, max_products - total_products)
+                total_products += len(products)
+                page_seconds.append(time.perf_counter() - page_started)
 
-                
-                print("Waiting for page to load completely...")
-                self._wait_for_initial_load()
-                
-              
-                time.sleep(random.uniform(2, 4))
-                
-                print(f"Scrolling page {page} to load more products...")
-                self._enhanced_scroll_and_wait()
-                
-                print(f"Finding product cards on page {page}...")
-                cards = self._find_product_cards()
-                
-                print(f"Total product cards found on page {page}: {len(cards)}")
-                
-                if len(cards) == 0:
-                    print(f"WARNING: No product cards found on page {page}. Taking screenshot for debugging...")
-                    self._save_debug_info(f"tokopedia_debug_page_{page}")
-                    page += 1
-                    continue
+                self.logger.info(f"Total products extracted so far: {total_products}")
+                yield page, products
 
-                print(f"\n===== STARTING PRODUCT EXTRACTION ON PAGE {page} =====")
-                
-                for i, card in enumerate(cards):
-                    if len(all_products) >= max_products:
-                        print(f"Reached maximum number of products ({max_products}). Stopping extraction.")
-                        break
-                    
-                    try:
-                        print(f"\nExtracting product {i+1} on page {page}...")
-                        
-                        product_data = self._extract_product_data(card)
-                        if product_data:
-                            all_products.append(product_data)
-                            print(f"✓ Product {i+1} extracted successfully (Total: {len(all_products)})")
-                            print(f"  Nama Produk: {product_data['product_name']}")
-                            print(f"  Harga Produk: {product_data['price_raw']}")
-                            print(f"  Nama Toko: {product_data['shop_name']}")
-                        else:
-                            print(f"✗ Failed to extract meaningful data for product {i+1}")
-                            
-                    except StaleElementReferenceException:
-                        print(f"✗ Product element became stale. Skipping product {i+1}.")
-                        continue
-                    except Exception as e:
-                        print(f"✗ Error extracting data from product {i+1}: {str(e)}")
-                        continue
-
-                print(f"Total products extracted so far: {len(all_products)}")
+                # Halaman dengan kartu tetap dihitung berisi walau semua produknya dilewati (sudah dikenal)
+                if self.last_page_status == "ok":
+                    consecutive_empty = 0
+                else:
+                    consecutive_empty += 1
+                    empty_page_seconds.append(page_seconds[-1])
+
+                if self.last_page_status == "end":
+                    stop_reason = "end_of_results"
+                    self.logger.info(f"End of results reached on page {page}. Stopping query '{search_query}'.")
+                    break
+                if consecutive_empty >= self.max_empty_pages:
+                    stop_reason = "consecutive_empty_pages"
+                    self.logger.info(f"{consecutive_empty} consecutive empty pages. Stopping query '{search_query}'.")
+                    break
                 
-                if len(all_products) >= max_products:
+                if total_products >= max_products:
                     break
                 
                 page += 1
-                
-                # Sleep strategy
-                if page % 5 == 0:
-                    print(f"Taking a break after {page-1} pages...")
-                    sleep_time = random.uniform(5, 10)  
-                    print(f"Waiting {sleep_time:.1f} seconds before loading next page...")
-                    time.sleep(sleep_time)
 
         except Exception as e:
+            stop_reason = "error"
             self.logger.critical(f"An error occurred: {str(e)}")
             # Debug info
-            try:
-                self.driver.save_screenshot("error_screenshot.png")
-                print("Error screenshot saved as 'error_screenshot.png'")
-                with open("error_page_source.html", "w", encoding="utf-8") as f:
-                    f.write(self.driver.page_source)
-                print("Error page source saved as 'error_page_source.html'")
-            except:
-                print("Could not save error debug information")
+            self._save_debug_info(f"error_page_{page}", reason="error")
+        
+        self.run_summary = self._build_run_summary(
+            search_query, max_pages, page, stop_reason, page_seconds, empty_page_seconds
+        )
+        self.run_summary["products"] = total_products
+        if stop_reason:
+            self.logger.info(f"Early stop saved {self.run_summary['pages_saved']} pages "
+                             f"(~{self.run_summary['seconds_saved']:.0f}s)")
+        if self.page_transfer_log:
+            transferred = [entry["bytes"] for entry in self.page_transfer_log]
+            self.logger.info(f"Transfer: avg {sum(transferred) / len(transferred) / 1024:.0f} KB per page "
+                             f"(blocking: {', '.join(self.block_resources) or 'off'})")
+        if self.scroll_wait_log:
+            waits = [entry["seconds"] for entry in self.scroll_wait_log]
+            self.logger.info(f"Scroll/load wait: avg {sum(waits) / len(waits):.1f}s, max {max(waits):.1f}s over {len(waits)} pages")
+        self.logger.info(f"===== EXTRACTION COMPLETE: {total_products} PRODUCTS EXTRACTED =====")
+
+    @staticmethod
+    def _build_run_summary(search_query, max_pages, last_page, stop_reason, page_seconds, empty_page_seconds):
+        """
+        Ringkasan satu run. Detik yang dihemat diperkirakan dari rata-rata biaya
+        halaman kosong yang benar-benar diukur (atau rata-rata semua halaman).
+        """
+        pages_saved = max(0, max_pages - last_page) if stop_reason and stop_reason != "error" else 0
+        reference = empty_page_seconds or page_seconds
+        avg_cost = sum(reference) / len(reference) if reference else 0.0
+        return {
+            "search_query": search_query,
+            "pages_crawled": len(page_seconds),
+            "stop_reason": stop_reason,
+            "pages_saved": pages_saved,
+            "seconds_saved": pages_saved * avg_cost,
+            "elapsed_seconds": sum(page_seconds)
+        }
+
+    def scrape_page(self, search_query, page, limit=None):
+        """
+        Membuka satu halaman hasil pencarian dan mengekstrak produknya.
+
+        Jeda antar halaman diatur oleh `rate_limiter`; status halaman dilaporkan
+        kembali sebagai sinyal sehingga penjadwal melambat saat situs mulai membatasi.
+
+        Args:
+            search_query (str): Kata kunci pencarian.
+            page (int): Nomor halaman (mulai dari 1).
+            limit (int, optional): Jumlah maksimum produk yang diambil dari halaman ini.
+
+        Returns:
+            list: Daftar dictionary produk dari halaman tersebut.
+        """
+        url = self._get_url(search_query, page)
+        self.page_metrics = PageMetrics(search_query, page, getattr(self, "worker_id", None))
+        commands_before = self.command_counter.total
+        with self.page_metrics.stage("rate_limit_wait"):
+            waited = self.rate_limiter.acquire(url)
+        if waited >= 1:
+            self.logger.info(f"Rate limiter: waited {waited:.1f}s before page {page}")
+        self.last_page_status = "empty"
+        try:
+            products = self._scrape_loaded_page(search_query, page, url, limit)
+            self.page_metrics.products = len(products)
+            return products
+        except TimeoutException:
+            self.last_page_status = "timeout"
+            raise
         finally:
-            self.close()
+            self.rate_limiter.record_signal(url, self.last_page_status)
+            self.page_metrics.status = self.last_page_status
+            self.page_metrics.webdriver_commands = self.command_counter.total - commands_before
+            if self.metrics:
+                self.metrics.write_page(self.page_metrics)
+
+    def _scrape_loaded_page(self, search_query, page, url, limit):
+        """Isi scrape_page setelah giliran dari rate limiter didapat."""
+        self.logger.info(f"===== ACCESSING PAGE {page} =====")
+        self.logger.info(f"Opening search page: {url}")
+        metrics = self.page_metrics
+        with metrics.stage("navigation"):
+            self.driver.get(url)
+
         
-        print(f"\n===== EXTRACTION COMPLETE: {len(all_products)} PRODUCTS EXTRACTED =====")
-        return all_products
+        self.logger.debug("Waiting for page to load completely...")
+        with metrics.stage("initial_load"):
+            loaded = self._wait_for_initial_load()
+        if not loaded:
+            self.last_page_status = "timeout"
+
+        if self._captcha_visible():
+            self.logger.warning(f"CAPTCHA/bot check detected on page {page}. Backing off.")
+            self.last_page_status = "captcha"
+            self._save_debug_info(f"captcha_page_{page}", reason="captcha")
+            return []
+
+        if self._is_end_of_results():
+            self.logger.info(f"End-of-results marker found on page {page}.")
+            self.last_page_status = "end"
+            return []
+        
+        self.logger.debug(f"Scrolling page {page} to load more products...")
+        scroll_started = time.perf_counter()
+        with metrics.stage("scroll"):
+            if self.adaptive_scroll:
+                wait_info = self._adaptive_scroll_and_wait()
+            else:
+                self._enhanced_scroll_and_wait()
+                wait_info = {"polls": None, "cards": None, "timed_out": False}
+        wait_info.update(page=page, seconds=time.perf_counter() - scroll_started)
+        self.scroll_wait_log.append(wait_info)
+        self.logger.info(f"Scroll/load wait on page {page}: {wait_info['seconds']:.1f}s")
+        self._measure_page_transfer(page)
+
+        if self.extraction_mode == "html":
+            started = time.perf_counter()
+            with metrics.stage("extraction"):
+                result = self._extract_products_from_html(self.driver.page_source)
+            if result is not None:
+                products, card_count = result
+                metrics.cards = card_count
+                self.logger.info(f"Total product cards found on page {page}: {card_count}")
+                if card_count == 0:
+                    self.logger.warning(f"No product cards found on page {page}. Taking screenshot for debugging...")
+                    self._save_debug_info(f"tokopedia_debug_page_{page}", reason="no_cards")
+                    return []
+                self.last_page_status = "ok"
+                products = self._skip_known_products(search_query, products)
+                if limit is not None:
+                    products = products[:limit]
+                elapsed = time.perf_counter() - started
+                self.logger.info(f"✓ HTML extraction: {len(products)} products from {card_count} cards in {elapsed:.2f}s")
+                return products
+            self.logger.info("HTML extraction not available, falling back to live extraction.")
+        
+        self.logger.debug(f"Finding product cards on page {page}...")
+        with metrics.stage("find_cards"):
+            cards = self._find_product_cards()
+        metrics.cards = len(cards)
+        
+        self.logger.info(f"Total product cards found on page {page}: {len(cards)}")
+        
+        if len(cards) == 0:
+            self.logger.warning(f"No product cards found on page {page}. Taking screenshot for debugging...")
+            self._save_debug_info(f"tokopedia_debug_page_{page}", reason="no_cards")
+            return []
+
+        self.last_page_status = "ok"
+        self.logger.debug(f"===== STARTING PRODUCT EXTRACTION ON PAGE {page} =====")
+
+        if self.extraction_mode in ("html", "batch"):
+            started = time.perf_counter()
+            with metrics.stage("extraction"):
+                products = self._extract_products_batch(cards)
+            if products is not None:
+                products = self._skip_known_products(search_query, products)
+                if limit is not None:
+                    products = products[:limit]
+                elapsed = time.perf_counter() - started
+                self.logger.info(f"✓ Batch extraction: {len(products)} products from {len(cards)} cards in {elapsed:.2f}s")
+                return products
+            self.logger.info("Batch extraction not available, falling back to per-card extraction.")
+        
+        products = []
+        for i, card in enumerate(cards):
+            if limit is not None and len(products) >= limit:
+                self.logger.debug(f"Reached maximum number of products ({limit}) for this page. Stopping extraction.")
+                break
+            
+            try:
+                if self.known_products and self._is_known_unchanged_card(search_query, card):
+                    self.logger.debug(f"Product {i+1} already known and unchanged. Skipping.")
+                    continue
+
+                self.logger.debug(f"Extracting product {i+1} on page {page}...")
+                
+                with metrics.stage("extract_card"):
+                    product_data = self._extract_product_data(card)
+                if product_data:
+                    if self.known_products:
+                        self.known_products.add(search_query, product_data)
+                    products.append(product_data)
+                    self.logger.debug(
+                        f"✓ Product {i+1} extracted successfully (Page total: {len(products)}): "
+                        f"{product_data['product_name']} | {product_data['price_raw']} | {product_data['shop_name']}"
+                    )
+                else:
+                    self.logger.debug(f"✗ Failed to extract meaningful data for product {i+1}")
+                    
+            except StaleElementReferenceException:
+                self.logger.debug(f"✗ Product element became stale. Skipping product {i+1}.")
+                continue
+            except Exception as e:
+                self.logger.warning(f"✗ Error extracting data from product {i+1}: {str(e)}")
+                continue
+
+        return products
 
     def _wait_for_initial_load(self):
-        """Wait strategy"""
+        """Wait strategy. Return False jika elemen awal tidak muncul sampai timeout."""
         try:
-            selectors = self._get_initial_container_selectors()
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(selectors))))
-            print("Initial product container loaded.")
+            # Penanda "produk tidak ditemukan" dan CAPTCHA yang terlihat ikut ditunggu agar
+            # halaman tersebut tidak menunggu sampai timeout
+            selectors = self._get_initial_container_selectors() + self._get_empty_result_selectors()
+            self.wait.until(lambda driver: self._page_matches(selectors) or self._captcha_visible())
+            self.logger.debug("Initial product container loaded.")
+            return True
         except TimeoutException:
-            print("Page timed out while loading initial elements. Taking debug screenshot...")
-            self._save_debug_info(f"timeout_page")
+            self.logger.warning("Page timed out while loading initial elements. Taking debug screenshot...")
+            self._save_debug_info(f"timeout_page", reason="timeout")
+            return False
+
+    def _ordered_selectors(self, field, selectors):
+        """Urutan selector untuk field; selector yang sedang berfungsi dicoba lebih dulu."""
+        if self.selector_stats and field:
+            return self.selector_stats.ordered(field, selectors)
+        return selectors
+
+    def _record_selector_lookup(self, field, selectors, hit_index):
+        """Mencatat hasil satu lookup selector (lihat SelectorStats.record)."""
+        if self.selector_stats and field:
+            self.selector_stats.record(field, selectors, hit_index)
+
+    def _skip_known_products(self, search_query, products):
+        """Membuang produk yang sudah dikenal dan harga/terjualnya tidak berubah."""
+        if not self.known_products:
+            return products
+        fresh, unchanged = self.known_products.filter_unchanged(search_query, products)
+        if unchanged:
+            self.logger.info(f"Skipped {len(unchanged)} known, unchanged products")
+        return fresh
+
+    def _is_known_unchanged_card(self, search_query, card):
+        """
+        Cek murah sebelum ekstraksi per kartu: satu round-trip untuk URL dan teks kartu,
+        lalu dicocokkan dengan indeks produk yang sudah dikenal.
+        """
+        try:
+            url, text = self.driver.execute_script(
+                "const a = arguments[0].href ? arguments[0] : arguments[0].querySelector('a[href]');"
+                "return [a ? a.href : null, arguments[0].innerText];", card
+            )
+        except Exception:
+            return False
+        return self.known_products.is_unchanged_text(search_query, url, text)
+
+    def _is_end_of_results(self):
+        """Cek apakah halaman menampilkan penanda hasil pencarian habis."""
+        return self._page_matches(self._get_empty_result_selectors())
+
+    def _page_matches(self, selectors):
+        """Cek (satu round-trip) apakah salah satu selector ada di halaman."""
+        if not selectors:
+            return False
+        try:
+            return bool(self.driver.execute_script(
+                "return !!document.querySelector(arguments[0]);", ", ".join(selectors)
+            ))
+        except Exception:
+            return False
+
+    def _captcha_visible(self):
+        """
+        Cek (satu round-trip) apakah ada tantangan CAPTCHA yang benar-benar tampil:
+        elemen cocok dengan selector CAPTCHA, tidak disembunyikan CSS, dan minimal
+        `CAPTCHA_MIN_SIZE` px di kedua sisi.
+        """
+        selectors = self._get_captcha_selectors()
+        if not selectors:
+            return False
+        try:
+            return bool(self.driver.execute_script(
+                """
+                const minSize = arguments[1];
+                for (const el of document.querySelectorAll(arguments[0])) {
+                    const rect = el.getBoundingClientRect();
+                    if (rect.width < minSize || rect.height < minSize) continue;
+                    const style = window.getComputedStyle(el);
+                    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') continue;
+                    return true;
+                }
+                return false;
+                """,
+                ", ".join(selectors), self.CAPTCHA_MIN_SIZE
+            ))
+        except Exception:
+            return False
 
     def _find_product_cards(self):
         """Strategy untuk menemukan cards."""
@@ -180,12 +603,57 @@ class BaseScraper(ABC):
                 )
                 cards = self.driver.find_elements(By.CSS_SELECTOR, selector)
                 if len(cards) > 0:
-                    print(f"Found {len(cards)} product cards using selector: {selector}")
+                    self.logger.debug(f"Found {len(cards)} product cards using selector: {selector}")
                     break
             except:
                 continue
         return cards
 
+    def _adaptive_scroll_and_wait(self, poll_interval=0.25):
+        """
+        Scroll bertahap sampai jumlah kartu produk dan tinggi halaman stabil
+        selama `scroll_quiet_seconds`, dengan batas atas `scroll_max_seconds`.
+
+        Returns:
+            dict: Jumlah polling, jumlah kartu terakhir, dan apakah batas waktu tercapai.
+        """
+        card_selector = ", ".join(self._get_card_selectors())
+        # Satu round-trip per polling: scroll satu viewport lalu baca kondisi halaman.
+        poll_script = """
+            window.scrollBy(0, window.innerHeight);
+            let cards = 0;
+            try { cards = document.querySelectorAll(arguments[0]).length; } catch (e) {}
+            return [cards, document.body.scrollHeight,
+                    window.innerHeight + window.scrollY >= document.body.scrollHeight - 2];
+        """
+
+        started = time.monotonic()
+        deadline = started + self.scroll_max_seconds
+        last_state = None
+        stable_since = started
+        polls = 0
+        cards = 0
+        timed_out = True
+
+        while time.monotonic() < deadline:
+            cards, height, at_bottom = self.driver.execute_script(poll_script, card_selector)
+            polls += 1
+            now = time.monotonic()
+            state = (cards, height)
+            if state != last_state or not at_bottom:
+                last_state = state
+                stable_since = now
+            elif now - stable_since >= self.scroll_quiet_seconds:
+                timed_out = False
+                break
+            time.sleep(poll_interval)
+
+        if timed_out:
+            self.logger.warning(f"Scroll wait reached the {self.scroll_max_seconds}s limit ({cards} cards loaded)")
+
+        self.driver.execute_script("window.scrollTo(0, 0);")
+        return {"polls": polls, "cards": cards, "timed_out": timed_out}
+
     def _enhanced_scroll_and_wait(self, scroll_cycles=25):
         """Enhanced scroll strategy"""
         # Get initial scroll height
@@ -200,7 +668,7 @@ class BaseScraper(ABC):
             self.driver.execute_script(f"window.scrollTo(0, {scroll_position});")
             
             if i % 5 == 0:  # Every 5 scrolls, print status
-                print(f"Incremental scrolling... ({i+1}/{scroll_cycles})")
+                self.logger.debug(f"Incremental scrolling... ({i+1}/{scroll_cycles})")
             
             # Dynamic wait - timing
             if i < 3:
@@ -211,13 +679,13 @@ class BaseScraper(ABC):
             # Check if we've reached the bottom
             new_height = self.driver.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
-                print("No more content loading, waiting for a bit...")
+                self.logger.debug("No more content loading, waiting for a bit...")
                 time.sleep(3)
                 
                 # Check one more time
                 new_height = self.driver.execute_script("return document.body.scrollHeight")
                 if new_height == last_height:
-                    print("Confirmed no more content, stopping scroll")
+                    self.logger.debug("Confirmed no more content, stopping scroll")
                     break
                     
             last_height = new_height
@@ -246,21 +714,61 @@ class BaseScraper(ABC):
     @abstractmethod
     def _get_defaults(self): pass
 
-    def _save_debug_info(self, file_prefix):
-        
+    def _get_empty_result_selectors(self):
+        """Selector penanda bahwa hasil pencarian sudah habis. Default: tidak ada."""
+        return []
+
+    def _get_captcha_selectors(self):
+        """
+        Selector kandidat halaman CAPTCHA/verifikasi bot (sinyal throttling). Hanya
+        elemen yang tampil dan cukup besar yang dihitung (lihat `_captcha_visible`).
+        """
+        return ['iframe[src*="captcha"]', '[id*="captcha" i]', '[class*="captcha" i]']
+
+    def _extract_products_from_html(self, html):
+        """
+        Ekstraksi seluruh kartu dari page_source tanpa query elemen live.
+        Return (products, jumlah_kartu), atau None jika tidak didukung subclass.
+        """
+        return None
+
+    def _extract_products_batch(self, cards):
+        """
+        Ekstraksi seluruh kartu dalam satu round-trip ke browser.
+        Subclass yang mendukungnya meng-override method ini; return None berarti
+        tidak didukung sehingga dipakai ekstraksi per kartu.
+        """
+        return None
+
+    def _save_debug_info(self, file_prefix, reason=None):
+        """
+        Menyerahkan HTML dan screenshot halaman saat ini ke debug_store.
+        Kegagalan berulang dengan `reason` yang sama hanya disampel.
+        """
         try:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-            screenshot_path = os.path.join(self.debug_dir, f"{file_prefix}.png")
-            self.driver.save_screenshot(screenshot_path)
-            source_path = os.path.join(self.debug_dir, f"{file_prefix}.html")
-            with open(source_path, "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
-            print(f"Debug info saved: {file_prefix}")
+            if self.debug_store.capture(reason or file_prefix, file_prefix, self._debug_snapshot):
+                self.logger.debug(f"Debug info queued: {file_prefix}")
         except Exception as e:
-            print(f"Could not save debug info: {e}")
+            self.logger.warning(f"Could not save debug info: {e}")
+
+    def _debug_snapshot(self):
+        """(page_source, screenshot PNG) dari halaman saat ini."""
+        if not self.driver:
+            return None, None
+        html = self.driver.page_source
+        png = self.driver.get_screenshot_as_png() if self.debug_store.screenshots else None
+        return html, png
 
     def close(self):
-        """Menutup WebDriver dengan aman."""
+        """Menutup WebDriver dengan aman. Aman dipanggil lebih dari sekali."""
         if self.driver:
-            print("Closing browser...")
-            self.driver.quit()
\ No newline at end of file
+            self.logger.info("Closing browser...")
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+                if self.profile_path:
+                    release_profile_dir(self.profile_path)
+                    self.profile_path = None
+        if self._owns_debug_store:
+            self.debug_store.close()
\ No newline at end of file
@@ -0,0 +1,212 @@
+# scrapers/html_extractor.py
+# Mesin ekstraksi offline: mem-parsing page_source (atau file HTML tersimpan)
+# dengan lxml, memakai daftar selector yang sama dengan ekstraksi live.
+#
+# Contoh benchmark terhadap halaman debug yang tersimpan:
+#   python -m scrapers.html_extractor debug_pic/*.html --repeat 5 --spec tokopedia
+
+import argparse
+import glob
+import json
+import re
+import time
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+from cssselect import GenericTranslator, SelectorError
+
+# GenericTranslator menerjemahkan :contains() ke XPath contains() standar
+# (CSSSelector bawaan lxml memakai fungsi ekstensi yang gagal pada teks non-ASCII)
+_TRANSLATOR = GenericTranslator()
+
+
+def css_to_xpath(selector):
+    """Mengkompilasi selector CSS menjadi objek XPath lxml."""
+    return etree.XPath(_TRANSLATOR.css_to_xpath(selector))
+
+
+class HtmlExtractor:
+    """
+    Mengekstrak field produk dari HTML halaman hasil pencarian.
+
+    Selector dikompilasi sekali saat inisialisasi sehingga satu instance dapat
+    dipakai ulang untuk ribuan halaman.
+    """
+
+    def __init__(self, card_selectors, field_selectors, defaults, base_url=None, stats=None,
+                 text_fallbacks=None, url_selectors=("a[href]",)):
+        """
+        Args:
+            card_selectors (list): Selector kartu produk, dalam urutan prioritas.
+            field_selectors (dict): Mapping nama field -> daftar selector.
+            defaults (dict): Nilai default per field jika tidak ditemukan.
+            base_url (str, optional): Dipakai untuk melengkapi URL relatif.
+            stats (SelectorStats, optional): Jika diisi, urutan selector field disesuaikan
+                per halaman dan setiap lookup dicatat.
+            text_fallbacks (dict, optional): Field -> (kata kunci, regex atau None) untuk
+                mencari teks div/span jika semua selector field gagal.
+            url_selectors (tuple): Selector elemen yang href-nya menjadi URL produk.
+        """
+        self._compiled = {}
+        self.card_selectors = [self._compiled_selector(s) for s in card_selectors]
+        self.card_selectors = [s for s in self.card_selectors if s is not None]
+        self.field_selectors = {field: list(items) for field, items in field_selectors.items()}
+        self.defaults = defaults
+        self.stats = stats
+        self.base_url = base_url
+        self.text_fallbacks = {
+            field: (keyword, re.compile(pattern) if pattern else None)
+            for field, (keyword, pattern) in (text_fallbacks or {}).items()
+        }
+        self._text_nodes = css_to_xpath("div, span")
+        self._url_selectors = [s for s in map(self._compiled_selector, url_selectors) if s is not None]
+
+    @classmethod
+    def from_spec(cls, spec, base_url=None, stats=None):
+        """Membuat extractor dari MarketplaceSpec (lihat scrapers/specs.py)."""
+        return cls(
+            spec.card_selectors, spec.field_selectors, spec.defaults,
+            base_url=base_url or spec.base_url, stats=stats,
+            text_fallbacks=spec.text_fallbacks, url_selectors=spec.url_selectors
+        )
+
+    def _compiled_selector(self, selector):
+        """Selector CSS terkompilasi (di-cache); None jika tidak valid."""
+        if selector not in self._compiled:
+            try:
+                self._compiled[selector] = css_to_xpath(selector)
+            except (SelectorError, etree.XPathSyntaxError):
+                self._compiled[selector] = None
+        return self._compiled[selector]
+
+    @staticmethod
+    def _text(element):
+        """Teks elemen dengan spasi dinormalisasi."""
+        return " ".join(element.text_content().split())
+
+    def find_cards(self, tree):
+        """Mengembalikan kartu produk dari selector pertama yang menemukan hasil."""
+        for selector in self.card_selectors:
+            cards = selector(tree)
+            if cards:
+                return cards
+        return []
+
+    def _first_text(self, card, field, selectors):
+        for index, selector in enumerate(selectors):
+            compiled = self._compiled_selector(selector)
+            if compiled is None:
+                continue
+            for element in compiled(card)[:1]:
+                text = self._text(element)
+                if text:
+                    if self.stats:
+                        self.stats.record(field, selectors, index)
+                    return text
+        if self.stats:
+            self.stats.record(field, selectors, None)
+        return None
+
+    def _scan_text(self, card, keyword):
+        for element in self._text_nodes(card):
+            text = self._text(element)
+            if text and keyword in text:
+                return text
+        return None
+
+    def _extract_url(self, card):
+        url = card.get("href")
+        for selector in self._url_selectors:
+            if url:
+                break
+            url = next((el.get("href") for el in selector(card) if el.get("href")), None)
+        if url and self.base_url:
+            url = urljoin(self.base_url, url)
+        return url
+
+    def extract_card(self, card, field_selectors=None):
+        """Mengekstrak field mentah dari satu elemen kartu."""
+        field_selectors = field_selectors or self.field_selectors
+        fields = {
+            field: self._first_text(card, field, selectors)
+            for field, selectors in field_selectors.items()
+        }
+
+        for field, (keyword, pattern) in self.text_fallbacks.items():
+            if not fields.get(field):
+                text = self._scan_text(card, keyword)
+                match = pattern.search(text) if text and pattern else None
+                fields[field] = match.group(0) if match else text
+
+        fields["product_url"] = self._extract_url(card)
+        return {key: value or self.defaults[key] for key, value in fields.items()}
+
+    def matches(self, html, selectors):
+        """True jika salah satu selector menemukan elemen di HTML (misal penanda hasil habis)."""
+        if not selectors or not html or not html.strip():
+            return False
+        tree = lxml.html.fromstring(html)
+        return any(compiled(tree) for compiled in map(self._compiled_selector, selectors) if compiled is not None)
+
+    def extract(self, html):
+        """
+        Mengekstrak semua kartu dari string HTML.
+
+        Returns:
+            list: Satu dictionary field mentah per kartu.
+        """
+        if not html or not html.strip():
+            return []
+        tree = lxml.html.fromstring(html)
+        cards = self.find_cards(tree)
+
+        # Urutan selector ditentukan sekali per halaman dari telemetri
+        field_selectors = self.field_selectors
+        if self.stats:
+            field_selectors = {
+                field: self.stats.ordered(field, selectors)
+                for field, selectors in self.field_selectors.items()
+            }
+            self.stats.record_cards(len(cards))
+        return [self.extract_card(card, field_selectors) for card in cards]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekstraksi dan benchmark offline dari file HTML tersimpan.")
+    parser.add_argument("paths", nargs="+", help="File HTML atau pola glob (misal debug_pic/*.html)")
+    parser.add_argument("--repeat", type=int, default=1, help="Ulangi ekstraksi untuk benchmark")
+    parser.add_argument("--output", help="Simpan hasil ekstraksi ke file JSON")
+    parser.add_argument("--spec", default="tokopedia", help="Nama marketplace di scrapers/specs.py")
+    args = parser.parse_args()
+
+    files = sorted({path for pattern in args.paths for path in glob.glob(pattern)})
+    pages = []
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((path, f.read()))
+
+    from scrapers.specs import SPECS
+    extractor = HtmlExtractor.from_spec(SPECS[args.spec])
+    results = {}
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for path, html in pages:
+            results[path] = extractor.extract(html)
+    elapsed = time.perf_counter() - started
+
+    total_pages = len(pages) * args.repeat
+    total_cards = sum(len(rows) for rows in results.values()) * args.repeat
+    for path, rows in results.items():
+        print(f"{path}: {len(rows)} kartu")
+    if elapsed > 0:
+        print(f"{total_pages} halaman, {total_cards} kartu dalam {elapsed:.2f} detik "
+              f"({total_pages / elapsed * 60:.0f} halaman/menit)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+# scrapers/http_scraper.py
+# Backend scraping tanpa browser: halaman hasil pencarian diambil lewat HTTP
+# biasa dan produk dibaca dari state JSON yang disematkan di halaman
+# (atau dari payload JSON jika server mengembalikan JSON langsung).
+#
+# Modul ini sengaja tidak bergantung pada Selenium: format URL, default field dan
+# ekstraksi HTML diambil langsung dari MarketplaceSpec (scrapers/specs.py).
+
+import asyncio
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .specs import TOKOPEDIA
+from utils.logger_setup import get_logger
+from utils.rate_limiter import PolitenessScheduler
+from utils.replay_server import save_recording
+from utils.metrics import PageMetrics
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Penanda awal state JSON yang disematkan di halaman hasil pencarian
+STATE_MARKERS = [
+    re.compile(r'window\.__cache\s*=\s*'),
+    re.compile(r'window\.__APOLLO_STATE__\s*=\s*'),
+    re.compile(r'<script[^>]+id="__NEXT_DATA__"[^>]*>'),
+]
+
+
+def extract_embedded_state(html):
+    """
+    Mencari dan mem-parse objek JSON state yang disematkan di HTML.
+
+    Returns:
+        dict | None: State hasil parse, atau None jika tidak ditemukan.
+    """
+    decoder = json.JSONDecoder()
+    for marker in STATE_MARKERS:
+        match = marker.search(html)
+        if not match:
+            continue
+        try:
+            state, _ = decoder.raw_decode(html, match.end())
+            return state
+        except ValueError:
+            continue
+    return None
+
+
+def _resolve(value, cache, depth=0):
+    """Mengganti referensi cache Apollo ({"type": "id", "id": ...}) dengan objek aslinya."""
+    if depth > 6:
+        return value
+    if isinstance(value, dict):
+        if value.get("type") == "id" and value.get("id") in cache:
+            return _resolve(cache[value["id"]], cache, depth + 1)
+        return {key: _resolve(item, cache, depth + 1) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, cache, depth + 1) for item in value]
+    return value
+
+
+def _text(value):
+    """Mengambil teks dari field yang bisa berupa string atau objek {"text": ...}."""
+    if isinstance(value, dict):
+        return value.get("text") or value.get("name") or value.get("priceText")
+    if value is None:
+        return None
+    return str(value)
+
+
+def _sold_text(product):
+    for label in product.get("labelGroups") or []:
+        title = label.get("title") if isinstance(label, dict) else None
+        if title and "terjual" in title:
+            return title
+    for key in ("countSold", "label", "soldText"):
+        text = _text(product.get(key))
+        if text and "terjual" in text:
+            return text
+    return None
+
+
+def _is_product(node):
+    return isinstance(node, dict) and "name" in node and "url" in node and (
+        "price" in node or "priceText" in node
+    )
+
+
+def parse_products_from_state(state):
+    """
+    Mencari semua objek produk di dalam state/payload JSON.
+
+    Returns:
+        list: Field mentah per produk dengan kunci yang sama seperti ekstraksi HTML
+        (product_name, price, shop_name, location, sold_count, product_url).
+    """
+    # State Apollo tersimpan dalam bentuk ter-normalisasi; referensi di-resolve saat dibutuhkan.
+    cache = state if isinstance(state, dict) else {}
+    rows = []
+    seen_urls = set()
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+        if _is_product(node):
+            product = _resolve(node, cache)
+            url = _text(product.get("url"))
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                shop = product.get("shop") if isinstance(product.get("shop"), dict) else {}
+                rows.append({
+                    "product_name": _text(product.get("name")),
+                    "price": _text(product.get("price")) or _text(product.get("priceText")),
+                    "shop_name": _text(shop.get("name")),
+                    "location": _text(shop.get("city")),
+                    "sold_count": _sold_text(product),
+                    "product_url": url,
+                })
+            continue
+        stack.extend(reversed(list(node.values())))
+    return rows
+
+
+class HttpScraper:
+    """
+    Scraper tanpa browser yang dijalankan oleh sebuah MarketplaceSpec.
+
+    Memakai satu `requests.Session` dengan connection pool untuk semua halaman.
+    `scrape_many` mengambil banyak query secara bersamaan dengan asyncio; halaman
+    dalam satu query diambil berurutan per jendela kecil agar crawl berhenti di
+    halaman kosong pertama dan batas produk dihormati.
+
+    Kontraknya sama dengan BaseScraper (`scrape_page` -> list, `last_page_status`,
+    `scrape`, `run_summary`, `close`), sehingga bisa dipakai ScraperPool, termasuk
+    `run_queue` di worker.py, tanpa Selenium.
+    """
+    SPEC = None
+
+    def __init__(self, spec=None, base_url=None, pool_size=10, timeout=20, page_window=3,
+                 record_dir=None, known_products=None, selector_stats=None, rate_limiter=None,
+                 metrics=None, debug_store=None, **browser_options):
+        """
+        Args:
+            spec (MarketplaceSpec, optional): Spec yang dipakai; default `SPEC` kelas.
+            base_url (str, optional): Override URL dasar situs (misal server replay lokal).
+            pool_size (int): Jumlah koneksi maksimum di pool HTTP.
+            timeout (int): Timeout per request (detik).
+            page_window (int): Jumlah halaman satu query yang diambil bersamaan.
+            record_dir (str, optional): Jika diisi, setiap respons disimpan untuk diputar
+                ulang dengan `utils.replay_server.ReplayServer`.
+            known_products (KnownProductIndex, optional): Produk tidak berubah dilewati.
+            selector_stats (SelectorStats, optional): Telemetri selector ekstraksi HTML.
+            rate_limiter (PolitenessScheduler, optional): Penjadwal kesopanan bersama.
+            metrics (MetricsRecorder, optional): Metrik per halaman.
+            debug_store (DebugArtifactStore, optional): HTML halaman kosong yang tidak terduga.
+            **browser_options: Opsi khusus browser BaseScraper (headless, extraction_mode,
+                profile_dir, ...); diterima agar argumen ScraperPool sama, lalu diabaikan.
+        """
+        self.spec = spec or self.SPEC
+        if self.spec is None:
+            raise ValueError("HttpScraper membutuhkan MarketplaceSpec")
+        self.logger = get_logger(self.__class__.__name__)
+        self.base_url = (base_url or self.spec.base_url).rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.page_window = max(1, page_window)
+        self.record_dir = record_dir
+        self.known_products = known_products
+        self.selector_stats = selector_stats
+        self.rate_limiter = rate_limiter or PolitenessScheduler()
+        self.metrics = metrics
+        self.debug_store = debug_store
+        self.completed_queries = set()
+        # Ringkasan run terakhir dari scrape(), sama seperti BaseScraper
+        self.run_summary = {}
+        self.startup_seconds = None
+        self._html_extractor = None
+        # Status halaman disimpan per thread: scrape_page dipanggil bersamaan dari banyak thread
+        self._local = threading.local()
+        self.session = self._setup_session()
+
+    @property
+    def last_page_status(self):
+        """
+        Status halaman terakhir yang diambil thread ini: "ok", "end" (hasil pencarian
+        habis) atau "empty" (tanpa produk maupun penanda; kemungkinan diblokir).
+        """
+        return getattr(self._local, "status", None)
+
+    @last_page_status.setter
+    def last_page_status(self, status):
+        self._local.status = status
+
+    def _setup_session(self):
+        session = requests.Session()
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/json;q=0.9,*/*;q=0.8",
+            "Accept-Language": "id-ID,id;q=0.9,en;q=0.8",
+        })
+        return session
+
+    def _get_url(self, search_query, page):
+        """URL pencarian sesuai spec (dengan base_url scraper ini)."""
+        return self.spec.build_url(search_query, page, self.base_url)
+
+    def _extractor(self):
+        from .html_extractor import HtmlExtractor
+
+        if self._html_extractor is None:
+            self._html_extractor = HtmlExtractor.from_spec(
+                self.spec, base_url=self.base_url, stats=self.selector_stats
+            )
+        return self._html_extractor
+
+    def _fetch(self, url):
+        """
+        Mengambil satu URL. Returns (body text, content_type), atau None jika 404
+        (halaman di luar hasil pencarian).
+        """
+        response = self.session.get(url, timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        if self.record_dir:
+            parts = urlsplit(url)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            save_recording(self.record_dir, path, response.content, content_type)
+        return response.text, content_type
+
+    def _parse_response(self, body, content_type):
+        """
+        Mengubah isi respons menjadi (daftar produk, status).
+
+        Status "ok" jika ada produk, "end" jika payload JSON kosong atau halaman
+        menampilkan penanda hasil habis dari spec, dan "empty" untuk halaman tanpa
+        produk maupun penanda (kemungkinan halaman blokir).
+        """
+        if "json" in content_type:
+            rows = parse_products_from_state(json.loads(body))
+            if not rows:
+                return [], "end"
+        else:
+            state = extract_embedded_state(body)
+            rows = parse_products_from_state(state) if state else []
+            if not rows:
+                # Halaman server-rendered tanpa state: pakai ekstraksi HTML offline
+                extractor = self._extractor()
+                rows = extractor.extract(body)
+                if not rows:
+                    if extractor.matches(body, self.spec.empty_result_selectors):
+                        return [], "end"
+                    return [], "empty"
+
+        defaults = dict(self.spec.defaults)
+        products = []
+        for row in rows:
+            product = self.spec.build_product({key: value or defaults.get(key) for key, value in row.items()})
+            if product:
+                products.append(product)
+        return products, "ok" if products else "empty"
+
+    def scrape_page(self, search_query, page, limit=None):
+        """
+        Mengambil dan mem-parse satu halaman hasil pencarian lewat HTTP.
+
+        Boleh dipanggil bersamaan dari banyak thread: metrik halaman dibuat per
+        panggilan dan `last_page_status` disimpan per thread.
+
+        Returns:
+            list: Daftar dictionary produk dari halaman tersebut.
+        """
+        url = self._get_url(search_query, page)
+        metrics = PageMetrics(search_query, page)
+        with metrics.stage("rate_limit_wait"):
+            self.rate_limiter.acquire(url)
+        self.logger.info(f"Fetching search page over HTTP: {url}")
+        try:
+            with metrics.stage("navigation"):
+                response = self._fetch(url)
+        except requests.Timeout:
+            self.rate_limiter.record_signal(url, "timeout")
+            raise
+        except requests.RequestException as e:
+            # 429/403 (termasuk setelah retry habis) berarti situs sedang membatasi
+            status = getattr(e.response, "status_code", None)
+            self.rate_limiter.record_signal(url, "throttled" if status in (403, 429) else "timeout")
+            raise
+
+        if response is None:
+            products, status = [], "end"
+        else:
+            with metrics.stage("extraction"):
+                products, status = self._parse_response(*response)
+            if status == "empty" and self.debug_store:
+                self.debug_store.capture("empty", f"http_empty_page_{page}", lambda: (response[0], None))
+        self.rate_limiter.record_signal(url, status)
+        metrics.cards = len(products)
+        if self.known_products:
+            products, _ = self.known_products.filter_unchanged(search_query, products)
+        if limit is not None:
+            products = products[:limit]
+        if self.metrics:
+            metrics.status = status
+            metrics.products = len(products)
+            self.metrics.write_page(metrics)
+        self.logger.info(f"Page {page}: {len(products)} products ({status})")
+        self.last_page_status = status
+        return products
+
+    def _scrape_page_status(self, search_query, page):
+        # Dibaca di thread yang sama dengan scrape_page
+        products = self.scrape_page(search_query, page)
+        return products, self.last_page_status
+
+    def scrape(self, search_query, max_products, max_pages, start_page=1, on_page_complete=None, collect=True):
+        """
+        Mengambil halaman satu query secara berurutan (mode query ScraperPool.run).
+        Argumen dan hasil sama dengan BaseScraper.scrape; query berhenti pada halaman
+        "end" pertama atau saat `max_products` tercapai. Halaman "empty" (tanpa produk
+        maupun penanda akhir) tidak diserahkan ke `on_page_complete` dan menghentikan
+        query sebagai error agar diulang dari halaman itu.
+        """
+        self.run_summary = {"search_query": search_query, "stop_reason": None}
+        started = time.perf_counter()
+        all_products = []
+        total = 0
+        page = start_page
+        stop_reason = None
+        try:
+            while page <= max_pages and total < max_products:
+                products = self.scrape_page(search_query, page, max_products - total)
+                if self.last_page_status == "empty":
+                    stop_reason = "error"
+                    self.logger.warning(f"'{search_query}' page {page} returned no products; it will be retried")
+                    break
+                total += len(products)
+                if on_page_complete:
+                    on_page_complete(search_query, page, products)
+                if collect:
+                    all_products.extend(products)
+                if self.last_page_status == "end":
+                    stop_reason = "end_of_results"
+                    break
+                page += 1
+        except Exception as e:
+            stop_reason = "error"
+            self.logger.critical(f"Error while scraping '{search_query}' page {page}: {e}")
+        self.run_summary = {
+            "search_query": search_query,
+            "pages_crawled": page - start_page + (1 if stop_reason else 0),
+            "stop_reason": stop_reason,
+            "pages_saved": max(0, max_pages - page) if stop_reason == "end_of_results" else 0,
+            "seconds_saved": 0.0,
+            "elapsed_seconds": time.perf_counter() - started,
+            "products": total,
+        }
+        return all_products
+
+    async def scrape_many_async(self, queries, max_products, max_pages, concurrency=None,
+                                on_page_complete=None, checkpoint=None, collect=True):
+        """
+        Mengambil halaman untuk banyak query secara bersamaan.
+
+        Semua query berjalan paralel, dibatasi `concurrency` request sekaligus (default:
+        ukuran pool koneksi). Dalam satu query, halaman diambil per jendela `page_window`
+        dan diproses berurutan: query berhenti pada halaman "end" pertama atau saat
+        `max_products` produk sudah diserahkan, sehingga halaman setelahnya tidak pernah
+        diminta. Halaman yang gagal atau "empty" tidak diserahkan (tidak masuk checkpoint)
+        dan query-nya tidak dianggap selesai. Halaman yang sudah ada di checkpoint dilewati.
+
+        `on_page_complete`, `checkpoint` dan `collect` berperilaku sama seperti di
+        ScraperPool.run, termasuk pengisian `completed_queries`.
+
+        Returns:
+            dict: Mapping query -> daftar produk (urut per halaman, dibatasi max_products).
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.pool_size)
+        failed_queries = set()
+
+        async def fetch(query, page):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self._scrape_page_status, query, page)
+                except Exception as e:
+                    self.logger.error(f"Gagal mengambil '{query}' halaman {page}: {e}")
+                    failed_queries.add(query)
+                    return [], "error"
+
+        async def crawl(query):
+            completed = checkpoint.completed_pages(query) if checkpoint else set()
+            remaining = max_products - (checkpoint.product_count(query) if checkpoint else 0)
+            pages = [page for page in range(1, max_pages + 1) if page not in completed]
+            collected = []
+            for start in range(0, len(pages), self.page_window):
+                if remaining <= 0:
+                    break
+                window = pages[start:start + self.page_window]
+                results = await asyncio.gather(*(fetch(query, page) for page in window))
+                stop = False
+                for page, (products, status) in zip(window, results):
+                    if status in ("error", "empty"):
+                        # Halaman gagal/kosong tidak dicatat di checkpoint sehingga diulang saat resume;
+                        # halaman kosong tetap menghentikan query seperti sebelumnya
+                        failed_queries.add(query)
+                        if status == "empty":
+                            self.logger.warning(f"'{query}': halaman {page} kosong, akan diulang")
+                            stop = True
+                            break
+                        continue
+                    products = products[:remaining]
+                    remaining -= len(products)
+                    if on_page_complete:
+                        # Callback bisa blok (misal ProductWriter.put saat antrean penuh); dijalankan
+                        # di thread agar tidak menahan event loop dan query lain
+                        await asyncio.to_thread(on_page_complete, query, page, products)
+                    if collect:
+                        collected.extend(products)
+                    if status == "end" or remaining <= 0:
+                        if status == "end":
+                            self.logger.info(f"'{query}': hasil pencarian habis di halaman {page}")
+                        stop = True
+                        break
+                if stop:
+                    break
+            return query, collected
+
+        results = dict(await asyncio.gather(*(crawl(query) for query in queries)))
+        self.completed_queries = set(queries) - failed_queries
+        return results
+
+    def scrape_many(self, queries, max_products, max_pages, concurrency=None,
+                    on_page_complete=None, checkpoint=None, collect=True):
+        """Versi sinkron dari `scrape_many_async`."""
+        return asyncio.run(self.scrape_many_async(
+            queries, max_products, max_pages, concurrency, on_page_complete, checkpoint, collect
+        ))
+
+    def close(self):
+        """Menutup session HTTP."""
+        if self.session:
+            self.session.close()
+            self.session = None
+
+
+class TokopediaHttpScraper(HttpScraper):
+    """Scraper Tokopedia tanpa browser."""
+    SPEC = TOKOPEDIA
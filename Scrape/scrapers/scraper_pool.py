@@ -0,0 +1,339 @@
+# scrapers/scraper_pool.py
+# Pool berisi beberapa worker browser yang tetap hidup (warm) sehingga
+# beberapa query dapat di-scrape secara paralel tanpa membuka Chrome baru per query.
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.logger_setup import get_logger
+
+
+def default_worker_count():
+    """
+    Menentukan jumlah worker default.
+
+    Nilai diambil dari environment `SCRAPER_WORKERS` jika ada. Jika tidak,
+    dipakai setengah jumlah core (setiap Chrome memakan beberapa ratus MB RAM).
+    """
+    env_value = os.getenv("SCRAPER_WORKERS")
+    if env_value:
+        return max(1, int(env_value))
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+class WorkerStats:
+    """Statistik kerja untuk satu worker browser."""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.tasks = 0
+        self.products = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def products_per_minute(self):
+        if self.busy_seconds <= 0:
+            return 0.0
+        return self.products / self.busy_seconds * 60
+
+
+class ScraperPool:
+    """
+    Pool N instance scraper yang siap pakai.
+
+    Setiap worker memegang satu WebDriver sepanjang umur pool. Tugas berupa
+    query (mode default) atau pasangan (query, page) jika `split_pages=True`,
+    dibagikan ke worker yang sedang kosong.
+    """
+
+    def __init__(self, scraper_cls, num_workers=None, **scraper_kwargs):
+        """
+        Args:
+            scraper_cls (type): Subclass BaseScraper yang akan dipakai worker.
+            num_workers (int, optional): Jumlah browser. Default dari `default_worker_count()`.
+            **scraper_kwargs: Argumen yang diteruskan ke konstruktor scraper (misal headless).
+        """
+        self.logger = get_logger("ScraperPool")
+        self.scraper_cls = scraper_cls
+        self.num_workers = num_workers or default_worker_count()
+        self.scraper_kwargs = scraper_kwargs
+        self.scrapers = []
+        self.stats = {}
+        self._idle = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.wall_seconds = 0.0
+        # Ringkasan per query (mode query) dan halaman terakhir per query (mode split_pages)
+        self.summaries = {}
+        self._on_page_complete = None
+        self._checkpoint = None
+        self._end_pages = {}
+        # Jumlah produk yang sudah diserahkan per query (mode split_pages), untuk batas max_products
+        self._page_products = {}
+        self.pages_skipped = 0
+        self._failed_queries = set()
+        # Query yang selesai tanpa error pada run terakhir
+        self.completed_queries = set()
+
+    def start(self):
+        """Menyalakan semua browser secara paralel."""
+        self.logger.info(f"Menyalakan {self.num_workers} worker browser...")
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            futures = [executor.submit(self.scraper_cls, **self.scraper_kwargs) for _ in range(self.num_workers)]
+            for future in as_completed(futures):
+                try:
+                    scraper = future.result()
+                except Exception as e:
+                    self.logger.error(f"Gagal menyalakan worker browser: {e}")
+                    continue
+                worker_id = len(self.scrapers)
+                scraper.worker_id = worker_id
+                self.scrapers.append(scraper)
+                self.stats[worker_id] = WorkerStats(worker_id)
+                self._idle.put(scraper)
+
+        if not self.scrapers:
+            raise RuntimeError("Tidak ada worker browser yang berhasil dinyalakan.")
+        startup = [s.startup_seconds for s in self.scrapers if s.startup_seconds is not None]
+        if startup:
+            self.logger.info(
+                f"{len(self.scrapers)} worker browser siap (startup rata-rata {sum(startup) / len(startup):.2f} "
+                f"detik, maks {max(startup):.2f} detik)."
+            )
+        else:
+            self.logger.info(f"{len(self.scrapers)} worker browser siap.")
+        return self
+
+    def _run_task(self, func, *args):
+        """Meminjam satu scraper, menjalankan tugas, lalu mengembalikannya ke pool."""
+        scraper = self._idle.get()
+        started = time.perf_counter()
+        products, count = [], 0
+        try:
+            products, count = func(scraper, *args)
+        except Exception as e:
+            self.logger.error(f"Worker {scraper.worker_id} gagal memproses {args}: {e}")
+            with self._stats_lock:
+                self._failed_queries.add(args[0])
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                stats = self.stats[scraper.worker_id]
+                stats.tasks += 1
+                stats.products += count
+                stats.busy_seconds += elapsed
+            self._idle.put(scraper)
+        return products
+
+    def run(self, queries, max_products, max_pages, split_pages=False, on_page_complete=None,
+            checkpoint=None, collect=True):
+        """
+        Menjalankan scraping untuk semua query menggunakan worker di pool.
+
+        Args:
+            queries (list): Daftar kata kunci pencarian.
+            max_products (int): Batas produk per query.
+            max_pages (int): Batas halaman per query.
+            split_pages (bool): Jika True, setiap halaman menjadi tugas terpisah.
+            on_page_complete (callable, optional): Diteruskan ke scraper; dipanggil
+                `on_page_complete(query, page, products)` setiap halaman selesai.
+            checkpoint (CheckpointStore, optional): Halaman yang sudah selesai dilewati.
+                Query yang selesai tanpa error dicatat di `completed_queries`; pemanggil
+                menghapus checkpoint-nya setelah semua produk benar-benar tersimpan.
+            collect (bool): Jika False, produk hanya diteruskan ke `on_page_complete`
+                dan tidak ditahan di memori (hasil berupa list kosong).
+
+        Returns:
+            dict: Mapping query -> daftar produk yang diambil pada run ini.
+        """
+        if not self.scrapers:
+            self.start()
+
+        self._on_page_complete = on_page_complete
+        self._checkpoint = checkpoint
+        self._collect = collect
+        self._failed_queries = set()
+        self.completed_queries = set()
+        started = time.perf_counter()
+        results = {query: [] for query in queries}
+
+        with ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
+            if split_pages:
+                self._page_products = {
+                    query: checkpoint.product_count(query) if checkpoint else 0 for query in queries
+                }
+                futures = {
+                    executor.submit(self._run_task, self._scrape_single_page, query, page, max_products): (query, page)
+                    for query in queries
+                    for page in range(1, max_pages + 1)
+                    if not checkpoint or page not in checkpoint.completed_pages(query)
+                }
+                pages_per_query = {query: {} for query in queries}
+                for future in as_completed(futures):
+                    query, page = futures[future]
+                    pages_per_query[query][page] = future.result()
+                for query, pages in pages_per_query.items():
+                    for page in sorted(pages):
+                        results[query].extend(pages[page])
+                    results[query] = results[query][:max_products]
+                    if query not in self._failed_queries:
+                        self.completed_queries.add(query)
+            else:
+                futures = {
+                    executor.submit(self._run_task, self._scrape_query, query, max_products, max_pages): query
+                    for query in queries
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+
+        self.wall_seconds = time.perf_counter() - started
+        return results
+
+    def _scrape_query(self, scraper, query, max_products, max_pages):
+        start_page = 1
+        if self._checkpoint:
+            start_page = self._checkpoint.last_completed_page(query) + 1
+            max_products -= self._checkpoint.product_count(query)
+            if start_page > 1:
+                self.logger.info(f"Melanjutkan query '{query}' dari halaman {start_page}")
+
+        products = []
+        self.summaries.pop(query, None)
+        if start_page <= max_pages and max_products > 0:
+            products = scraper.scrape(
+                search_query=query, max_products=max_products, max_pages=max_pages,
+                start_page=start_page, on_page_complete=self._on_page_complete,
+                collect=self._collect
+            )
+            self.summaries[query] = scraper.run_summary
+
+        summary = self.summaries.get(query, {})
+        if summary.get("stop_reason") != "error" and not summary.get("failed_pages"):
+            self.completed_queries.add(query)
+        return products, summary.get("products", len(products))
+
+    def _scrape_single_page(self, scraper, query, page, max_products):
+        # Lewati halaman setelah penanda akhir hasil pencarian ditemukan untuk query ini,
+        # atau jika batas produk query sudah tercapai oleh halaman lain
+        with self._stats_lock:
+            end_page = self._end_pages.get(query)
+            if (end_page is not None and page > end_page) or self._page_products.get(query, 0) >= max_products:
+                self.pages_skipped += 1
+                return [], 0
+
+        products = scraper.scrape_page(query, page, max_products)
+        if scraper.last_page_status not in ("ok", "end"):
+            # Halaman captcha/timeout/kosong tidak diserahkan ke on_page_complete sehingga
+            # tidak tercatat di checkpoint; query tidak dianggap selesai agar halaman diulang
+            self.logger.warning(f"'{query}' halaman {page} tidak selesai ({scraper.last_page_status})")
+            with self._stats_lock:
+                self._failed_queries.add(query)
+            return [], 0
+        with self._stats_lock:
+            # Halaman selesai tidak berurutan; sisa kuota dibagi berdasarkan urutan selesai
+            remaining = max(0, max_products - self._page_products.get(query, 0))
+            products = products[:remaining]
+            self._page_products[query] = self._page_products.get(query, 0) + len(products)
+        if self._on_page_complete:
+            self._on_page_complete(query, page, products)
+        if scraper.last_page_status == "end":
+            with self._stats_lock:
+                self._end_pages[query] = min(page, self._end_pages.get(query, page))
+        return (products if self._collect else []), len(products)
+
+    def run_queue(self, job_queue, node_id, on_page_complete=None, idle_exit=True, poll_seconds=10,
+                  complete_on_save=False):
+        """
+        Mode antrean terdistribusi: setiap worker browser mengklaim item (query, page)
+        dari `job_queue` sampai antrean habis.
+
+        Args:
+            job_queue (JobQueue): Antrean MongoDB bersama.
+            node_id (str): Identitas mesin ini; ID worker menjadi "<node_id>-<worker_id>".
+            on_page_complete (callable, optional): Dipanggil `on_page_complete(query, page, products)`
+                sebelum item ditandai selesai. Halaman berstatus selain "ok"/"end" tidak
+                diserahkan; itemnya dikembalikan lewat `job_queue.fail` untuk dicoba lagi.
+            complete_on_save (bool): Jika True, item tidak ditandai selesai di sini melainkan
+                oleh `job_queue.page_saved` yang dipasang sebagai `on_page_saved` ProductWriter,
+                sehingga item baru selesai setelah produknya benar-benar tersimpan.
+            idle_exit (bool): Berhenti saat tidak ada item yang bisa diklaim dan semua item
+                sudah selesai. Jika False, worker terus menunggu item baru.
+            poll_seconds (float): Jeda sebelum mencoba klaim lagi saat antrean kosong.
+        """
+        if not self.scrapers:
+            self.start()
+        started = time.perf_counter()
+
+        def work():
+            while True:
+                scraper = self._idle.get()
+                worker_id = f"{node_id}-{scraper.worker_id}"
+                job = job_queue.claim(worker_id)
+                if job is None:
+                    self._idle.put(scraper)
+                    if idle_exit and job_queue.is_finished():
+                        return
+                    time.sleep(poll_seconds)
+                    continue
+
+                task_started = time.perf_counter()
+                products = []
+                try:
+                    products = scraper.scrape_page(job["query"], job["page"])
+                    if scraper.last_page_status not in ("ok", "end"):
+                        # Captcha/timeout/halaman kosong: item dikembalikan ke antrean untuk dicoba lagi
+                        status = job_queue.fail(job, worker_id, f"page status {scraper.last_page_status}")
+                        self.logger.warning(f"Worker {worker_id}: '{job['query']}' halaman {job['page']} "
+                                            f"{scraper.last_page_status} (status {status})")
+                        products = []
+                        continue
+                    if complete_on_save:
+                        job_queue.scraped(job, worker_id, scraper.last_page_status)
+                    if on_page_complete:
+                        on_page_complete(job["query"], job["page"], products)
+                    if not complete_on_save:
+                        job_queue.complete(job, worker_id, len(products), scraper.last_page_status)
+                except Exception as e:
+                    status = job_queue.fail(job, worker_id, e)
+                    self.logger.error(f"Worker {worker_id} gagal pada '{job['query']}' halaman {job['page']} "
+                                      f"(percobaan {job['attempts']}, status {status}): {e}")
+                finally:
+                    with self._stats_lock:
+                        stats = self.stats[scraper.worker_id]
+                        stats.tasks += 1
+                        stats.products += len(products)
+                        stats.busy_seconds += time.perf_counter() - task_started
+                    self._idle.put(scraper)
+
+        with ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
+            for future in [executor.submit(work) for _ in self.scrapers]:
+                future.result()
+        self.wall_seconds = time.perf_counter() - started
+
+    def report(self):
+        """Mencatat total waktu dan throughput per worker ke log."""
+        total_products = sum(s.products for s in self.stats.values())
+        self.logger.info(
+            f"Total waktu: {self.wall_seconds:.1f} detik, {total_products} produk "
+            f"dengan {len(self.scrapers)} worker"
+        )
+        for stats in self.stats.values():
+            self.logger.info(
+                f"  Worker {stats.worker_id}: {stats.tasks} tugas, {stats.products} produk, "
+                f"sibuk {stats.busy_seconds:.1f} detik ({stats.products_per_minute:.1f} produk/menit)"
+            )
+
+        pages_saved = self.pages_skipped + sum(s.get("pages_saved", 0) for s in self.summaries.values())
+        seconds_saved = sum(s.get("seconds_saved", 0.0) for s in self.summaries.values())
+        if pages_saved:
+            self.logger.info(f"Deteksi akhir hasil pencarian menghemat {pages_saved} halaman (~{seconds_saved:.0f} detik)")
+
+    def close(self):
+        """Menutup semua browser di pool."""
+        for scraper in self.scrapers:
+            try:
+                scraper.close()
+            except Exception as e:
+                self.logger.warning(f"Gagal menutup worker {scraper.worker_id}: {e}")
+        self.scrapers = []
@@ -0,0 +1,244 @@
+# scrapers/spec_scraper.py
+# Mesin ekstraksi bersama untuk semua marketplace yang didefinisikan di specs.py.
+
+import re
+import time
+from .base_scraper import BaseScraper
+
+# Script yang dijalankan sekali per halaman untuk mengekstrak semua kartu.
+# arguments[0]: daftar elemen kartu, arguments[1]: selector per field (urutan prioritas),
+# arguments[2]: fallback teks per field {field: [kata kunci, regex|null]},
+# arguments[3]: selector elemen URL.
+# Logika fallback sama dengan ekstraksi per kartu di SpecScraper.
+BATCH_EXTRACT_SCRIPT = """
+const cards = arguments[0];
+const selectors = arguments[1];
+const fallbacks = arguments[2];
+const urlSelectors = arguments[3];
+
+// Mengembalikan teks dari selector pertama yang berhasil dan mencatat posisinya di hits
+function firstText(card, field, hits) {
+    const list = selectors[field];
+    for (let i = 0; i < list.length; i++) {
+        let el = null;
+        try { el = card.querySelector(list[i]); } catch (e) { continue; }
+        const text = el ? (el.innerText || '').trim() : '';
+        if (text) { hits[field] = i; return text; }
+    }
+    hits[field] = null;
+    return null;
+}
+
+function scanText(card, keyword) {
+    for (const el of card.querySelectorAll('div, span')) {
+        const text = (el.innerText || '').trim();
+        if (text && text.includes(keyword)) return text;
+    }
+    return null;
+}
+
+function extractUrl(card) {
+    if (card.href) return card.href;
+    for (const selector of urlSelectors) {
+        let el = null;
+        try { el = card.querySelector(selector); } catch (e) { continue; }
+        if (el && el.href) return el.href;
+    }
+    return null;
+}
+
+return cards.map(function (card) {
+    const hits = {};
+    const row = {};
+    for (const field of Object.keys(selectors)) {
+        let text = firstText(card, field, hits);
+        const fallback = fallbacks[field];
+        if (text === null && fallback) {
+            text = scanText(card, fallback[0]);
+            const match = text && fallback[1] ? text.match(new RegExp(fallback[1])) : null;
+            if (match) text = match[0];
+        }
+        row[field] = text;
+    }
+    row.product_url = extractUrl(card);
+    row._hits = hits;
+    return row;
+});
+"""
+
+
+class SpecScraper(BaseScraper):
+    """
+    Scraper generik yang dijalankan oleh sebuah MarketplaceSpec.
+
+    Subclass cukup mengisi `SPEC`. Ekstraksi batch (satu round-trip per halaman),
+    ekstraksi HTML offline, ekstraksi per kartu, telemetri selector, dan metrik
+    berlaku sama untuk semua marketplace.
+    """
+    SPEC = None
+
+    def __init__(self, spec=None, **kwargs):
+        """
+        Args:
+            spec (MarketplaceSpec, optional): Spec yang dipakai; default `SPEC` kelas.
+            **kwargs: Diteruskan ke BaseScraper.
+        """
+        self.spec = spec or self.SPEC
+        if self.spec is None:
+            raise ValueError("SpecScraper membutuhkan MarketplaceSpec")
+        self.BASE_URL = self.spec.base_url
+        self._html_extractor = None
+        super().__init__(**kwargs)
+
+    def _get_url(self, search_query, page):
+        """URL pencarian sesuai spec (dengan base_url scraper ini)."""
+        return self.spec.build_url(search_query, page, self.base_url)
+
+    def _get_defaults(self):
+        """Nilai default jika data tidak ditemukan."""
+        return dict(self.spec.defaults)
+
+    def _get_initial_container_selectors(self):
+        """Selector untuk container utama yang menandakan halaman telah dimuat."""
+        return self.spec.initial_container_selectors
+
+    def _get_empty_result_selectors(self):
+        """Selector penanda halaman tanpa hasil pencarian."""
+        return self.spec.empty_result_selectors
+
+    def _get_card_selectors(self):
+        """Daftar selector untuk menemukan setiap kartu produk."""
+        return self.spec.card_selectors
+
+    def _get_field_selectors(self):
+        """
+        Selector untuk semua field, dalam urutan yang sudah disesuaikan dengan
+        telemetri selector (jika aktif).
+        """
+        return {
+            field: self._ordered_selectors(field, items)
+            for field, items in self.spec.field_selectors.items()
+        }
+
+    def _build_product(self, fields):
+        """Menyusun dictionary produk; None jika field wajib tidak berhasil diekstrak."""
+        return self.spec.build_product(fields)
+
+    def _extract_products_batch(self, cards):
+        """
+        Mengekstrak semua kartu di halaman dengan satu panggilan execute_script.
+        """
+        if not cards:
+            return []
+
+        field_selectors = self._get_field_selectors()
+        fallbacks = {field: list(item) for field, item in self.spec.text_fallbacks.items()}
+        rows = self.driver.execute_script(
+            BATCH_EXTRACT_SCRIPT, cards, field_selectors, fallbacks, self.spec.url_selectors
+        )
+        defaults = self._get_defaults()
+
+        if self.selector_stats:
+            self.selector_stats.record_cards(len(rows or []))
+        products = []
+        for row in rows or []:
+            for field, hit_index in row.pop("_hits", {}).items():
+                self._record_selector_lookup(field, field_selectors[field], hit_index)
+            fields = {key: value if value else defaults[key] for key, value in row.items()}
+            product = self._build_product(fields)
+            if product:
+                products.append(product)
+        return products
+
+    def _extract_products_from_html(self, html):
+        """
+        Mengekstrak semua kartu dari page_source tanpa query elemen ke browser.
+        """
+        from .html_extractor import HtmlExtractor
+
+        if self._html_extractor is None:
+            self._html_extractor = HtmlExtractor.from_spec(
+                self.spec, base_url=self.base_url, stats=self.selector_stats
+            )
+        rows = self._html_extractor.extract(html)
+        products = [product for product in map(self._build_product, rows) if product]
+        return products, len(rows)
+
+    def _extract_product_data(self, card):
+        """
+        Mengekstrak semua data dari satu kartu produk.
+        """
+        defaults = self._get_defaults()
+
+        try:
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card)
+            time.sleep(0.5)
+        except:
+            pass
+
+        if self.selector_stats:
+            self.selector_stats.record_cards(1)
+
+        fields = {}
+        for field, selectors in self.spec.field_selectors.items():
+            text = self._find_first_text(card, selectors, field)
+            if text is None and field in self.spec.text_fallbacks:
+                keyword, pattern = self.spec.text_fallbacks[field]
+                text = self._scan_text(card, keyword, pattern)
+            fields[field] = text or defaults[field]
+
+        fields["product_url"] = self._extract_url(card) or defaults["product_url"]
+
+        # Hanya return data jika field wajib (nama produk) berhasil diekstrak
+        return self._build_product(fields)
+
+    def _find_first_text(self, parent_element, selectors, field):
+        """
+        Mencoba selector sesuai urutan (disesuaikan telemetri) dan mencatat hit/miss.
+        Return teks dari selector pertama yang berhasil, atau None.
+        """
+        ordered = self._ordered_selectors(field, selectors)
+        for index, selector in enumerate(ordered):
+            try:
+                element = parent_element.find_element(self.By.CSS_SELECTOR, selector)
+                text = element.text.strip()
+                if text:
+                    self._record_selector_lookup(field, ordered, index)
+                    return text
+            except:
+                continue
+        self._record_selector_lookup(field, ordered, None)
+        return None
+
+    def _scan_text(self, parent_element, keyword, pattern=None):
+        """
+        Fallback: teks div/span pertama yang mengandung `keyword`, dipotong dengan
+        regex `pattern` jika cocok.
+        """
+        try:
+            elements = parent_element.find_elements(self.By.CSS_SELECTOR, "div, span")
+            for element in elements:
+                text = element.text.strip()
+                if text and keyword in text:
+                    match = re.search(pattern, text) if pattern else None
+                    return match.group(0) if match else text
+        except:
+            pass
+        return None
+
+    def _extract_url(self, card):
+        """URL produk dari href kartu itu sendiri atau elemen `url_selectors` pertama."""
+        try:
+            url = card.get_attribute('href')
+            if url:
+                return url
+        except:
+            pass
+        for selector in self.spec.url_selectors:
+            try:
+                url = card.find_element(self.By.CSS_SELECTOR, selector).get_attribute('href')
+                if url:
+                    return url
+            except:
+                continue
+        return None
@@ -0,0 +1,139 @@
+# scrapers/specs.py
+# Definisi deklaratif marketplace: format URL, paginasi, selector kartu dan
+# selector per field beserta post-processor. Satu mesin ekstraksi (SpecScraper,
+# HtmlExtractor) menjalankan semua spec, sehingga marketplace baru cukup
+# ditambahkan sebagai data di file ini tanpa menyalin kode ekstraksi.
+
+import datetime
+from urllib.parse import quote
+
+from utils.data_cleaner import clean_price, clean_sold_count
+from . import tokopedia_selectors
+
+
+class MarketplaceSpec:
+    """
+    Spesifikasi satu marketplace.
+
+    Field mentah diekstrak dengan mencoba `field_selectors[field]` sesuai urutan.
+    Jika semua gagal dan field punya `text_fallbacks`, teks elemen div/span pertama
+    yang mengandung kata kunci dipakai (dipotong dengan regex bila diberikan).
+    Field yang punya `cleaners` disimpan sebagai `<field>_raw` dan `<field>_clean`.
+    """
+
+    def __init__(self, name, base_url, search_path, card_selectors, field_selectors, defaults,
+                 page_param="page", page_offset=0, omit_first_page_param=False,
+                 initial_container_selectors=None, empty_result_selectors=None,
+                 url_selectors=("a[href]",), text_fallbacks=None, cleaners=None,
+                 required_field="product_name"):
+        """
+        Args:
+            name (str): Nama marketplace, disimpan di field `ecommerce`.
+            base_url (str): URL dasar situs (bisa di-override per scraper, misal ke server replay).
+            search_path (str): Path pencarian dengan placeholder `{query}`.
+            card_selectors (list): Selector kartu produk, urutan prioritas.
+            field_selectors (dict): Nama field -> daftar selector, urutan prioritas.
+            defaults (dict): Nilai default per field (termasuk `product_url`).
+            page_param (str): Nama parameter halaman di URL.
+            page_offset (int): Ditambahkan ke nomor halaman (misal -1 jika situs mulai dari 0).
+            omit_first_page_param (bool): Halaman 1 tanpa parameter halaman.
+            initial_container_selectors (list, optional): Penanda halaman selesai dimuat.
+                Default: selector kartu.
+            empty_result_selectors (list, optional): Penanda hasil pencarian habis.
+            url_selectors (tuple): Selector elemen yang href-nya menjadi URL produk.
+            text_fallbacks (dict, optional): Field -> (kata kunci, regex atau None).
+            cleaners (dict, optional): Field -> fungsi pembersih teks mentah.
+            required_field (str): Produk dibuang jika field ini bernilai default.
+        """
+        self.name = name
+        self.base_url = base_url
+        self.search_path = search_path
+        self.card_selectors = list(card_selectors)
+        self.field_selectors = {field: list(items) for field, items in field_selectors.items()}
+        self.defaults = dict(defaults)
+        self.page_param = page_param
+        self.page_offset = page_offset
+        self.omit_first_page_param = omit_first_page_param
+        self.initial_container_selectors = list(initial_container_selectors or card_selectors)
+        self.empty_result_selectors = list(empty_result_selectors or [])
+        self.url_selectors = list(url_selectors)
+        self.text_fallbacks = dict(text_fallbacks or {})
+        self.cleaners = dict(cleaners or {})
+        self.required_field = required_field
+
+    def build_url(self, search_query, page, base_url=None):
+        """URL halaman hasil pencarian ke-`page` (mulai dari 1)."""
+        url = (base_url or self.base_url).rstrip("/") + self.search_path.format(query=quote(search_query))
+        if page == 1 and self.omit_first_page_param:
+            return url
+        separator = "&" if "?" in url else "?"
+        return f"{url}{separator}{self.page_param}={page + self.page_offset}"
+
+    def build_product(self, fields):
+        """
+        Menyusun dictionary produk dari field mentah (sudah diisi default).
+        Return None jika `required_field` tidak berhasil diekstrak.
+        """
+        if fields.get(self.required_field) == self.defaults.get(self.required_field):
+            return None
+
+        product = {
+            "timestamp_scrape": datetime.datetime.now().isoformat(),
+            "ecommerce": self.name,
+        }
+        for field, value in fields.items():
+            cleaner = self.cleaners.get(field)
+            if cleaner:
+                product[f"{field}_raw"] = value
+                product[f"{field}_clean"] = cleaner(value)
+            else:
+                product[field] = value
+        return product
+
+
+# Pola teks harga yang dipakai saat semua selector harga gagal
+PRICE_PATTERN = r'Rp[\d.,]+'
+
+TOKOPEDIA = MarketplaceSpec(
+    name="Tokopedia",
+    base_url=tokopedia_selectors.BASE_URL,
+    search_path="/search?st=&q={query}",
+    omit_first_page_param=True,
+    initial_container_selectors=tokopedia_selectors.INITIAL_CONTAINER_SELECTORS,
+    empty_result_selectors=tokopedia_selectors.EMPTY_RESULT_SELECTORS,
+    card_selectors=tokopedia_selectors.CARD_SELECTORS,
+    field_selectors=tokopedia_selectors.FIELD_SELECTORS,
+    defaults=tokopedia_selectors.DEFAULTS,
+    text_fallbacks={"price": ("Rp", PRICE_PATTERN), "sold_count": ("terjual", None)},
+    cleaners={"price": clean_price, "sold_count": clean_sold_count},
+)
+
+SHOPEE = MarketplaceSpec(
+    name="Shopee",
+    base_url="https://shopee.co.id",
+    search_path="/search?keyword={query}",
+    # Halaman di Shopee dimulai dari page=0
+    page_offset=-1,
+    card_selectors=['div[data-sqe="item"]'],
+    field_selectors={
+        "product_name": ['div[data-sqe="name"] > div'],
+        "price": ['div._3_NTr6 span.ZEgDH9'],
+        # Nama toko tidak ada di kartu produk utama Shopee
+        "shop_name": [],
+        "location": ['div._1_U22_'],
+        "sold_count": ['div.z-ve1m'],
+    },
+    defaults={
+        "product_name": "Nama produk tidak tersedia",
+        "price": "0",
+        "shop_name": "N/A on card",
+        "location": "Lokasi tidak tersedia",
+        "sold_count": "0 terjual",
+        "product_url": "URL tidak tersedia",
+    },
+    url_selectors=("a",),
+    text_fallbacks={"price": ("Rp", PRICE_PATTERN), "sold_count": ("terjual", None)},
+    cleaners={"price": clean_price, "sold_count": clean_sold_count},
+)
+
+SPECS = {spec.name.lower(): spec for spec in (TOKOPEDIA, SHOPEE)}
@@ -0,0 +1,82 @@
+# scrapers/tokopedia_selectors.py
+# Daftar selector CSS Tokopedia. Dipisah dari TokopediaScraper agar bisa dipakai
+# tanpa Selenium, misalnya oleh HtmlExtractor untuk ekstraksi offline.
+
+# Container utama yang menandakan halaman telah dimuat
+INITIAL_CONTAINER_SELECTORS = [
+    'div[data-testid="divSRPContentProducts"]',
+    '.css-jza1fo',
+    '.css-5wh65g'
+]
+
+# Penanda halaman "Oops, produk nggak ditemukan" (hasil pencarian habis)
+EMPTY_RESULT_SELECTORS = [
+    'img[data-testid="imgSRPNotFoundImage"]'
+]
+
+# Setiap kartu produk
+CARD_SELECTORS = [
+    '.css-jza1fo',    # Main selector
+    '.css-5wh65g',    # Alternative selector
+    'div[data-testid="divProductWrapper"]',
+    'div[data-testid="divSRPContentProducts"] > div > div'
+]
+
+NAME_SELECTORS = [
+    'span[class*="_0T8-iGxMpV6NEsYEhwkqEg"]',
+    'span[class*="0T8-iGxMpV6NEsYEhwkqEg"]',
+    'div > div > div > span',
+    'span[data-testid="spnSRPProdName"]',
+    '.prd_link-product-name',
+    'div > a > div > div > div > span'
+]
+
+PRICE_SELECTORS = [
+    'div[class*="_67d6E1xDKIzw"]',
+    'div[class*="67d6E1xDKIzw"]',
+    'div[class*="t4jWW3NandT5hvCFAiotYg"]',
+    'span[data-testid="spnSRPProdPrice"]',
+    'div[class*="price"]'
+]
+
+SHOP_SELECTORS = [
+    'span[class*="T0rpy-LEwYNQifsgB-3SQw"]',
+    'span[class*="pC8DMVkBZGW7-egObcWMFQ"]',
+    'span[data-testid="spnSRPProdSellerName"]',
+    'span[class*="shop"]'
+]
+
+LOCATION_SELECTORS = [
+    'span[class*="pC8DMVkBZGW7-egObcWMFQ"]:last-child',
+    'span[data-testid="spnSRPProdTabShopLoc"]'
+]
+
+SOLD_COUNT_SELECTORS = [
+    'span[class*="se8WAnkjbVXZNA8mT+Veuw"]',
+    'span[class*="se8WAnkjbVXZNA8mT"]',
+    'span[class*="sold"]',
+    'div > div > span:contains("terjual")'
+]
+
+URL_SELECTORS = ['a']
+
+# Selector per field, dalam urutan prioritas
+FIELD_SELECTORS = {
+    "product_name": NAME_SELECTORS,
+    "price": PRICE_SELECTORS,
+    "shop_name": SHOP_SELECTORS,
+    "location": LOCATION_SELECTORS,
+    "sold_count": SOLD_COUNT_SELECTORS
+}
+
+# Nilai default jika data tidak ditemukan
+DEFAULTS = {
+    "product_name": "Nama produk tidak tersedia",
+    "price": "Harga tidak tersedia",
+    "shop_name": "Nama toko tidak tersedia",
+    "location": "Lokasi tidak tersedia",
+    "sold_count": "0 terjual",
+    "product_url": "URL tidak tersedia"
+}
+
+BASE_URL = "https://www.tokopedia.com"
@@ -0,0 +1,38 @@
+# storage/__init__.py
+# Pemilihan backend penyimpanan produk: "mongo" (default), "sqlite" atau "parquet".
+# Backend lokal tidak membutuhkan server database maupun pymongo.
+
+import os
+from .base import ProductStorage, PRODUCT_FIELDS
+
+BACKENDS = ("mongo", "sqlite", "parquet")
+
+
+def create_storage(backend="mongo", db_uri=None, db_name="harga_komoditas_db", path=None, spool=None):
+    """
+    Membuat backend penyimpanan.
+
+    Args:
+        backend (str): "mongo", "sqlite" atau "parquet".
+        db_uri (str, optional): Connection string MongoDB (hanya "mongo").
+        db_name (str): Nama database; juga dipakai untuk nama file/direktori backend lokal.
+        path (str, optional): File SQLite atau direktori dataset Parquet.
+            Default di bawah `local_store/`.
+        spool (WriteSpool, optional): Spool batch gagal (hanya "mongo"; backend lokal
+            menulis langsung ke disk sehingga spool ditolak).
+
+    Returns:
+        ProductStorage: Backend yang siap dipakai.
+    """
+    if spool is not None and backend != "mongo":
+        raise ValueError(f"Spool hanya didukung backend mongo, bukan '{backend}'")
+    if backend == "mongo":
+        from database import Database
+        return Database(db_uri=db_uri, db_name=db_name, spool=spool)
+    if backend == "sqlite":
+        from .sqlite_storage import SQLiteStorage
+        return SQLiteStorage(path or os.path.join("local_store", f"{db_name}.sqlite"))
+    if backend == "parquet":
+        from .parquet_storage import ParquetStorage
+        return ParquetStorage(path or os.path.join("local_store", db_name))
+    raise ValueError(f"Backend penyimpanan tidak dikenal: {backend} (pilihan: {', '.join(BACKENDS)})")
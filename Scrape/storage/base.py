@@ -0,0 +1,170 @@
+# storage/base.py
+# Antarmuka penyimpanan produk yang dipakai pipeline scraping, cleaning, dan ekspor.
+# Implementasi: Database (MongoDB, database.py), SQLiteStorage dan ParquetStorage.
+
+import json
+from abc import ABC, abstractmethod
+from utils.known_products import product_id_from_url
+from utils.logger_setup import get_logger
+
+# Field produk yang dipakai tahap cleaning (projection default untuk ekspor)
+PRODUCT_FIELDS = (
+    "timestamp_scrape", "ecommerce", "product_name", "price_raw", "price_clean", "shop_name",
+    "location", "sold_count_raw", "sold_count_clean", "product_url", "search_query",
+)
+
+# Field numerik; field lain disimpan sebagai teks oleh backend berskema
+NUMERIC_FIELDS = ("price_clean", "sold_count_clean")
+
+# Operator filter bergaya MongoDB yang didukung backend lokal
+QUERY_OPERATORS = ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in")
+
+
+def product_key(product):
+    """
+    Kunci kanonik (product_id, scrape_date) sebuah produk. ID diambil dari URL
+    produk; jika URL tidak tersedia dipakai kombinasi nama toko dan nama produk.
+    """
+    product_id = product_id_from_url(product.get("product_url"))
+    if not product_id:
+        product_id = f"{product.get('shop_name', '')}|{product.get('product_name', '')}".lower()
+    scrape_date = (product.get("timestamp_scrape") or "")[:10]
+    return product_id, scrape_date
+
+
+def parse_query(query):
+    """
+    Mengubah filter bergaya MongoDB sederhana menjadi daftar (field, operator, nilai).
+    Hanya mendukung kesetaraan dan operator di QUERY_OPERATORS yang digabung dengan AND.
+
+    Contoh: {"search_query": "gula aren", "price_clean": {"$gte": 10000}}
+    """
+    conditions = []
+    for field, condition in (query or {}).items():
+        if field.startswith("$"):
+            raise ValueError(f"Operator tingkat atas tidak didukung: {field}")
+        if isinstance(condition, dict):
+            for operator, value in condition.items():
+                if operator not in QUERY_OPERATORS:
+                    raise ValueError(f"Operator tidak didukung: {operator}")
+                conditions.append((field, operator, value))
+        else:
+            conditions.append((field, "$eq", condition))
+    return conditions
+
+
+class ProductStorage(ABC):
+    """
+    Kelas dasar abstrak backend penyimpanan produk.
+
+    Subclass wajib mengimplementasikan `save_products`, `iter_known_products`,
+    `iter_collection_chunks`, `count_documents` dan `drop_collection`. Method lain
+    punya implementasi umum di sini.
+    """
+
+    # Nama backend untuk log dan benchmark
+    name = None
+
+    def __init__(self, logger_name=None):
+        self.logger = get_logger(logger_name or self.__class__.__name__)
+        # Hasil tulis terakhir dari save_products: inserted, updated, unchanged
+        self.last_write_stats = {}
+
+    product_key = staticmethod(product_key)
+
+    @abstractmethod
+    def save_products(self, products, collection_name, upsert=False, batch_size=1000):
+        """
+        Menyimpan daftar produk ke collection. Dengan upsert=True produk dengan kunci
+        (product_id, scrape_date) yang sama diperbarui alih-alih diduplikasi. Kunci
+        hanya disimpan pada mode upsert, sehingga baris hasil mode insert tidak pernah
+        dicocokkan oleh upsert berikutnya (aturan yang sama di semua backend).
+
+        Returns:
+            int: Jumlah produk yang tersimpan (0 jika gagal).
+        """
+        pass
+
+    @abstractmethod
+    def iter_known_products(self, collection_name):
+        """Field minimal (URL, harga, terjual) produk tersimpan, dari yang terlama."""
+        pass
+
+    @abstractmethod
+    def iter_collection_chunks(self, collection_name, query=None, fields=None, chunk_size=5000,
+                               output="dataframe", include_id=False):
+        """Membaca collection per chunk ("dataframe", "arrow" atau "columns")."""
+        pass
+
+    @abstractmethod
+    def count_documents(self, collection_name, query=None):
+        """Jumlah dokumen/baris yang cocok dengan filter."""
+        pass
+
+    @abstractmethod
+    def drop_collection(self, collection_name):
+        """Menghapus seluruh isi collection."""
+        pass
+
+    def save_snapshots(self, products, search_query, run_id=None):
+        """
+        Snapshot riwayat harga. Backend lokal menyimpan setiap produk lengkap dengan
+        timestamp_scrape, sehingga riwayat dibaca langsung dari collection produk.
+        """
+        return 0
+
+    def replay_spool(self):
+        """Backend lokal tidak memakai spool."""
+        return 0
+
+    def close_connection(self):
+        """Menutup koneksi/berkas backend."""
+
+    def get_collection_data(self, collection_name, as_df=False, query=None, fields=None):
+        """
+        Mengambil data dari collection. Jika as_df=True, return DataFrame.
+        Seluruh hasil dimuat ke memori; untuk collection besar pakai `iter_collection_chunks`.
+        """
+        if as_df:
+            import pandas as pd
+            chunks = list(self.iter_collection_chunks(collection_name, query, fields, output="dataframe"))
+            return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        rows = []
+        for chunk in self.iter_collection_chunks(collection_name, query, fields, output="columns"):
+            names = list(chunk)
+            rows.extend(dict(zip(names, values)) for values in zip(*chunk.values()))
+        return rows
+
+    def export_collection(self, collection_name, path, query=None, fields=PRODUCT_FIELDS, chunk_size=5000):
+        """
+        Mengekspor collection ke file JSON array (format yang dibaca tahap cleaning)
+        secara bertahap, tanpa memuat seluruh collection ke memori.
+
+        Returns:
+            int: Jumlah dokumen yang ditulis.
+        """
+        written = 0
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for chunk in self.iter_collection_chunks(collection_name, query, fields, chunk_size, output="columns"):
+                names = list(chunk)
+                for values in zip(*chunk.values()):
+                    f.write(",\n" if written else "\n")
+                    f.write(json.dumps(dict(zip(names, values)), ensure_ascii=False, default=str))
+                    written += 1
+            f.write("\n]\n")
+        self.logger.info(f"{written} dokumen dari '{collection_name}' diekspor ke {path}")
+        return written
+
+
+def build_chunk(columns, output):
+    """Mengubah dict kolom menjadi chunk sesuai `output`."""
+    if output == "dataframe":
+        import pandas as pd
+        return pd.DataFrame(columns)
+    if output == "arrow":
+        import pyarrow as pa
+        return pa.table(columns)
+    if output == "columns":
+        return columns
+    raise ValueError(f"Output tidak dikenal: {output}")
@@ -0,0 +1,248 @@
+# storage/parquet_storage.py
+# Backend penyimpanan produk sebagai dataset Parquet lokal yang dipartisi per
+# query dan tanggal scraping, untuk analitik kolumnar tanpa server database.
+
+import os
+import shutil
+import threading
+import uuid
+from urllib.parse import quote
+from .base import ProductStorage, PRODUCT_FIELDS, NUMERIC_FIELDS, build_chunk, parse_query
+
+# Kolom partisi (bagian dari path, bukan isi file)
+PARTITION_FIELDS = ("search_query", "scrape_date")
+
+# Nilai partisi untuk produk tanpa search_query
+_MISSING_PARTITION = "_"
+
+
+def _row_key(row):
+    """
+    Kunci upsert sebuah baris: product_id yang tersimpan. Baris hasil mode insert
+    tidak punya product_id (None) sehingga tidak pernah digabung, sama seperti
+    unique index (product_id, scrape_date) di SQLite dan MongoDB.
+    """
+    return row.get("product_id")
+
+
+def _schemas():
+    import pyarrow as pa
+    file_fields = [
+        (field, pa.int64() if field in NUMERIC_FIELDS else pa.string())
+        for field in PRODUCT_FIELDS + ("product_id",) if field not in PARTITION_FIELDS
+    ]
+    file_schema = pa.schema(file_fields)
+    partition_schema = pa.schema([(field, pa.string()) for field in PARTITION_FIELDS])
+    return file_schema, partition_schema
+
+
+class ParquetStorage(ProductStorage):
+    """
+    Dataset Parquet dengan layout hive:
+    `<root>/<collection>/search_query=<query>/scrape_date=<YYYY-MM-DD>/part-*.parquet`.
+
+    Mode insert menambah satu file per partisi per batch. Mode upsert menggabungkan
+    batch dengan isi partisi yang sama (per kunci product_id, terakhir menang) lalu
+    menulis ulang partisi itu saja; partisi per query per hari kecil sehingga murah.
+    Baris lama tanpa product_id (mode insert) tidak pernah dicocokkan dan ditulis
+    ulang apa adanya, sama seperti backend SQLite dan MongoDB.
+    Pembacaan memakai pyarrow.dataset: filter pada kolom partisi memangkas direktori
+    yang dibaca dan filter kolom lain memakai statistik row group (predicate pushdown).
+    Hanya field di PRODUCT_FIELDS yang disimpan.
+    """
+    name = "parquet"
+
+    def __init__(self, root=os.path.join("local_store", "harga_komoditas_db")):
+        super().__init__("ParquetStorage")
+        self.root = root
+        self._lock = threading.Lock()
+        self.file_schema, self.partition_schema = _schemas()
+        os.makedirs(root, exist_ok=True)
+        self.logger.info(f"Memakai penyimpanan Parquet: {root}")
+
+    def _collection_dir(self, collection_name):
+        return os.path.join(self.root, collection_name)
+
+    def _partition_dir(self, collection_name, search_query, scrape_date):
+        return os.path.join(
+            self._collection_dir(collection_name),
+            f"search_query={quote(search_query or _MISSING_PARTITION, safe='')}",
+            f"scrape_date={quote(scrape_date or _MISSING_PARTITION, safe='')}",
+        )
+
+    def _write_file(self, directory, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pylist(
+            [{field: row.get(field) for field in self.file_schema.names} for row in rows],
+            schema=self.file_schema
+        )
+        path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+        # Ditulis ke file sementara lalu di-rename agar pembaca tidak melihat file setengah jadi
+        try:
+            pq.write_table(table, path + ".tmp", compression="zstd")
+            with open(path + ".tmp", "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+        except Exception:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+            raise
+        return path
+
+    @staticmethod
+    def _part_files(directory):
+        if not os.path.isdir(directory):
+            return []
+        return [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".parquet")]
+
+    def save_products(self, products, collection_name, upsert=False, batch_size=1000):
+        if not products:
+            self.logger.warning("Tidak ada produk untuk disimpan.")
+            return 0
+
+        partitions = {}
+        for product in products:
+            product_id, scrape_date = self.product_key(product)
+            row = dict(product, product_id=product_id if upsert else None)
+            key = (product.get("search_query"), scrape_date)
+            partitions.setdefault(key, []).append(row)
+
+        stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+        try:
+            with self._lock:
+                for (search_query, scrape_date), rows in partitions.items():
+                    directory = self._partition_dir(collection_name, search_query, scrape_date)
+                    if upsert:
+                        self._upsert_partition(directory, rows, stats)
+                    else:
+                        self._write_file(directory, rows)
+                        stats["inserted"] += len(rows)
+        except Exception as e:
+            self.logger.error(f"Gagal menyimpan produk ke dataset '{collection_name}': {e}")
+            return 0
+
+        self.last_write_stats = stats
+        self.logger.info(
+            f"Simpan ke '{collection_name}' (Parquet): {stats['inserted']} baru, {stats['updated']} diperbarui, "
+            f"{stats['unchanged']} tidak berubah ({len(partitions)} partisi)."
+        )
+        return len(products)
+
+    def _upsert_partition(self, directory, rows, stats):
+        import pyarrow.parquet as pq
+
+        old_files = self._part_files(directory)
+        merged = []
+        positions = {}
+        for path in old_files:
+            for row in pq.read_table(path, schema=self.file_schema).to_pylist():
+                key = _row_key(row)
+                if key is not None:
+                    positions[key] = len(merged)
+                merged.append(row)
+
+        changed = False
+        for row in rows:
+            row = {field: row.get(field) for field in self.file_schema.names}
+            key = _row_key(row)
+            position = positions.get(key) if key is not None else None
+            if position is None:
+                stats["inserted"] += 1
+                if key is not None:
+                    positions[key] = len(merged)
+                merged.append(row)
+                changed = True
+                continue
+            current = merged[position]
+            # timestamp_scrape hanya diisi saat pertama kali (sama dengan upsert MongoDB)
+            row["timestamp_scrape"] = current["timestamp_scrape"]
+            if row == current:
+                stats["unchanged"] += 1
+                continue
+            stats["updated"] += 1
+            merged[position] = row
+            changed = True
+
+        if changed:
+            # File lama baru dihapus setelah file pengganti selesai ditulis dan di-rename;
+            # jika penulisan gagal, partisi tetap berisi file lama
+            self._write_file(directory, merged)
+            for path in old_files:
+                os.remove(path)
+
+    def _dataset(self, collection_name):
+        import pyarrow.dataset as ds
+
+        directory = self._collection_dir(collection_name)
+        if not os.path.isdir(directory):
+            return None
+        partitioning = ds.partitioning(self.partition_schema, flavor="hive")
+        schema = self.file_schema
+        for field in self.partition_schema:
+            schema = schema.append(field)
+        return ds.dataset(directory, format="parquet", partitioning=partitioning, schema=schema)
+
+    @staticmethod
+    def _filter(query):
+        import pyarrow.dataset as ds
+
+        expression = None
+        for field, operator, value in parse_query(query):
+            column = ds.field(field)
+            if operator == "$in":
+                condition = column.isin(list(value))
+            elif value is None and operator in ("$eq", "$ne"):
+                condition = column.is_valid() if operator == "$ne" else ~column.is_valid()
+            else:
+                condition = {
+                    "$eq": column == value, "$ne": column != value, "$gt": column > value,
+                    "$gte": column >= value, "$lt": column < value, "$lte": column <= value,
+                }[operator]
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def iter_collection_chunks(self, collection_name, query=None, fields=None, chunk_size=5000,
+                               output="dataframe", include_id=False):
+        """
+        Membaca dataset per record batch dengan projection kolom dan filter yang
+        didorong ke pembaca Parquet. `include_id` diabaikan (Parquet tidak punya `_id`).
+        """
+        import pyarrow as pa
+
+        dataset = self._dataset(collection_name)
+        if dataset is None:
+            return
+        scanner = dataset.scanner(columns=list(fields) if fields else None, filter=self._filter(query),
+                                  batch_size=chunk_size)
+        for batch in scanner.to_batches():
+            if batch.num_rows == 0:
+                continue
+            if output == "arrow":
+                yield pa.Table.from_batches([batch])
+            elif output == "dataframe":
+                yield batch.to_pandas()
+            else:
+                yield build_chunk(batch.to_pydict(), output)
+
+    def iter_known_products(self, collection_name):
+        """Field minimal (URL, harga, terjual) produk tersimpan, dari yang terlama."""
+        try:
+            dataset = self._dataset(collection_name)
+            if dataset is None:
+                return
+            table = dataset.to_table(columns=["product_url", "price_raw", "sold_count_raw", "timestamp_scrape"])
+            table = table.sort_by("timestamp_scrape").drop_columns(["timestamp_scrape"])
+            yield from table.to_pylist()
+        except Exception as e:
+            self.logger.error(f"Gagal membaca produk yang sudah dikenal dari '{collection_name}': {e}")
+
+    def count_documents(self, collection_name, query=None):
+        dataset = self._dataset(collection_name)
+        return dataset.count_rows(filter=self._filter(query)) if dataset is not None else 0
+
+    def drop_collection(self, collection_name):
+        with self._lock:
+            shutil.rmtree(self._collection_dir(collection_name), ignore_errors=True)
@@ -0,0 +1,195 @@
+# storage/sqlite_storage.py
+# Backend penyimpanan produk di satu file SQLite (tanpa server database).
+
+import os
+import sqlite3
+import threading
+from .base import ProductStorage, PRODUCT_FIELDS, NUMERIC_FIELDS, build_chunk, parse_query
+
+# Operator filter -> operator SQL
+_SQL_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+# Kolom yang tidak ikut diperbarui saat upsert (sama dengan _INSERT_ONLY_FIELDS di MongoDB)
+_INSERT_ONLY_COLUMNS = ("timestamp_scrape", "product_id", "scrape_date")
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLiteStorage(ProductStorage):
+    """
+    Satu tabel per collection dengan kolom produk, `product_id` dan `scrape_date`.
+    Field di luar skema ditambahkan sebagai kolom baru saat pertama kali muncul.
+
+    Seperti di MongoDB, `product_id`/`scrape_date` hanya diisi pada mode upsert
+    (unique index mengabaikan NULL), sehingga mode insert tetap menambah baris.
+    Mode WAL dipakai agar pembacaan tidak menunggu thread penulis.
+    """
+    name = "sqlite"
+
+    def __init__(self, path=os.path.join("local_store", "harga_komoditas_db.sqlite")):
+        super().__init__("SQLiteStorage")
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._columns = {}
+        self.logger.info(f"Memakai penyimpanan SQLite: {path}")
+
+    def _table_columns(self, table):
+        if table not in self._columns:
+            rows = self._conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+            self._columns[table] = [row[1] for row in rows]
+        return self._columns[table]
+
+    def _ensure_table(self, table, fields=()):
+        columns = self._table_columns(table)
+        if not columns:
+            definitions = ", ".join(
+                f"{_quote(field)} {'INTEGER' if field in NUMERIC_FIELDS else 'TEXT'}"
+                for field in PRODUCT_FIELDS + ("product_id", "scrape_date")
+            )
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({definitions})")
+            self._conn.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(table + '_product_id_scrape_date')} "
+                f"ON {_quote(table)} (product_id, scrape_date)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(table + '_search_query')} "
+                f"ON {_quote(table)} (search_query, timestamp_scrape)"
+            )
+            self._columns.pop(table, None)
+            columns = self._table_columns(table)
+        for field in fields:
+            if field not in columns:
+                self._conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(field)}")
+                columns.append(field)
+        return columns
+
+    def save_products(self, products, collection_name, upsert=False, batch_size=1000):
+        if not products:
+            self.logger.warning("Tidak ada produk untuk disimpan.")
+            return 0
+
+        if upsert:
+            # Produk yang sama dalam satu panggilan digabung (terakhir menang)
+            keyed = {}
+            for product in products:
+                keyed[self.product_key(product)] = product
+            rows = [dict(product, product_id=product_id, scrape_date=scrape_date)
+                    for (product_id, scrape_date), product in keyed.items()]
+        else:
+            rows = list(products)
+        rows = [{key: value for key, value in row.items() if key != "_id"} for row in rows]
+
+        try:
+            with self._lock, self._conn:
+                fields = sorted({key for row in rows for key in row})
+                self._ensure_table(collection_name, fields)
+                table = _quote(collection_name)
+                placeholders = ", ".join("?" for _ in fields)
+                sql = f"INSERT INTO {table} ({', '.join(map(_quote, fields))}) VALUES ({placeholders})"
+                if upsert:
+                    updated = [field for field in fields if field not in _INSERT_ONLY_COLUMNS]
+                    assignments = ", ".join(f"{_quote(f)} = excluded.{_quote(f)}" for f in updated)
+                    changed = " OR ".join(f"{_quote(f)} IS NOT excluded.{_quote(f)}" for f in updated)
+                    sql += f" ON CONFLICT (product_id, scrape_date) DO UPDATE SET {assignments} WHERE {changed}"
+
+                count_before = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                changes_before = self._conn.total_changes
+                for start in range(0, len(rows), batch_size):
+                    self._conn.executemany(sql, [tuple(row.get(field) for field in fields)
+                                                 for row in rows[start:start + batch_size]])
+                changes = self._conn.total_changes - changes_before
+                inserted = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - count_before
+        except Exception as e:
+            self.logger.error(f"Gagal menyimpan produk ke tabel '{collection_name}': {e}")
+            return 0
+
+        self.last_write_stats = {"inserted": inserted, "updated": changes - inserted,
+                                 "unchanged": len(rows) - changes}
+        self.logger.info(
+            f"Simpan ke '{collection_name}' (SQLite): {inserted} baru, {changes - inserted} diperbarui, "
+            f"{len(rows) - changes} tidak berubah."
+        )
+        return len(products)
+
+    def _where(self, query):
+        clauses, params = [], []
+        for field, operator, value in parse_query(query):
+            if operator == "$in":
+                values = list(value)
+                clauses.append(f"{_quote(field)} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+            elif value is None and operator in ("$eq", "$ne"):
+                clauses.append(f"{_quote(field)} IS {'NOT ' if operator == '$ne' else ''}NULL")
+            else:
+                clauses.append(f"{_quote(field)} {_SQL_OPERATORS[operator]} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _exists(self, table):
+        with self._lock:
+            return bool(self._table_columns(table))
+
+    def iter_collection_chunks(self, collection_name, query=None, fields=None, chunk_size=5000,
+                               output="dataframe", include_id=False):
+        """
+        Membaca tabel per chunk. Filter diterjemahkan ke klausa WHERE (lihat `parse_query`)
+        dan kolom chunk dibangun langsung dari tuple baris.
+        """
+        with self._lock:
+            columns = list(self._table_columns(collection_name))
+        if not columns:
+            return
+        names = list(fields) if fields else columns
+        selected = [_quote(name) for name in names]
+        if include_id:
+            names.insert(0, "_id")
+            selected.insert(0, "rowid")
+        where, params = self._where(query)
+        # Koneksi baca terpisah agar tidak berebut dengan thread penulis
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                f"SELECT {', '.join(selected)} FROM {_quote(collection_name)}{where} ORDER BY rowid", params
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield build_chunk({name: list(values) for name, values in zip(names, zip(*rows))}, output)
+        finally:
+            conn.close()
+
+    def iter_known_products(self, collection_name):
+        """Field minimal (URL, harga, terjual) produk tersimpan, dari yang terlama."""
+        fields = ["product_url", "price_raw", "sold_count_raw"]
+        try:
+            for chunk in self.iter_collection_chunks(collection_name, fields=fields, output="columns"):
+                for values in zip(*chunk.values()):
+                    yield dict(zip(fields, values))
+        except Exception as e:
+            self.logger.error(f"Gagal membaca produk yang sudah dikenal dari '{collection_name}': {e}")
+
+    def count_documents(self, collection_name, query=None):
+        if not self._exists(collection_name):
+            return 0
+        where, params = self._where(query)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {_quote(collection_name)}{where}", params).fetchone()[0]
+
+    def drop_collection(self, collection_name):
+        with self._lock, self._conn:
+            self._conn.execute(f"DROP TABLE IF EXISTS {_quote(collection_name)}")
+            self._columns.pop(collection_name, None)
+
+    def close_connection(self):
+        with self._lock:
+            self._conn.close()
+        self.logger.info("Penyimpanan SQLite ditutup.")
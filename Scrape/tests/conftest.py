@@ -0,0 +1,7 @@
+# tests/conftest.py
+# Test dijalankan dari direktori Scrape: `python -m pytest tests`
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,215 @@
+# tests/test_http_scraper.py
+# TokopediaHttpScraper.scrape_many dijalankan terhadap ReplayServer lokal.
+
+import json
+import threading
+from urllib.parse import urlsplit
+
+import pytest
+
+from scrapers.http_scraper import TokopediaHttpScraper
+from scrapers.specs import TOKOPEDIA
+from utils.rate_limiter import PolitenessScheduler
+from utils.replay_server import ReplayServer
+
+PER_PAGE = 4
+
+
+def _path(query, page):
+    parts = urlsplit(TOKOPEDIA.build_url(query, page, "http://replay"))
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def _payload(query, page, count=PER_PAGE):
+    products = [
+        {
+            "name": f"{query} {page}-{i}",
+            "url": f"https://www.tokopedia.com/toko/{query.replace(' ', '-')}-{page}-{i}",
+            "price": "Rp10.000",
+            "shop": {"name": "Toko", "city": "Bandung"},
+            "labelGroups": [{"title": "10 terjual"}],
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"data": {"products": products}}).encode(), "application/json"
+
+
+def _routes(pages):
+    """`pages`: mapping query -> jumlah halaman berisi produk; halaman berikutnya kosong."""
+    routes = {}
+    for query, count in pages.items():
+        for page in range(1, count + 1):
+            routes[_path(query, page)] = _payload(query, page)
+        routes[_path(query, count + 1)] = _payload(query, count + 1, count=0)
+    return routes
+
+
+@pytest.fixture
+def scraper():
+    scraper = TokopediaHttpScraper(rate_limiter=PolitenessScheduler(rate=1000, burst=100, jitter=0), page_window=2)
+    yield scraper
+    scraper.close()
+
+
+def _run(scraper, server, queries, **kwargs):
+    scraper.base_url = server.url
+    saved = []
+    results = scraper.scrape_many(queries, on_page_complete=lambda q, p, products: saved.append((q, p, len(products))),
+                                  **kwargs)
+    return results, saved
+
+
+def test_stops_at_first_empty_page(scraper):
+    with ReplayServer(_routes({"gula aren": 2, "briket": 1})) as server:
+        results, saved = _run(scraper, server, ["gula aren", "briket"], max_products=100, max_pages=10)
+        requests_made = server.request_count
+
+    assert len(results["gula aren"]) == 2 * PER_PAGE
+    assert len(results["briket"]) == PER_PAGE
+    # Halaman diserahkan berurutan dan berhenti di halaman kosong (jendela 2 halaman)
+    assert [(p, n) for q, p, n in saved if q == "gula aren"] == [(1, 4), (2, 4), (3, 0)]
+    assert [(p, n) for q, p, n in saved if q == "briket"] == [(1, 4), (2, 0)]
+    assert requests_made <= 4 + 2
+    assert scraper.completed_queries == {"gula aren", "briket"}
+
+
+def test_missing_page_ends_query(scraper):
+    routes = {_path("gula aren", 1): _payload("gula aren", 1)}
+    with ReplayServer(routes) as server:
+        results, saved = _run(scraper, server, ["gula aren"], max_products=100, max_pages=5)
+
+    assert len(results["gula aren"]) == PER_PAGE
+    assert saved == [("gula aren", 1, 4), ("gula aren", 2, 0)]
+    assert scraper.completed_queries == {"gula aren"}
+
+
+def test_empty_page_is_not_checkpointed(scraper):
+    # Halaman HTML tanpa produk maupun penanda akhir (misal halaman blokir)
+    routes = _routes({"gula aren": 1})
+    routes[_path("gula aren", 2)] = (b"<html><body>Akses dibatasi</body></html>", "text/html")
+    routes[_path("gula aren", 3)] = _payload("gula aren", 3)
+    with ReplayServer(routes) as server:
+        results, saved = _run(scraper, server, ["gula aren"], max_products=100, max_pages=5)
+        scraper.scrape("gula aren", max_products=100, max_pages=5,
+                       on_page_complete=lambda q, p, products: saved.append((q, p, len(products))))
+
+    assert len(results["gula aren"]) == PER_PAGE
+    assert saved == [("gula aren", 1, 4), ("gula aren", 1, 4)]
+    assert scraper.completed_queries == set()
+    assert scraper.run_summary["stop_reason"] == "error"
+
+
+def test_max_products_enforced_through_callback(scraper):
+    with ReplayServer(_routes({"gula aren": 5})) as server:
+        results, saved = _run(scraper, server, ["gula aren"], max_products=6, max_pages=5, collect=False)
+
+    assert results == {"gula aren": []}
+    assert sum(n for _, _, n in saved) == 6
+    assert [p for _, p, _ in saved] == [1, 2]
+
+
+def test_skips_checkpointed_pages(scraper):
+    class Checkpoint:
+        def completed_pages(self, query):
+            return {1}
+
+        def product_count(self, query):
+            return PER_PAGE
+
+    with ReplayServer(_routes({"gula aren": 3})) as server:
+        results, saved = _run(scraper, server, ["gula aren"], max_products=8, max_pages=5, checkpoint=Checkpoint())
+
+    assert [(p, n) for _, p, n in saved] == [(2, 4)]
+    assert len(results["gula aren"]) == 4
+
+
+def test_blocking_callback_does_not_stall_other_queries(scraper):
+    # Callback "gula aren" menunggu sampai halaman "briket" diserahkan; jika callback
+    # dijalankan di event loop, "briket" tidak pernah diproses dan tunggu habis
+    briket_done = threading.Event()
+    waited = []
+
+    def on_page_complete(query, page, products):
+        if query == "briket":
+            briket_done.set()
+        elif page == 1:
+            waited.append(briket_done.wait(timeout=5))
+
+    with ReplayServer(_routes({"gula aren": 1, "briket": 1})) as server:
+        scraper.base_url = server.url
+        scraper.scrape_many(["gula aren", "briket"], max_products=100, max_pages=2,
+                            on_page_complete=on_page_complete)
+
+    assert waited == [True]
+
+
+def test_scrape_page_keeps_base_scraper_contract(scraper):
+    with ReplayServer(_routes({"gula aren": 1})) as server:
+        scraper.base_url = server.url
+        products = scraper.scrape_page("gula aren", 1, 3)
+        assert (len(products), scraper.last_page_status) == (3, "ok")
+        assert scraper.scrape_page("gula aren", 2) == []
+        assert scraper.last_page_status == "end"
+
+
+def test_runs_in_scraper_pool(scraper):
+    from scrapers.scraper_pool import ScraperPool
+
+    with ReplayServer(_routes({"gula aren": 2, "briket": 1})) as server:
+        pool = ScraperPool(TokopediaHttpScraper, num_workers=2, base_url=server.url, headless=True,
+                           rate_limiter=PolitenessScheduler(rate=1000, burst=100, jitter=0))
+        try:
+            results = pool.run(["gula aren", "briket"], max_products=100, max_pages=5)
+            split = pool.run(["gula aren"], max_products=6, max_pages=5, split_pages=True)
+        finally:
+            pool.close()
+
+    assert {query: len(products) for query, products in results.items()} == {"gula aren": 8, "briket": 4}
+    assert pool.summaries["gula aren"]["stop_reason"] == "end_of_results"
+    assert len(split["gula aren"]) == 6
+
+
+def test_runs_queue_in_scraper_pool():
+    mongomock = pytest.importorskip("mongomock")
+    from types import SimpleNamespace
+
+    from job_queue import JobQueue
+    from scrapers.scraper_pool import ScraperPool
+
+    job_queue = JobQueue(SimpleNamespace(db=mongomock.MongoClient().db), lease_seconds=600)
+    job_queue.enqueue(["gula aren"], 4)
+    pages = []
+    with ReplayServer(_routes({"gula aren": 2})) as server:
+        pool = ScraperPool(TokopediaHttpScraper, num_workers=2, base_url=server.url,
+                           rate_limiter=PolitenessScheduler(rate=1000, burst=100, jitter=0))
+        try:
+            pool.run_queue(job_queue, "node", poll_seconds=0.05, on_page_complete=lambda q, p, products: pages.append((p, len(products))))
+        finally:
+            pool.close()
+
+    assert (1, 4) in pages and (2, 4) in pages
+    assert job_queue.is_finished()
+
+
+def test_queue_retries_empty_page():
+    mongomock = pytest.importorskip("mongomock")
+    from types import SimpleNamespace
+
+    from job_queue import JobQueue, FAILED
+    from scrapers.scraper_pool import ScraperPool
+
+    job_queue = JobQueue(SimpleNamespace(db=mongomock.MongoClient().db), lease_seconds=600, max_attempts=2)
+    job_queue.enqueue(["gula aren"], 1)
+    routes = {_path("gula aren", 1): (b"<html><body>Akses dibatasi</body></html>", "text/html")}
+    pages = []
+    with ReplayServer(routes) as server:
+        pool = ScraperPool(TokopediaHttpScraper, num_workers=1, base_url=server.url,
+                           rate_limiter=PolitenessScheduler(rate=1000, burst=100, jitter=0))
+        try:
+            pool.run_queue(job_queue, "node", poll_seconds=0.05, on_page_complete=lambda q, p, products: pages.append(p))
+        finally:
+            pool.close()
+
+    job = job_queue.collection.find_one({"query": "gula aren", "page": 1})
+    assert pages == []
+    assert (job["status"], job["attempts"]) == (FAILED, 2)
@@ -0,0 +1,149 @@
+# tests/test_job_queue.py
+# JobQueue di atas mongomock: klaim, selesai, lease habis, gagal/ulang, dan
+# penyelesaian item setelah produknya tersimpan lewat ProductWriter.
+
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from job_queue import JobQueue, PENDING, RUNNING, DONE, FAILED, SKIPPED
+from utils.pipeline import ProductWriter
+
+
+@pytest.fixture
+def job_queue():
+    db = SimpleNamespace(db=mongomock.MongoClient().db)
+    return JobQueue(db, lease_seconds=600, max_attempts=2)
+
+
+def _status(job_queue, query, page):
+    return job_queue.collection.find_one({"query": query, "page": page})["status"]
+
+
+def _expire(job_queue, job):
+    job_queue.collection.update_one(
+        {"_id": job["_id"]}, {"$set": {"lease_until": datetime.datetime(2000, 1, 1)}}
+    )
+
+
+def test_claim_and_complete(job_queue):
+    assert job_queue.enqueue(["gula aren"], 3) == 3
+    assert job_queue.enqueue(["gula aren"], 3) == 0
+
+    job = job_queue.claim("w1")
+    assert (job["query"], job["page"], job["status"], job["attempts"]) == ("gula aren", 1, RUNNING, 1)
+    assert job_queue.claim("w2")["page"] == 2
+
+    assert job_queue.complete(job, "w1", 10, page_status="ok")
+    assert _status(job_queue, "gula aren", 1) == DONE
+    assert job_queue.progress()["gula aren"]["products"] == 10
+
+
+def test_end_page_skips_later_pages(job_queue):
+    job_queue.enqueue(["gula aren"], 4)
+    job = job_queue.claim("w1")
+    job_queue.complete(job, "w1", 0, page_status="end")
+
+    assert [_status(job_queue, "gula aren", page) for page in (2, 3, 4)] == [SKIPPED] * 3
+    assert job_queue.is_finished()
+
+
+def test_lost_lease_end_page_skips_nothing(job_queue):
+    job_queue.enqueue(["gula aren"], 3)
+    job = job_queue.claim("w1")
+    _expire(job_queue, job)
+    reclaimed = job_queue.claim("w2")
+
+    # Worker lama melaporkan "end" setelah lease-nya hilang: halaman lain tetap pending
+    assert not job_queue.complete(job, "w1", 0, page_status="end")
+    assert [_status(job_queue, "gula aren", page) for page in (1, 2, 3)] == [RUNNING, PENDING, PENDING]
+    assert job_queue.complete(reclaimed, "w2", 4, page_status="ok")
+
+
+def test_expired_lease_is_reclaimed(job_queue):
+    job_queue.enqueue(["gula aren"], 1)
+    job = job_queue.claim("w1")
+    assert job_queue.claim("w2") is None
+
+    _expire(job_queue, job)
+    reclaimed = job_queue.claim("w2")
+    assert reclaimed["_id"] == job["_id"]
+    assert (reclaimed["worker"], reclaimed["attempts"]) == ("w2", 2)
+
+    # Worker lama tidak bisa lagi menyelesaikan atau memperpanjang item
+    assert not job_queue.extend_lease(job, "w1")
+    assert not job_queue.complete(job, "w1", 5)
+    assert job_queue.complete(reclaimed, "w2", 5)
+
+
+def test_fail_retries_until_exhausted(job_queue):
+    job_queue.enqueue(["gula aren"], 1)
+
+    job = job_queue.claim("w1")
+    assert job_queue.fail(job, "w1", RuntimeError("timeout")) == PENDING
+    job = job_queue.claim("w1")
+    assert job["attempts"] == 2
+    assert job_queue.fail(job, "w1", RuntimeError("timeout")) == FAILED
+    assert job_queue.claim("w1") is None
+    assert job_queue.is_finished()
+
+    assert job_queue.retry_failed() == 1
+    job = job_queue.claim("w1")
+    assert (job["status"], job["attempts"]) == (RUNNING, 1)
+
+
+def test_exhausted_expired_lease_is_failed(job_queue):
+    job_queue.enqueue(["gula aren"], 1)
+    _expire(job_queue, job_queue.claim("w1"))
+    _expire(job_queue, job_queue.claim("w2"))
+
+    assert job_queue.claim("w3") is None
+    assert job_queue.is_finished()
+    assert _status(job_queue, "gula aren", 1) == FAILED
+
+
+def test_renew_leases_extends_held_jobs(job_queue):
+    job_queue.enqueue(["gula aren"], 2)
+    job = job_queue.claim("w1")
+    _expire(job_queue, job)
+
+    assert job_queue.renew_leases() == 1
+    assert job_queue.claim("w2")["page"] == 2
+
+    # Lease yang diambil alih worker lain berhenti diperpanjang; hanya halaman 2 (w2) tersisa
+    _expire(job_queue, job)
+    job_queue.collection.update_one({"_id": job["_id"]}, {"$set": {"worker": "w3"}})
+    assert job_queue.renew_leases() == 1
+
+
+def test_job_completes_only_after_save(job_queue):
+    job_queue.enqueue(["gula aren", "briket"], 1)
+    saved = []
+
+    def save_batch(query, products):
+        if query == "briket":
+            raise RuntimeError("database down")
+        saved.extend(products)
+        return len(products)
+
+    writer = ProductWriter(save_batch, on_page_saved=job_queue.page_saved,
+                           on_page_failed=job_queue.page_failed, batch_size=100, flush_interval=None)
+    writer.start()
+    for _ in range(2):
+        job = job_queue.claim("w1")
+        job_queue.scraped(job, "w1", "ok")
+        writer.put(job["query"], job["page"], [{"product_name": "x"}, {"product_name": "y"}])
+
+    assert _status(job_queue, "gula aren", 1) == RUNNING
+    assert job_queue.is_finished()
+    writer.close()
+
+    assert len(saved) == 2
+    assert _status(job_queue, "gula aren", 1) == DONE
+    assert job_queue.collection.find_one({"query": "gula aren"})["products"] == 2
+    failed = job_queue.collection.find_one({"query": "briket"})
+    assert failed["status"] == PENDING
+    assert "database down" in failed["last_error"]
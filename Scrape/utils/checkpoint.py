@@ -0,0 +1,69 @@
+# utils/checkpoint.py
+# Checkpoint per halaman agar run scraping yang terhenti bisa dilanjutkan.
+
+import json
+import os
+import threading
+
+
+class CheckpointStore:
+    """
+    Mencatat halaman yang sudah selesai (dan sudah disimpan) untuk setiap query.
+
+    Disimpan sebagai file JSON kecil yang ditulis ulang secara atomik setiap kali
+    sebuah halaman selesai, sehingga crash di tengah run tidak merusak file.
+    """
+
+    def __init__(self, path=os.path.join("checkpoints", "scrape_checkpoint.json")):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def completed_pages(self, query):
+        """Set nomor halaman yang sudah selesai untuk query."""
+        with self._lock:
+            return set(self._state.get(query, {}).get("completed_pages", []))
+
+    def last_completed_page(self, query):
+        """Halaman terakhir yang selesai berurutan dari halaman 1 (0 jika belum ada)."""
+        completed = self.completed_pages(query)
+        page = 0
+        while page + 1 in completed:
+            page += 1
+        return page
+
+    def product_count(self, query):
+        """Jumlah produk yang sudah disimpan untuk query sejak checkpoint dibuat."""
+        with self._lock:
+            return self._state.get(query, {}).get("products", 0)
+
+    def mark_page_done(self, query, page, product_count):
+        """Mencatat bahwa `page` untuk `query` sudah selesai dan produknya sudah tersimpan."""
+        with self._lock:
+            entry = self._state.setdefault(query, {"completed_pages": [], "products": 0})
+            if page not in entry["completed_pages"]:
+                entry["completed_pages"].append(page)
+                entry["completed_pages"].sort()
+                entry["products"] += product_count
+            self._write()
+
+    def clear(self, query):
+        """Menghapus checkpoint query yang sudah selesai sepenuhnya."""
+        with self._lock:
+            if self._state.pop(query, None) is not None:
+                self._write()
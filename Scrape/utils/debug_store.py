@@ -0,0 +1,164 @@
+# utils/debug_store.py
+# Penyimpanan artefak debug (HTML + screenshot) yang dibatasi: HTML dikompresi gzip,
+# total ukuran dibatasi dengan penghapusan LRU, kegagalan berulang hanya disampel,
+# dan penulisan ke disk dilakukan di thread latar belakang.
+
+import datetime
+import gzip
+import os
+import queue
+import threading
+from collections import OrderedDict
+from utils.logger_setup import get_logger
+
+ARTIFACT_SUFFIXES = (".html.gz", ".png")
+
+_STOP = object()
+
+
+class DebugArtifactStore:
+    """
+    Penyimpan artefak debug bersama untuk semua worker.
+
+    Scraper memanggil `capture(reason, name, snapshot)`. Untuk setiap `reason`
+    (misal "no_cards", "timeout", "error"), `keep_first` kejadian pertama selalu
+    disimpan, selanjutnya hanya setiap kejadian ke-`sample_every`. `snapshot` hanya
+    dipanggil jika kejadian tersampel, sehingga page_source dan screenshot tidak
+    diambil untuk kegagalan yang dilewati.
+    """
+
+    def __init__(self, directory="debug_artifacts", max_bytes=100 * 1024 * 1024, keep_first=3,
+                 sample_every=10, screenshots=True, max_pending=8):
+        """
+        Args:
+            directory (str): Direktori artefak. Hanya file berakhiran ARTIFACT_SUFFIXES
+                yang dikelola (dan bisa dihapus) oleh store.
+            max_bytes (int): Batas total ukuran artefak; file terlama dihapus lebih dulu.
+            keep_first (int): Jumlah kejadian pertama per alasan yang selalu disimpan.
+            sample_every (int): Setelah itu, hanya setiap kejadian ke-N yang disimpan.
+            screenshots (bool): Ikut menyimpan screenshot PNG.
+            max_pending (int): Batas antrean tulis; artefak dibuang (bukan menunggu)
+                jika antrean penuh agar loop scraping tidak tertahan.
+        """
+        self.logger = get_logger("DebugArtifactStore")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.keep_first = keep_first
+        self.sample_every = max(1, sample_every)
+        self.screenshots = screenshots
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._counts = {}
+        self.saved = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._files = self._scan()
+        self.total_bytes = sum(self._files.values())
+
+    def _scan(self):
+        """Indeks artefak yang sudah ada, urut dari yang terlama."""
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith(ARTIFACT_SUFFIXES):
+                path = os.path.join(self.directory, filename)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, path, stat.st_size))
+        return OrderedDict((path, size) for _, path, size in sorted(entries))
+
+    def should_capture(self, reason):
+        """Menghitung kejadian untuk `reason` dan memutuskan apakah disimpan."""
+        with self._lock:
+            count = self._counts.get(reason, 0) + 1
+            self._counts[reason] = count
+            keep = count <= self.keep_first or count % self.sample_every == 0
+            if not keep:
+                self.sampled_out += 1
+            return keep
+
+    def capture(self, reason, name, snapshot):
+        """
+        Menyimpan artefak jika kejadian tersampel.
+
+        Args:
+            reason (str): Kategori kegagalan untuk sampling.
+            name (str): Prefix nama file, misal "tokopedia_debug_page_3".
+            snapshot (callable): `snapshot() -> (html, png_bytes | None)`; dipanggil di
+                thread pemanggil (WebDriver tidak thread-safe).
+
+        Returns:
+            bool: True jika artefak diantrekan untuk ditulis.
+        """
+        if not self.should_capture(reason):
+            return False
+        html, png = snapshot()
+        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        try:
+            self._ensure_started()
+            self._queue.put_nowait((f"{timestamp}_{name}", html, png))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="DebugArtifactStore", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            try:
+                self._write(*item)
+            except Exception as e:
+                self.logger.warning(f"Gagal menulis artefak debug {item[0]}: {e}")
+
+    def _write_file(self, path, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._files[path] = len(data)
+        self._files.move_to_end(path)
+        self.total_bytes += len(data)
+
+    def _write(self, name, html, png):
+        if html:
+            self._write_file(os.path.join(self.directory, f"{name}.html.gz"),
+                             gzip.compress(html.encode("utf-8"), compresslevel=6))
+        if png:
+            self._write_file(os.path.join(self.directory, f"{name}.png"), png)
+        with self._lock:
+            self.saved += 1
+        self._evict()
+
+    def _evict(self):
+        """Menghapus artefak terlama sampai total ukuran di bawah batas."""
+        while self.total_bytes > self.max_bytes and len(self._files) > 1:
+            path, size = self._files.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        """Menunggu semua artefak yang mengantre selesai ditulis."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def report(self, logger):
+        logger.info(
+            f"Artefak debug: {self.saved} disimpan, {self.sampled_out} dilewati (sampling), "
+            f"{self.dropped} dibuang (antrean penuh); {self.total_bytes / (1024 * 1024):.1f} MB "
+            f"di {self.directory}"
+        )
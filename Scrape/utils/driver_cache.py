@@ -0,0 +1,90 @@
+# utils/driver_cache.py
+# Resolusi binary chromedriver sekali per mesin (di-cache ke file) dan alokasi
+# direktori profil Chrome persisten untuk startup browser yang cepat.
+
+import json
+import os
+import threading
+from utils.logger_setup import get_logger
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "visual-commodity", "chromedriver.json")
+
+_lock = threading.Lock()
+_resolved_path = None
+_profiles_in_use = set()
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("path")
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_path, path):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"path": path}, f)
+
+
+def resolve_chromedriver(cache_path=DEFAULT_CACHE_PATH):
+    """
+    Mengembalikan path chromedriver tanpa mengunduh ulang setiap kali scraper dibuat.
+
+    Urutan: environment `CHROMEDRIVER_PATH`, hasil yang sudah di-resolve di proses ini,
+    file cache, lalu `ChromeDriverManager().install()` (hasilnya di-cache).
+
+    Returns:
+        str | None: Path binary, atau None jika tidak bisa di-resolve (Selenium Manager
+        bawaan Selenium yang akan mencarinya).
+    """
+    global _resolved_path
+    logger = get_logger("driver_cache")
+
+    env_path = os.getenv("CHROMEDRIVER_PATH")
+    if env_path and os.path.exists(env_path):
+        return env_path
+
+    with _lock:
+        if _resolved_path and os.path.exists(_resolved_path):
+            return _resolved_path
+
+        cached = _read_cache(cache_path)
+        if cached and os.path.exists(cached):
+            _resolved_path = cached
+            return cached
+
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _resolved_path = ChromeDriverManager().install()
+            _write_cache(cache_path, _resolved_path)
+            logger.info(f"Chromedriver di-resolve dan di-cache: {_resolved_path}")
+            return _resolved_path
+        except Exception as e:
+            logger.warning(f"Gagal me-resolve chromedriver, memakai Selenium Manager: {e}")
+            return None
+
+
+def acquire_profile_dir(base_dir):
+    """
+    Memilih direktori profil Chrome persisten yang sedang tidak dipakai di proses ini.
+
+    Chrome tidak bisa berbagi satu user-data-dir antar instance, sehingga setiap
+    worker mendapat slot sendiri (profile_0, profile_1, ...). Profil yang sama dipakai
+    ulang antar run sehingga cache HTTP dan cookie sudah hangat.
+    """
+    with _lock:
+        slot = 0
+        while os.path.abspath(os.path.join(base_dir, f"profile_{slot}")) in _profiles_in_use:
+            slot += 1
+        path = os.path.abspath(os.path.join(base_dir, f"profile_{slot}"))
+        _profiles_in_use.add(path)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def release_profile_dir(path):
+    """Mengembalikan slot profil agar bisa dipakai worker lain."""
+    with _lock:
+        _profiles_in_use.discard(path)
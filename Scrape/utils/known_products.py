@@ -0,0 +1,155 @@
+# utils/known_products.py
+# Indeks in-memory produk yang sudah tersimpan, untuk crawl inkremental.
+
+import datetime
+import re
+import threading
+from urllib.parse import urlsplit
+from utils.data_cleaner import clean_price, clean_sold_count
+
+# ID numerik di akhir slug URL produk Tokopedia, misal ".../gula-aren-1kg-1731137391761458715"
+_NUMERIC_ID = re.compile(r'-(\d{6,})$')
+
+
+def product_id_from_url(url):
+    """
+    Mengambil ID produk yang stabil dari URL produk.
+
+    Query string (extParam, src, dll.) diabaikan. Jika slug berakhiran ID numerik,
+    ID itu yang dipakai; jika tidak, dipakai path "toko/slug".
+
+    Returns:
+        str | None: ID produk, atau None jika URL tidak valid.
+    """
+    if not url or not isinstance(url, str) or not url.startswith(("http", "/")):
+        return None
+    path = urlsplit(url).path.strip("/")
+    if not path:
+        return None
+    match = _NUMERIC_ID.search(path)
+    if match:
+        return match.group(1)
+    return path.lower()
+
+
+class KnownProductIndex:
+    """
+    Indeks produk yang sudah diketahui per query: ID produk -> (price_raw, sold_count_raw).
+
+    Dipakai bersama oleh semua worker; pembacaan dan penulisan dijaga lock.
+
+    Dengan `track_unchanged=True`, produk yang dilewati ditampung per query sampai
+    diambil dengan `pop_unchanged`, agar tetap bisa dicatat sebagai snapshot harga
+    run ini walaupun dokumennya tidak ditulis ulang.
+    """
+
+    def __init__(self, track_unchanged=False):
+        self._index = {}
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.skipped = 0
+        self.track_unchanged = track_unchanged
+        self._unchanged = {}
+
+    def load(self, query, documents):
+        """
+        Mengisi indeks untuk `query` dari dokumen (dict dengan product_url,
+        price_raw, sold_count_raw). Dokumen yang lebih baru menimpa yang lama.
+        """
+        entries = {}
+        for doc in documents:
+            product_id = product_id_from_url(doc.get("product_url"))
+            if product_id:
+                entries[product_id] = (doc.get("price_raw"), doc.get("sold_count_raw"))
+        with self._lock:
+            self._index.setdefault(query, {}).update(entries)
+        return len(entries)
+
+    def size(self, query=None):
+        with self._lock:
+            if query is not None:
+                return len(self._index.get(query, {}))
+            return sum(len(entries) for entries in self._index.values())
+
+    def is_unchanged(self, query, url, price_raw, sold_raw):
+        """
+        Cek murah: True jika produk sudah dikenal dan harga serta teks terjual sama.
+        Setiap pemanggilan dihitung untuk rasio skip.
+        """
+        product_id = product_id_from_url(url)
+        with self._lock:
+            self.checked += 1
+            known = self._index.get(query, {}).get(product_id) if product_id else None
+            unchanged = known is not None and known == (price_raw, sold_raw)
+            if unchanged:
+                self.skipped += 1
+            return unchanged
+
+    def is_unchanged_text(self, query, url, card_text):
+        """
+        Varian cek murah untuk ekstraksi per kartu: harga dan teks terjual yang
+        tersimpan cukup dicari di teks kartu mentah, tanpa menjalankan semua selector.
+        """
+        product_id = product_id_from_url(url)
+        with self._lock:
+            self.checked += 1
+            known = self._index.get(query, {}).get(product_id) if product_id else None
+            unchanged = (
+                known is not None and bool(card_text)
+                and all(value and value in card_text for value in known)
+            )
+            if unchanged:
+                self.skipped += 1
+        if unchanged and self.track_unchanged:
+            # Kartu tidak diekstrak; snapshot cukup dari harga/terjual yang tersimpan
+            price_raw, sold_raw = known
+            self._hold(query, [{
+                "timestamp_scrape": datetime.datetime.now().isoformat(),
+                "product_url": url,
+                "price_raw": price_raw,
+                "price_clean": clean_price(price_raw),
+                "sold_count_raw": sold_raw,
+                "sold_count_clean": clean_sold_count(sold_raw),
+            }])
+        return unchanged
+
+    def add(self, query, product):
+        """Mencatat produk yang baru diekstrak agar tidak diproses ulang di halaman lain."""
+        product_id = product_id_from_url(product.get("product_url"))
+        if product_id:
+            with self._lock:
+                self._index.setdefault(query, {})[product_id] = (
+                    product.get("price_raw"), product.get("sold_count_raw")
+                )
+
+    def filter_unchanged(self, query, products):
+        """
+        Memisahkan produk yang sudah dikenal dan harga/terjualnya tidak berubah; produk
+        lain dicatat di indeks.
+
+        Returns:
+            tuple: (produk baru/berubah, produk tidak berubah).
+        """
+        fresh, unchanged = [], []
+        for product in products:
+            if self.is_unchanged(query, product["product_url"], product["price_raw"], product["sold_count_raw"]):
+                unchanged.append(product)
+                continue
+            self.add(query, product)
+            fresh.append(product)
+        if unchanged and self.track_unchanged:
+            self._hold(query, unchanged)
+        return fresh, unchanged
+
+    def _hold(self, query, products):
+        with self._lock:
+            self._unchanged.setdefault(query, []).extend(products)
+
+    def pop_unchanged(self, query):
+        """Mengambil (dan mengosongkan) produk tidak berubah yang ditampung untuk `query`."""
+        with self._lock:
+            return self._unchanged.pop(query, [])
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.checked if self.checked else 0.0
@@ -1,51 +1,138 @@
 # utils/logger_setup.py
 # Modul untuk konfigurasi logging agar konsisten di seluruh proyek.
+#
+# Semua logger menulis ke satu antrean (QueueHandler); satu QueueListener di thread
+# terpisah yang menulis ke konsol dan file, sehingga kode scraping/cleaning tidak
+# pernah menunggu I/O file. File log dirotasi berdasarkan ukuran.
+#
+# Environment:
+#   LOG_LEVEL         Level minimum (default INFO; DEBUG menampilkan log per kartu)
+#   LOG_FORMAT        "text" (default) atau "json" untuk file log JSON-lines tambahan
+#   LOG_MAX_BYTES     Ukuran maksimum per file log sebelum dirotasi (default 10 MB)
+#   LOG_BACKUP_COUNT  Jumlah file rotasi yang disimpan (default 5)
 
+import atexit
+import datetime
+import json
 import logging
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+_lock = threading.Lock()
+_queue = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Memformat record sebagai satu objek JSON per baris."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(log_dir="logs", json_format=None, max_bytes=None, backup_count=None):
+    """
+    Menyalakan QueueListener bersama. Dipanggil otomatis oleh `get_logger`; pemanggilan
+    berikutnya tidak berpengaruh.
+
+    Args:
+        log_dir (str): Direktori file log.
+        json_format (bool, optional): Tambahkan file `app.jsonl` berformat JSON-lines.
+            Default dari environment LOG_FORMAT.
+        max_bytes (int, optional): Ukuran maksimum per file log sebelum dirotasi.
+        backup_count (int, optional): Jumlah file rotasi yang disimpan.
+
+    Returns:
+        queue.Queue: Antrean yang dipakai semua QueueHandler.
+    """
+    global _queue, _listener
+    with _lock:
+        if _listener is not None:
+            return _queue
+
+        if json_format is None:
+            json_format = os.getenv("LOG_FORMAT", "text").lower() == "json"
+        max_bytes = max_bytes or int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+        backup_count = backup_count if backup_count is not None else int(os.getenv("LOG_BACKUP_COUNT", 5))
+
+        if not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+
+        # Formatter
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+        # Console Handler
+        ch = logging.StreamHandler()
+        ch.setLevel(logging.INFO)
+        ch.setFormatter(formatter)
+
+        # File Handler untuk Info
+        fh_info = RotatingFileHandler(os.path.join(log_dir, "info.log"), maxBytes=max_bytes,
+                                      backupCount=backup_count, encoding="utf-8")
+        fh_info.setLevel(logging.INFO)
+        fh_info.setFormatter(formatter)
+
+        # File Handler untuk Error
+        fh_error = RotatingFileHandler(os.path.join(log_dir, "error.log"), maxBytes=max_bytes,
+                                       backupCount=backup_count, encoding="utf-8")
+        fh_error.setLevel(logging.ERROR)
+        fh_error.setFormatter(formatter)
+
+        handlers = [ch, fh_info, fh_error]
+        if json_format:
+            # Semua level (termasuk DEBUG jika LOG_LEVEL=DEBUG) untuk diproses mesin
+            fh_json = RotatingFileHandler(os.path.join(log_dir, "app.jsonl"), maxBytes=max_bytes,
+                                          backupCount=backup_count, encoding="utf-8")
+            fh_json.setFormatter(JsonFormatter())
+            handlers.append(fh_json)
+
+        _queue = queue.Queue(-1)
+        _listener = QueueListener(_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _queue
+
+
+def shutdown_logging():
+    """Menulis sisa record di antrean lalu menghentikan listener."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
 
 def get_logger(name: str, log_dir: str = "logs"):
     """
     Mengkonfigurasi dan mengembalikan logger.
-    
+
     Args:
         name (str): Nama logger.
         log_dir (str): Direktori untuk menyimpan file log.
-        
+
     Returns:
         logging.Logger: Objek logger yang telah dikonfigurasi.
     """
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    log_queue = configure_logging(log_dir)
 
     # Menghindari penambahan handler duplikat
     logger = logging.getLogger(name)
     if logger.hasHandlers():
         return logger
 
-    logger.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-    
-    # Console Handler
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
-    
-    # File Handler untuk Info
-    info_path = os.path.join(log_dir, "info.log")
-    fh_info = logging.FileHandler(info_path, encoding="utf-8")
-    fh_info.setLevel(logging.INFO)
-    fh_info.setFormatter(formatter)
-    logger.addHandler(fh_info)
-
-    # File Handler untuk Error
-    error_path = os.path.join(log_dir, "error.log")
-    fh_error = logging.FileHandler(error_path, encoding="utf-8")
-    fh_error.setLevel(logging.ERROR)
-    fh_error.setFormatter(formatter)
-    logger.addHandler(fh_error)
-    
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+
     return logger
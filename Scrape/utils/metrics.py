@@ -0,0 +1,181 @@
+# utils/metrics.py
+# Instrumentasi waktu per tahap untuk loop scraping: setiap halaman menghasilkan satu
+# record JSON-lines (navigasi, initial load, scroll, cari kartu, ekstraksi, ...) dan
+# di akhir run dicetak tabel ringkasan. Jumlah perintah WebDriver ikut dihitung.
+
+import datetime
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class CommandCounter:
+    """Penghitung perintah WebDriver (setiap perintah = satu round-trip ke chromedriver)."""
+
+    def __init__(self):
+        self.total = 0
+        self.by_command = {}
+
+    def count(self, command):
+        self.total += 1
+        self.by_command[command] = self.by_command.get(command, 0) + 1
+
+
+def instrument_driver(driver):
+    """
+    Membungkus `driver.execute` agar setiap perintah WebDriver dihitung.
+
+    Returns:
+        CommandCounter: Penghitung yang terpasang pada driver.
+    """
+    counter = CommandCounter()
+    original_execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        counter.count(driver_command)
+        return original_execute(driver_command, params)
+
+    driver.execute = counted_execute
+    return counter
+
+
+class PageMetrics:
+    """Waktu per tahap untuk satu halaman. Tahap yang sama boleh dicatat berkali-kali (misal per kartu)."""
+
+    def __init__(self, search_query, page, worker_id=None):
+        self.search_query = search_query
+        self.page = page
+        self.worker_id = worker_id
+        self.stages = {}
+        self.counts = {}
+        self.status = None
+        self.cards = 0
+        self.products = 0
+        self.webdriver_commands = 0
+        self._started = time.perf_counter()
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    @contextmanager
+    def stage(self, name):
+        """Context manager yang mencatat durasi blok sebagai tahap `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def to_dict(self):
+        return {
+            "type": "page",
+            "search_query": self.search_query,
+            "page": self.page,
+            "worker": self.worker_id,
+            "status": self.status,
+            "cards": self.cards,
+            "products": self.products,
+            "webdriver_commands": self.webdriver_commands,
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "stage_counts": self.counts,
+        }
+
+
+class MetricsRecorder:
+    """
+    Menulis record metrik sebagai JSON-lines dan mengumpulkan agregat untuk ringkasan.
+
+    Satu instance dipakai bersama oleh semua worker dan stage penulis. Setiap record
+    diberi `run_id` sehingga beberapa run dalam file yang sama bisa dibandingkan.
+    """
+
+    def __init__(self, path=os.path.join("stats", "scrape_metrics.jsonl")):
+        self.path = path
+        self.run_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._lock = threading.Lock()
+        self._durations = {}
+        self.pages = 0
+        self.cards = 0
+        self.webdriver_commands = 0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _append(self, record):
+        record = dict(record, run_id=self.run_id, timestamp=datetime.datetime.now().isoformat())
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write_page(self, page_metrics):
+        """Mencatat satu halaman yang sudah selesai."""
+        record = page_metrics.to_dict()
+        with self._lock:
+            self.pages += 1
+            self.cards += record["cards"]
+            self.webdriver_commands += record["webdriver_commands"]
+            for name, seconds in page_metrics.stages.items():
+                self._durations.setdefault(name, []).append(seconds)
+            self._durations.setdefault("page_total", []).append(record["total_seconds"])
+            self._append(record)
+
+    def record_stage(self, name, seconds, **fields):
+        """Mencatat tahap di luar halaman, misal `db_write` dari stage penulis."""
+        with self._lock:
+            self._durations.setdefault(name, []).append(seconds)
+            self._append(dict(fields, type="stage", stage=name, seconds=round(seconds, 4)))
+
+    @contextmanager
+    def timed(self, name, **fields):
+        """Context manager untuk `record_stage`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - started, **fields)
+
+    @staticmethod
+    def _percentile(values, fraction):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self):
+        """Agregat per tahap: jumlah, total, rata-rata, p50, p95 dan maksimum (detik)."""
+        with self._lock:
+            return {
+                name: {
+                    "count": len(values),
+                    "total": sum(values),
+                    "mean": sum(values) / len(values),
+                    "p50": self._percentile(values, 0.5),
+                    "p95": self._percentile(values, 0.95),
+                    "max": max(values),
+                }
+                for name, values in self._durations.items() if values
+            }
+
+    def report(self, logger):
+        """Menulis tabel ringkasan ke logger dan menambahkan record ringkasan ke file metrik."""
+        summary = self.summary()
+        if not summary:
+            return
+        logger.info(f"{'Tahap':<16}{'n':>7}{'total':>10}{'rata2':>9}{'p50':>9}{'p95':>9}{'maks':>9}")
+        for name, row in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+            logger.info(
+                f"{name:<16}{row['count']:>7}{row['total']:>10.1f}{row['mean']:>9.2f}"
+                f"{row['p50']:>9.2f}{row['p95']:>9.2f}{row['max']:>9.2f}"
+            )
+        if self.pages:
+            per_card = self.webdriver_commands / self.cards if self.cards else 0.0
+            logger.info(
+                f"Perintah WebDriver: {self.webdriver_commands} total, "
+                f"{self.webdriver_commands / self.pages:.1f} per halaman, {per_card:.2f} per kartu"
+            )
+        with self._lock:
+            self._append({
+                "type": "summary", "pages": self.pages, "cards": self.cards,
+                "webdriver_commands": self.webdriver_commands, "stages": summary
+            })
@@ -0,0 +1,137 @@
+# utils/pipeline.py
+# Pipeline streaming producer/consumer: scraper menghasilkan produk per halaman,
+# stage penulis di thread terpisah menyimpannya secara batch ke database.
+
+import queue
+import threading
+import time
+from utils.logger_setup import get_logger
+
+_STOP = object()
+
+
+class ProductWriter:
+    """
+    Stage penulis untuk pipeline scraping.
+
+    Scraper memanggil `put(query, page, products)` setiap halaman selesai. Antrean
+    dibatasi `max_queue_pages` halaman sehingga scraper otomatis tertahan
+    (backpressure) jika database lebih lambat, dan memori tetap datar berapa pun
+    `max_products`. Produk di-buffer per query dan disimpan per `batch_size`, atau
+    setelah `flush_interval` detik agar halaman tidak tertahan lama di buffer.
+    """
+
+    def __init__(self, save_batch, on_page_saved=None, batch_size=200, max_queue_pages=4,
+                 flush_interval=30, on_page_failed=None):
+        """
+        Args:
+            save_batch (callable): `save_batch(query, products) -> int` jumlah yang tersimpan.
+            on_page_saved (callable, optional): `on_page_saved(query, page, count)` dipanggil
+                setelah semua produk sebuah halaman benar-benar tersimpan (misal untuk checkpoint).
+            batch_size (int): Jumlah produk per operasi tulis.
+            max_queue_pages (int): Jumlah halaman maksimum yang boleh mengantre.
+            flush_interval (float, optional): Umur maksimum (detik) buffer sebuah query
+                sebelum disimpan walaupun belum mencapai `batch_size`. None: hanya per ukuran.
+            on_page_failed (callable, optional): `on_page_failed(query, page, error)` dipanggil
+                untuk setiap halaman di batch yang gagal disimpan.
+        """
+        self.logger = get_logger("ProductWriter")
+        self.save_batch = save_batch
+        self.on_page_saved = on_page_saved
+        self.on_page_failed = on_page_failed
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue_pages)
+        self.saved_counts = {}
+        self.failed_queries = set()
+        self._buffers = {}
+        self._pending_pages = {}
+        self._buffered_since = {}
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ProductWriter", daemon=True)
+        self._thread.start()
+        return self
+
+    def put(self, query, page, products):
+        """Mengirim satu halaman ke stage penulis. Blok jika antrean penuh."""
+        self.queue.put((query, page, products))
+
+    def close(self):
+        """Menyimpan sisa buffer dan menunggu thread penulis selesai."""
+        if self._thread:
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush_expired()
+                continue
+            if item is _STOP:
+                break
+            query, page, products = item
+            self._buffers.setdefault(query, []).extend(products)
+            self._pending_pages.setdefault(query, []).append((page, len(products)))
+            self._buffered_since.setdefault(query, time.monotonic())
+            if len(self._buffers[query]) >= self.batch_size:
+                self._flush(query)
+            self._flush_expired()
+
+        for query in list(self._buffers):
+            self._flush(query)
+
+    def _flush_expired(self):
+        if self.flush_interval is None:
+            return
+        now = time.monotonic()
+        for query, since in list(self._buffered_since.items()):
+            if now - since >= self.flush_interval:
+                self._flush(query)
+
+    def _flush(self, query):
+        self._buffered_since.pop(query, None)
+        products = self._buffers.pop(query, [])
+        pages = self._pending_pages.pop(query, [])
+
+        saved = 0
+        if products:
+            error = None
+            try:
+                saved = self.save_batch(query, products)
+            except Exception as e:
+                error = e
+                self.logger.error(f"Gagal menulis batch untuk query '{query}': {e}")
+            if saved != len(products):
+                # Halaman tidak ditandai selesai sehingga akan diulang saat resume
+                self.failed_queries.add(query)
+                self._notify(self.on_page_failed, query, pages,
+                             error or f"{saved} dari {len(products)} produk tersimpan")
+                return
+
+        self.saved_counts[query] = self.saved_counts.get(query, 0) + saved
+        if self.on_page_saved:
+            for page, count in pages:
+                try:
+                    self.on_page_saved(query, page, count)
+                except Exception as e:
+                    self.logger.error(f"Callback halaman {page} query '{query}' gagal: {e}")
+
+    def _notify(self, callback, query, pages, error):
+        if not callback:
+            return
+        for page, _ in pages:
+            try:
+                callback(query, page, error)
+            except Exception as e:
+                self.logger.error(f"Callback halaman {page} query '{query}' gagal: {e}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,137 @@
+# utils/rate_limiter.py
+# Penjadwal kesopanan (politeness) bersama: token bucket per domain yang dipakai
+# semua worker, dengan jitter dan backoff otomatis saat situs memberi sinyal throttling.
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Pengali interval saat sinyal throttling diterima; sinyal lain ("ok", "end") memulihkan backoff
+THROTTLE_SIGNALS = {
+    "empty": 1.5,
+    "timeout": 2.0,
+    "throttled": 3.0,
+    "captcha": 4.0,
+}
+
+
+class _DomainState:
+    """Isi bucket dan statistik untuk satu domain."""
+
+    def __init__(self, burst):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.backoff = 1.0
+        self.requests = 0
+        self.waited_seconds = 0.0
+        self.signals = {}
+
+
+class PolitenessScheduler:
+    """
+    Token bucket per domain yang dibagi oleh semua worker.
+
+    Setiap request memanggil `acquire(url)` sebelum dikirim. Token terisi dengan
+    kecepatan `rate` per detik (dibagi faktor backoff), maksimal `burst` token.
+    Setelah halaman diproses, `record_signal(url, signal)` memperbesar backoff untuk
+    sinyal throttling (halaman kosong, CAPTCHA, timeout) dan memulihkannya
+    perlahan untuk halaman yang normal.
+    """
+
+    def __init__(self, rate=0.5, burst=1, jitter=0.3, domain_rates=None,
+                 max_backoff=16.0, recovery=0.75):
+        """
+        Args:
+            rate (float | None): Request per detik per domain. None atau 0 = tanpa pembatasan
+                (misal untuk benchmark terhadap server replay lokal).
+            burst (int): Jumlah request yang boleh dikirim berurutan tanpa menunggu.
+            jitter (float): Tambahan jeda acak, sebagai fraksi dari interval (0.3 = hingga 30%).
+            domain_rates (dict, optional): Rate khusus per domain, misal {"www.tokopedia.com": 0.3}.
+            max_backoff (float): Batas atas faktor backoff.
+            recovery (float): Pengali backoff setiap sinyal normal (< 1).
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.jitter = jitter
+        self.domain_rates = domain_rates or {}
+        self.max_backoff = max_backoff
+        self.recovery = recovery
+        self._lock = threading.Lock()
+        self._domains = {}
+
+    @staticmethod
+    def _domain(url):
+        return urlsplit(url).netloc or url
+
+    def _state(self, domain):
+        if domain not in self._domains:
+            self._domains[domain] = _DomainState(self.burst)
+        return self._domains[domain]
+
+    def interval(self, url):
+        """Jeda rata-rata antar request saat ini untuk domain URL (detik), termasuk backoff."""
+        domain = self._domain(url)
+        rate = self.domain_rates.get(domain, self.rate)
+        if not rate or rate <= 0:
+            return 0.0
+        with self._lock:
+            return self._state(domain).backoff / rate
+
+    def acquire(self, url):
+        """
+        Menunggu sampai request ke domain URL boleh dikirim.
+
+        Slot dipesan di dalam lock dan ditunggu di luar lock, sehingga worker yang
+        berbeda mendapat giliran berurutan tanpa saling memblok lebih lama dari perlu.
+
+        Returns:
+            float: Detik yang dihabiskan menunggu.
+        """
+        domain = self._domain(url)
+        rate = self.domain_rates.get(domain, self.rate)
+        with self._lock:
+            state = self._state(domain)
+            state.requests += 1
+            if not rate or rate <= 0:
+                return 0.0
+            interval = state.backoff / rate
+            now = time.monotonic()
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) / interval)
+            state.updated = now
+            state.tokens -= 1
+            wait = -state.tokens * interval if state.tokens < 0 else 0.0
+            wait += random.uniform(0, self.jitter * interval)
+            state.waited_seconds += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record_signal(self, url, signal):
+        """
+        Mencatat hasil sebuah request.
+
+        Args:
+            url (str): URL yang diminta.
+            signal (str): "ok"/"end" untuk halaman normal, atau salah satu kunci
+                THROTTLE_SIGNALS ("empty", "timeout", "throttled", "captcha").
+        """
+        with self._lock:
+            state = self._state(self._domain(url))
+            state.signals[signal] = state.signals.get(signal, 0) + 1
+            factor = THROTTLE_SIGNALS.get(signal)
+            if factor:
+                state.backoff = min(self.max_backoff, state.backoff * factor)
+            else:
+                state.backoff = max(1.0, state.backoff * self.recovery)
+
+    def report(self, logger):
+        """Menulis ringkasan per domain ke logger: request, total tunggu, backoff dan sinyal."""
+        with self._lock:
+            for domain, state in self._domains.items():
+                signals = ", ".join(f"{name}={count}" for name, count in sorted(state.signals.items()))
+                logger.info(
+                    f"Rate limiter {domain}: {state.requests} request, menunggu {state.waited_seconds:.1f} detik, "
+                    f"backoff x{state.backoff:.1f} ({signals or 'tanpa sinyal'})"
+                )
@@ -0,0 +1,125 @@
+# utils/replay_server.py
+# Server HTTP lokal yang memutar ulang respons yang sudah direkam, sebagai
+# pengganti situs asli saat pengujian atau benchmark tanpa jaringan.
+
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+INDEX_FILE = "index.json"
+
+# save_recording bisa dipanggil dari banyak thread sekaligus (scrape_many)
+_record_lock = threading.Lock()
+
+
+def save_recording(record_dir, path, body, content_type="text/html; charset=utf-8"):
+    """
+    Menyimpan satu respons ke direktori rekaman.
+
+    Args:
+        record_dir (str): Direktori rekaman.
+        path (str): Path beserta query string, misal "/search?st=&q=gula%20aren".
+        body (bytes): Isi respons.
+        content_type (str): Header Content-Type respons.
+    """
+    with _record_lock:
+        _save_recording(record_dir, path, body, content_type)
+
+
+def _save_recording(record_dir, path, body, content_type):
+    os.makedirs(record_dir, exist_ok=True)
+    index_path = os.path.join(record_dir, INDEX_FILE)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+    filename = index.get(path, {}).get("file") or f"response_{len(index) + 1:04d}.bin"
+    with open(os.path.join(record_dir, filename), "wb") as f:
+        f.write(body)
+    index[path] = {"file": filename, "content_type": content_type}
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, index_path)
+
+
+def load_recordings(record_dir):
+    """Memuat semua rekaman menjadi mapping path -> (body, content_type)."""
+    with open(os.path.join(record_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    routes = {}
+    for path, entry in index.items():
+        with open(os.path.join(record_dir, entry["file"]), "rb") as f:
+            routes[path] = (f.read(), entry["content_type"])
+    return routes
+
+
+class ReplayServer:
+    """
+    Server HTTP di thread latar belakang yang melayani respons dari `routes`.
+
+    Contoh:
+        with ReplayServer(load_recordings("recordings")) as server:
+            scraper = TokopediaHttpScraper(base_url=server.url)
+    """
+
+    def __init__(self, routes, host="127.0.0.1", port=0, fallback=None):
+        """
+        Args:
+            routes (dict): Mapping path (dengan query string) -> (body bytes, content_type).
+            host (str): Alamat bind.
+            port (int): Port; 0 berarti dipilih otomatis.
+            fallback (callable, optional): Fungsi path -> (body, content_type) atau None
+                untuk path yang tidak ada di `routes`.
+        """
+        self.routes = routes
+        self.fallback = fallback
+        self.request_count = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.request_count += 1
+                response = server.routes.get(self.path)
+                if response is None and server.fallback:
+                    response = server.fallback(self.path)
+                if response is None:
+                    self.send_error(404)
+                    return
+                body, content_type = response
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
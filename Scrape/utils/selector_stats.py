@@ -0,0 +1,129 @@
+# utils/selector_stats.py
+# Telemetri hit/miss per selector CSS. Statistik disimpan antar run dan dipakai
+# untuk mengurutkan ulang daftar fallback agar selector yang sedang berfungsi dicoba lebih dulu.
+
+import datetime
+import json
+import os
+import threading
+
+
+class SelectorStats:
+    """
+    Penghitung hit/miss untuk setiap (field, selector).
+
+    Satu lookup field pada satu kartu mencoba selector sesuai urutan: selector
+    sebelum yang berhasil dihitung miss, yang berhasil dihitung hit. Jumlah miss
+    per kartu adalah "lookup terbuang" yang ingin ditekan.
+    """
+
+    def __init__(self, path=os.path.join("stats", "selector_stats.json"), dead_after_misses=50):
+        """
+        Args:
+            path (str): File JSON tempat statistik disimpan antar run.
+            dead_after_misses (int): Selector tanpa hit sama sekali dengan miss sebanyak
+                ini ditandai mati di laporan.
+        """
+        self.path = path
+        self.dead_after_misses = dead_after_misses
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._runs = []
+        self.run_cards = 0
+        self.run_lookups = 0
+        self.run_misses = 0
+        self._previous_run = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._counts = data.get("selectors", {})
+        self._runs = data.get("runs", [])
+        if self._runs:
+            self._previous_run = self._runs[-1]
+
+    def _entry(self, field, selector):
+        return self._counts.setdefault(field, {}).setdefault(selector, {"hits": 0, "misses": 0})
+
+    def ordered(self, field, selectors):
+        """
+        Mengurutkan selector berdasarkan hit rate (dengan smoothing), stabil terhadap
+        urutan asli. Selector yang belum punya data dianggap netral (0.5).
+        """
+        with self._lock:
+            counts = self._counts.get(field, {})
+
+            def score(selector):
+                entry = counts.get(selector, {"hits": 0, "misses": 0})
+                return (entry["hits"] + 1) / (entry["hits"] + entry["misses"] + 2)
+
+            return sorted(selectors, key=score, reverse=True)
+
+    def record(self, field, selectors, hit_index):
+        """
+        Mencatat satu lookup.
+
+        Args:
+            field (str): Nama field (misal "price").
+            selectors (list): Selector dalam urutan yang benar-benar dicoba.
+            hit_index (int | None): Posisi selector yang berhasil; None jika semua gagal.
+        """
+        with self._lock:
+            tried = selectors if hit_index is None else selectors[:hit_index]
+            for selector in tried:
+                self._entry(field, selector)["misses"] += 1
+            if hit_index is not None:
+                self._entry(field, selectors[hit_index])["hits"] += 1
+            self.run_lookups += len(tried) + (0 if hit_index is None else 1)
+            self.run_misses += len(tried)
+
+    def record_cards(self, count):
+        """Menambah jumlah kartu yang diproses pada run ini."""
+        with self._lock:
+            self.run_cards += count
+
+    @property
+    def wasted_lookups_per_card(self):
+        return self.run_misses / self.run_cards if self.run_cards else 0.0
+
+    def dead_selectors(self):
+        """Daftar (field, selector, misses) untuk selector yang tidak pernah berhasil."""
+        with self._lock:
+            return [
+                (field, selector, entry["misses"])
+                for field, selectors in self._counts.items()
+                for selector, entry in selectors.items()
+                if entry["hits"] == 0 and entry["misses"] >= self.dead_after_misses
+            ]
+
+    def save(self):
+        """Menyimpan statistik kumulatif beserta ringkasan run ini."""
+        with self._lock:
+            if self.run_cards:
+                self._runs.append({
+                    "timestamp": datetime.datetime.now().isoformat(),
+                    "cards": self.run_cards,
+                    "lookups": self.run_lookups,
+                    "wasted_lookups_per_card": self.run_misses / self.run_cards
+                })
+            data = {"selectors": self._counts, "runs": self._runs[-100:]}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def report(self, logger):
+        """Menulis ringkasan ke logger: lookup terbuang per kartu dan selector mati."""
+        message = f"Selector: {self.run_cards} kartu, {self.wasted_lookups_per_card:.2f} lookup terbuang per kartu"
+        if self._previous_run:
+            message += f" (run sebelumnya: {self._previous_run['wasted_lookups_per_card']:.2f})"
+        logger.info(message)
+        for field, selector, misses in self.dead_selectors():
+            logger.warning(f"Selector mati untuk '{field}': {selector} (0 hit, {misses} miss)")
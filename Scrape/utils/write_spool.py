@@ -0,0 +1,105 @@
+# utils/write_spool.py
+# Spool lokal untuk batch produk yang tetap gagal ditulis ke database setelah retry.
+# Batch disimpan sebagai JSON-lines dan diputar ulang pada run berikutnya, sehingga
+# gangguan koneksi ke MongoDB tidak menghilangkan data hasil scraping.
+
+import datetime
+import os
+import threading
+
+
+def _dumps(entry):
+    # Extended JSON (bson.json_util) agar `_id` ObjectId dan datetime kembali ke tipe aslinya
+    from bson import json_util
+    return json_util.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _loads(line):
+    from bson import json_util
+    return json_util.loads(line)
+
+
+class WriteSpool:
+    """
+    File JSON-lines (MongoDB Extended JSON) berisi satu batch per baris:
+    {"collection", "kind", "upsert", "spooled_at", "products"}. `kind` adalah
+    "products" (batch produk) atau "snapshots" (dokumen price_snapshots siap tulis).
+    """
+
+    def __init__(self, path=os.path.join("spool", "pending_writes.jsonl")):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, collection_name, products, upsert=False, kind="products"):
+        """Menambahkan satu batch ke spool (ditulis dan di-flush segera)."""
+        entry = {
+            "collection": collection_name,
+            "kind": kind,
+            "upsert": upsert,
+            "spooled_at": datetime.datetime.now().isoformat(),
+            # `_id` dari percobaan insert yang gagal ikut disimpan: dokumen yang sempat masuk
+            # hanya menghasilkan duplicate key saat diputar ulang, bukan duplikat baru
+            "products": list(products),
+        }
+        line = _dumps(entry)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def pending(self):
+        """Jumlah batch yang masih ada di spool."""
+        return len(self._read())
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(_loads(line))
+                except ValueError:
+                    # Baris terakhir bisa terpotong jika proses mati saat menulis
+                    continue
+        return entries
+
+    def replay(self, write):
+        """
+        Memutar ulang semua batch. Batch yang masih gagal tetap di spool.
+
+        Args:
+            write (callable): `write(entry) -> bool`, True jika batch berhasil ditulis.
+
+        Returns:
+            tuple: (jumlah batch berhasil, jumlah batch tersisa).
+        """
+        with self._lock:
+            entries = self._read()
+            if not entries:
+                return 0, 0
+            remaining = []
+            for entry in entries:
+                try:
+                    ok = write(entry)
+                except Exception:
+                    ok = False
+                if not ok:
+                    remaining.append(entry)
+
+            if remaining:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for entry in remaining:
+                        f.write(_dumps(entry) + "\n")
+                os.replace(tmp_path, self.path)
+            else:
+                os.remove(self.path)
+            return len(entries) - len(remaining), len(remaining)
@@ -0,0 +1,107 @@
+# worker.py
+# Worker crawl terdistribusi: menyalakan beberapa browser headless di mesin ini dan
+# mengerjakan item (query, page) yang diklaim dari antrean MongoDB bersama.
+#
+#   python worker.py --workers 3
+#   python worker.py --backend http --workers 8     # tanpa browser
+#
+# Item diantrekan oleh coordinator.py; jalankan worker.py di sebanyak mungkin mesin.
+
+import argparse
+import datetime
+import os
+import socket
+from dotenv import load_dotenv
+from database import Database
+from job_queue import JobQueue
+from scrapers.scraper_pool import ScraperPool, default_worker_count
+from utils.debug_store import DebugArtifactStore
+from utils.logger_setup import get_logger
+from utils.pipeline import ProductWriter
+from utils.rate_limiter import PolitenessScheduler
+from utils.write_spool import WriteSpool
+
+load_dotenv()
+
+
+def collection_for(query):
+    # Nama collection yang sama dengan main.py
+    return f"products_tokopedia_{query.replace(' ', '_')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker crawl yang mengambil item dari antrean MongoDB.")
+    parser.add_argument("--workers", type=int, default=default_worker_count(), help="Jumlah browser di mesin ini")
+    parser.add_argument("--node-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--lease-seconds", type=int, default=600)
+    parser.add_argument("--rate", type=float, default=float(os.getenv("RATE_LIMIT_PER_SECOND", "0.5")),
+                        help="Request per detik per domain dari mesin ini")
+    parser.add_argument("--backend", choices=["browser", "http"], default=os.getenv("SCRAPER_BACKEND", "browser"))
+    # Sama dengan BaseScraper.EXTRACTION_MODES; tidak diimpor agar backend http tidak butuh Selenium
+    parser.add_argument("--mode", choices=["html", "batch", "card"], default="batch",
+                        help="Mode ekstraksi backend browser")
+    parser.add_argument("--wait", action="store_true", help="Terus menunggu item baru saat antrean kosong")
+    parser.add_argument("--run-id", default=os.getenv("RUN_ID", datetime.datetime.now().strftime("%Y%m%d-%H%M%S")),
+                        help="Penanda run untuk snapshot harga; samakan di semua mesin satu crawl")
+    parser.add_argument("--upsert", action="store_true", default=os.getenv("STORAGE_UPSERT", "0") == "1",
+                        help="Simpan idempoten per (product_id, scrape_date); default insert seperti main.py")
+    args = parser.parse_args()
+    logger = get_logger("worker")
+
+    MONGO_DB_URI = os.getenv("MONGO_URI")
+    if not MONGO_DB_URI:
+        logger.error("Variabel lingkungan MONGO_URI tidak ditemukan. Buat file .env.")
+        return
+
+    try:
+        db = Database(db_uri=MONGO_DB_URI, db_name="harga_komoditas_db",
+                      spool=WriteSpool(os.path.join("spool", f"pending_writes_{socket.gethostname()}.jsonl")))
+    except Exception:
+        return
+    db.replay_spool()
+    job_queue = JobQueue(db, lease_seconds=args.lease_seconds)
+
+    def save_batch(query, products):
+        for p in products:
+            p["search_query"] = query
+        saved = db.save_products(products, collection_for(query), upsert=args.upsert)
+        # Sama seperti main.py: setiap produk yang tersimpan juga dicatat sebagai snapshot harga
+        if saved:
+            db.save_snapshots(products, query, args.run_id)
+        return saved
+
+    # Item antrean ditandai selesai setelah produk halamannya tersimpan, dan
+    # dikembalikan ke antrean jika penyimpanan gagal
+    writer = ProductWriter(save_batch, on_page_saved=job_queue.page_saved, on_page_failed=job_queue.page_failed)
+    if args.backend == "http":
+        from scrapers.http_scraper import TokopediaHttpScraper as scraper_cls
+    else:
+        from scrapers.tokopedia_scraper import TokopediaScraper as scraper_cls
+    # Satu store artefak debug bersama untuk semua worker (sama seperti main.py), agar batas
+    # ukuran dan sampling kegagalan berulang berlaku untuk seluruh mesin
+    debug_store = DebugArtifactStore("debug_artifacts", max_bytes=200 * 1024 * 1024)
+    pool = ScraperPool(scraper_cls, num_workers=args.workers, headless=True,
+                       extraction_mode=args.mode, rate_limiter=PolitenessScheduler(rate=args.rate),
+                       debug_store=debug_store)
+
+    try:
+        logger.info(f"===== Worker {args.node_id} mulai dengan {args.workers} browser =====")
+        writer.start()
+        # Lease item yang sedang di-scrape atau menunggu disimpan diperpanjang berkala
+        job_queue.start_heartbeat()
+        pool.run_queue(job_queue, args.node_id, on_page_complete=writer.put, idle_exit=not args.wait,
+                       complete_on_save=True)
+        pool.report()
+    except KeyboardInterrupt:
+        logger.warning("Dihentikan; item yang sedang berjalan akan diklaim ulang setelah lease habis.")
+    finally:
+        pool.close()
+        writer.close()
+        debug_store.close()
+        job_queue.stop_heartbeat()
+        db.close_connection()
+    debug_store.report(logger)
+
+
+if __name__ == "__main__":
+    main()